@@ -0,0 +1,162 @@
+# assets.py
+"""启动时一次性建立的资源索引（svg/、assets/ 与 icon.ico）。
+
+所有资源在建立索引时读入内存，之后的查找都是一次字典访问，不再对每个候选目录调用 Path.exists()；
+Nuitka onefile 下这些 stat 调用都要访问临时解压目录。
+目录中存在打包文件 assets.pack 时直接从这一个文件载入全部资源。缺失的资源只报告一次。
+"""
+import json
+import logging
+import os
+import struct
+import sys
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+ASSET_DIRS = ("svg", "assets")
+ASSET_FILES = ("icon.ico",)
+PACK_NAME = "assets.pack"
+PACK_MAGIC = b"MHYPACK\0"
+# 魔数 + 目录 JSON 长度；目录为 {相对路径: [数据偏移, 长度]}，偏移相对于数据区起点
+_PACK_HEADER = struct.Struct("<8sI")
+
+
+def asset_roots() -> list[Path]:
+    """Directories that may hold assets, in lookup order (onefile temp dir, source dir, executable dir)."""
+    roots = []
+    # Nuitka onefile payload extraction directory
+    onefile_temp = os.environ.get("NUITKA_ONEFILE_TEMP")
+    if onefile_temp:
+        roots.append(Path(onefile_temp))
+    roots.append(Path(__file__).resolve().parent)
+    if getattr(sys, "frozen", False):
+        roots.append(Path(sys.executable).resolve().parent)
+    return roots
+
+
+class AssetIndex:
+    """相对路径（如 "svg/gear.svg"）到文件内容的映射。"""
+
+    def __init__(self, roots: list[Path] | None = None):
+        self.roots = asset_roots() if roots is None else [Path(root) for root in roots]
+        self._data: dict[str, bytes] = {}
+        self._paths: dict[str, Path] = {}
+        self._reported: set[str] = set()
+        self.source = "none"
+        self._load()
+
+    def _load(self):
+        for root in self.roots:
+            pack = root / PACK_NAME
+            if pack.is_file():
+                try:
+                    self._data.update(read_pack(pack))
+                    self.source = str(pack)
+                    return
+                except (OSError, ValueError) as exc:
+                    logger.warning("Ignoring asset pack %s: %s", pack, exc)
+        for root in self.roots:
+            for name, path in _scan(root):
+                if name in self._data:
+                    continue
+                try:
+                    self._data[name] = path.read_bytes()
+                except OSError as exc:
+                    logger.warning("Cannot read asset %s: %s", path, exc)
+                    continue
+                self._paths[name] = path
+        if self._data:
+            self.source = ", ".join(str(root) for root in self.roots)
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        return "/".join(parts)
+
+    def get(self, *parts: str) -> bytes | None:
+        """Contents of the asset, or None (reported once per missing asset)."""
+        name = self.key(*parts)
+        data = self._data.get(name)
+        if data is None and name not in self._reported:
+            self._reported.add(name)
+            logger.warning("Asset not found: %s (searched %s)", name, self.source)
+        return data
+
+    def path(self, *parts: str) -> Path | None:
+        """On-disk location of the asset (None when it came from a pack or is missing)."""
+        return self._paths.get(self.key(*parts))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(map(len, self._data.values()))
+
+    def names(self) -> list[str]:
+        return sorted(self._data)
+
+
+def _scan(root: Path):
+    for directory in ASSET_DIRS:
+        folder = root / directory
+        if not folder.is_dir():
+            continue
+        for path in sorted(folder.iterdir()):
+            if path.is_file():
+                yield f"{directory}/{path.name}", path
+    for name in ASSET_FILES:
+        path = root / name
+        if path.is_file():
+            yield name, path
+
+
+def write_pack(index: AssetIndex, path) -> int:
+    """Write every indexed asset into one pack file; return the asset count."""
+    directory = {}
+    offset = 0
+    for name in index.names():
+        size = len(index._data[name])
+        directory[name] = [offset, size]
+        offset += size
+    header = json.dumps(directory).encode("utf-8")
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_PACK_HEADER.pack(PACK_MAGIC, len(header)))
+        f.write(header)
+        for name in index.names():
+            f.write(index._data[name])
+    os.replace(tmp, path)
+    return len(directory)
+
+
+def read_pack(path) -> dict[str, bytes]:
+    blob = Path(path).read_bytes()
+    if len(blob) < _PACK_HEADER.size:
+        raise ValueError("truncated asset pack")
+    magic, header_len = _PACK_HEADER.unpack_from(blob)
+    if magic != PACK_MAGIC:
+        raise ValueError("not an asset pack")
+    base = _PACK_HEADER.size + header_len
+    directory = json.loads(blob[_PACK_HEADER.size:base].decode("utf-8"))
+    out = {}
+    for name, (offset, size) in directory.items():
+        if base + offset + size > len(blob):
+            raise ValueError(f"truncated asset pack at {name}")
+        out[name] = blob[base + offset:base + offset + size]
+    return out
+
+
+_default: AssetIndex | None = None
+
+
+def default_index() -> AssetIndex:
+    """The process-wide index, built on first use."""
+    global _default
+    if _default is None:
+        _default = AssetIndex()
+    return _default
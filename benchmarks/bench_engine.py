@@ -0,0 +1,178 @@
+"""Benchmark the typing engine on Linux/Windows without injecting real input.
+
+Usage:
+    python benchmarks/bench_engine.py [--out result.json] [--compare baseline.json] [--threshold 0.2]
+                                      [--quick] [--only CASE]
+
+用例覆盖字素切分、UTF-16 展开、INPUT 事件构建（send_char 每次调用所做的工作）、整段计划编译，
+以及 PasteWorker 在 RecordingBackend(record=False)（不做任何事的后端）上的端到端吞吐；
+pacing 用例在流水线仍在编译后续窗口时以 1 ms 节拍输入，报告发送时刻相对计划的误差（best 为 p99）。
+语料为确定性生成的 ASCII、CJK、emoji/ZWJ 密集文本和 10 MB 混合文本。
+"""
+import argparse
+import logging
+import random
+import sys
+import threading
+
+from benchlib import add_arguments, finish, make_report, measure, selected
+
+from PySide6.QtCore import QCoreApplication
+
+import grapheme
+from config import PIPELINE_DEPTH
+from core_engine import InputSimulator, PasteWorker
+from input_backends import RecordingBackend
+from rhythm import BLOCK_SIZE
+
+# 各语料的默认大小（UTF-8 字节）；--quick 时缩小为 1/20
+CORPUS_BYTES = {"ascii": 1 << 20, "cjk": 1 << 20, "emoji": 1 << 20, "mixed": 10 << 20}
+# 节拍用例：每个字素之后等待 1 ms，输入这么多个字素后停止
+PACING_DELAY_MS = 1
+PACING_GRAPHEMES = 1500
+
+_WORDS = ("the", "quick", "brown", "fox", "jumps", "over", "lazy", "dog", "typing", "engine",
+          "latency", "grapheme", "Genshin", "Impact", "Honkai", "Star", "Rail", "traveler")
+_CJK_PUNCT = "，。！？、；：“”（）"
+_EMOJI = (
+    "😀", "👍🏽", "❤️", "👨‍👩‍👧‍👦", "🏳️‍🌈", "🇨🇳", "🇯🇵", "🧑🏻‍💻", "👩‍❤️‍💋‍👨", "✊🏿", "🐱", "1️⃣",
+)
+
+
+def ascii_text(size: int, rng: random.Random) -> str:
+    parts = []
+    length = 0
+    while length < size:
+        line = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(6, 14))) + ".\n"
+        parts.append(line)
+        length += len(line)
+    return "".join(parts)[:size]
+
+
+def cjk_text(size: int, rng: random.Random) -> str:
+    chars = []
+    # CJK 统一表意文字每个 3 字节
+    for i in range(size // 3):
+        if i % 40 == 39:
+            chars.append("\n")
+        elif i % 9 == 8:
+            chars.append(rng.choice(_CJK_PUNCT))
+        else:
+            chars.append(chr(rng.randint(0x4E00, 0x9FA5)))
+    return "".join(chars)
+
+
+def emoji_text(size: int, rng: random.Random) -> str:
+    parts = []
+    length = 0
+    while length < size:
+        item = rng.choice(_EMOJI) if rng.random() < 0.8 else rng.choice(" \n")
+        parts.append(item)
+        length += len(item.encode("utf-8"))
+    return "".join(parts)
+
+
+def mixed_text(size: int, rng: random.Random) -> str:
+    makers = (ascii_text, cjk_text, emoji_text)
+    parts = []
+    length = 0
+    while length < size:
+        chunk = rng.choice(makers)(rng.randint(256, 4096), rng)
+        parts.append(chunk)
+        length += len(chunk.encode("utf-8"))
+    return "".join(parts)
+
+
+def build_corpora(scale: float = 1.0, seed: int = 2024) -> dict[str, str]:
+    makers = {"ascii": ascii_text, "cjk": cjk_text, "emoji": emoji_text, "mixed": mixed_text}
+    return {name: makers[name](max(1024, int(size * scale)), random.Random(seed))
+            for name, size in CORPUS_BYTES.items()}
+
+
+def _utf16_all(graphemes):
+    units = InputSimulator._utf16_units
+    for g in graphemes:
+        units(g)
+
+
+def _build_inputs(graphemes):
+    build = InputSimulator._grapheme_inputs
+    for g in graphemes:
+        build(g)
+
+
+def _run_worker(text: str, burst_graphemes: int):
+    worker = PasteWorker(text, 0, 0, countdown_seconds=0, burst_graphemes=burst_graphemes,
+                         backend=RecordingBackend(record=False))
+    worker.run()
+    if not worker.completed:
+        raise RuntimeError("PasteWorker did not complete")
+
+
+def pacing_error(text: str, graphemes: int = PACING_GRAPHEMES) -> dict:
+    """Send-time error against the schedule while the pipeline compiles the windows after the first."""
+    worker = PasteWorker(text, PACING_DELAY_MS, 0, countdown_seconds=0, backend=RecordingBackend(record=False))
+    finished = threading.Event()
+
+    def stop_when_done():
+        while worker.next_offset < graphemes and not finished.wait(0.01):
+            pass
+        worker.stop()
+
+    watcher = threading.Thread(target=stop_when_done, daemon=True)
+    watcher.start()
+    worker.run()
+    finished.set()
+    watcher.join()
+    errors = worker.metrics.send_error_ns
+    p99 = errors.percentile(99)
+    return {"best_s": p99 / 1e9, "median_s": errors.percentile(50) / 1e9, "repeat": 1, "units": errors.count,
+            "unit": "send", "ns_per_unit": p99, "p99_9_ms": errors.percentile(99.9) / 1e6,
+            "max_ms": errors.max / 1e6}
+
+
+def run_cases(corpora: dict[str, str], args) -> dict:
+    cases = {}
+
+    def case(name, func, units, unit):
+        if selected(args, name):
+            cases[name] = measure(func, args.repeat, units, unit)
+            print(f"  {name}: {cases[name]['best_s'] * 1000:.1f}ms", file=sys.stderr)
+
+    for corpus, text in corpora.items():
+        graphemes = grapheme.split_graphemes(text)
+        count = len(graphemes)
+        # 逐字素的用例在大语料上取前 100k 个字素，控制单次耗时
+        sample = graphemes[:100_000]
+        case(f"iter_graphemes/{corpus}", lambda: sum(1 for _ in InputSimulator.iter_graphemes(text)), count, "grapheme")
+        case(f"utf16_units/{corpus}", lambda: _utf16_all(sample), len(sample), "grapheme")
+        case(f"build_inputs/{corpus}", lambda: _build_inputs(sample), len(sample), "grapheme")
+        case(f"compile_plan/{corpus}", lambda: InputSimulator.compile_plan(sample), len(sample), "grapheme")
+        case(f"worker_burst/{corpus}", lambda: _run_worker(text, 64), count, "grapheme")
+        case(f"worker_per_grapheme/{corpus}", lambda: _run_worker("".join(sample), 1), len(sample), "grapheme")
+    name = "pacing/cjk"
+    if selected(args, name):
+        # 文本覆盖多个窗口，输入开头时生产者仍在编译后面的窗口
+        cases[name] = pacing_error(corpora["cjk"][:BLOCK_SIZE * (PIPELINE_DEPTH + 2)])
+        print(f"  {name}: p99 {cases[name]['best_s'] * 1000:.2f}ms p99.9 {cases[name]['p99_9_ms']:.2f}ms "
+              f"max {cases[name]['max_ms']:.2f}ms", file=sys.stderr)
+    return cases
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    parser.add_argument("--quick", action="store_true", help="语料缩小为 1/20，用于快速检查")
+    args = parser.parse_args(argv)
+    # PasteWorker 每个任务都会写 INFO 日志，基准中只保留警告
+    logging.basicConfig(level=logging.WARNING)
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    corpora = build_corpora(0.05 if args.quick else 1.0)
+    report = make_report("engine", run_cases(corpora, args))
+    report["corpus_bytes"] = {name: len(text.encode("utf-8")) for name, text in corpora.items()}
+    del app
+    return finish(args, report)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
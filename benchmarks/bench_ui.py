@@ -0,0 +1,203 @@
+"""Benchmark MainWindow / SettingsDialog start-up and interaction cost offscreen.
+
+Usage:
+    python benchmarks/bench_ui.py [--out result.json] [--compare baseline.json] [--threshold 0.2] [--only CASE]
+
+在 QT_QPA_PLATFORM=offscreen 下运行，不需要显示器；Win32 窗口调用（置顶、任务栏 AppID、最小化动画）
+替换为空操作，热键使用 FakeHotkeyListener，QSettings 写到临时目录，不影响真实配置。
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from benchlib import add_arguments, finish, make_report, measure, selected
+
+from PySide6.QtCore import QEvent, QEventLoop, QObject, QSettings, QTimer
+from PySide6.QtWidgets import QApplication
+
+from core_engine import WinSystem
+from hotkeys import FakeHotkeyListener
+from main_window import MainWindow, SettingsDialog
+
+# 单次操作太快，每次计时循环执行这么多次
+LOOPS = 20
+PROGRESS_UPDATES = 1000
+# 模拟输入任务时统计界面线程 CPU 占用的时长 (秒) 与进度推送间隔 (ms)
+JOB_SECONDS = 1.0
+JOB_PROGRESS_MS = 30
+
+
+def stub_win32():
+    """Replace the Win32-only window calls with no-ops."""
+    for name in ("set_topmost", "set_app_id", "minimize_window_anim"):
+        setattr(WinSystem, name, staticmethod(lambda *args, **kwargs: None))
+
+
+def isolate_settings(directory: str):
+    QSettings.setDefaultFormat(QSettings.Format.IniFormat)
+    QSettings.setPath(QSettings.Format.IniFormat, QSettings.Scope.UserScope, directory)
+
+
+def new_window(effects: bool = True) -> MainWindow:
+    return MainWindow(hotkeys=FakeHotkeyListener(), effects=effects)
+
+
+def dispose(app: QApplication, window):
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+
+
+def open_settings(window: MainWindow) -> SettingsDialog:
+    """What _open_settings does before entering the modal loop: build and show the dialog."""
+    dlg = SettingsDialog(
+        window, window.lang, window.theme, window.base_delay, window.random_delay, window.countdown_seconds,
+        (window.start_hotkey_text, window.start_hotkey_vk, window.start_hotkey_mod),
+        (window.continue_hotkey_text, window.continue_hotkey_vk, window.continue_hotkey_mod),
+    )
+    dlg.show()
+    QApplication.processEvents()
+    return dlg
+
+
+class PaintCounter(QObject):
+    """Application-wide event filter counting paint events."""
+
+    def __init__(self):
+        super().__init__()
+        self.paints = 0
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint:
+            self.paints += 1
+        return False
+
+
+def job_cpu(app: QApplication, window: MainWindow, minimized: bool) -> dict:
+    """Process CPU time spent while a simulated job streams progress for JOB_SECONDS.
+
+    也记录期间的绘制次数，以及结束时转圈/进度动画定时器是否仍在运行。
+    """
+    if minimized:
+        window.showMinimized()
+    else:
+        window.showNormal()
+    app.processEvents()
+    window._set_progress_target(0, instant=True)
+    window._start_spinner()
+    ticks = [0]
+
+    def feed():
+        ticks[0] += 1
+        window._on_worker_progress(min(100, ticks[0] * 2), 120.0, 5.0)
+
+    feeder = QTimer()
+    feeder.timeout.connect(feed)
+    loop = QEventLoop()
+    counter = PaintCounter()
+    app.installEventFilter(counter)
+    start = time.process_time()
+    feeder.start(JOB_PROGRESS_MS)
+    QTimer.singleShot(int(JOB_SECONDS * 1000), loop.quit)
+    loop.exec()
+    cpu = time.process_time() - start
+    feeder.stop()
+    app.removeEventFilter(counter)
+    timers_active = window._spinner_timer.isActive() or window._progress_timer.isActive()
+    window._stop_spinner()
+    window.showNormal()
+    app.processEvents()
+    return {"best_s": cpu, "median_s": cpu, "repeat": 1, "units": 1, "unit": "job-second",
+            "ns_per_unit": round(cpu * 1e9 / JOB_SECONDS, 2), "paints": counter.paints,
+            "timers_active": timers_active}
+
+
+def run_cases(app: QApplication, args) -> dict:
+    cases = {}
+
+    def case(name, func, units, unit, repeat=None, setup=None):
+        if selected(args, name):
+            cases[name] = measure(func, repeat or args.repeat, units, unit, setup)
+            print(f"  {name}: {cases[name]['best_s'] * 1000:.1f}ms", file=sys.stderr)
+
+    created = []
+
+    def dispose_created():
+        # 上一次构造的窗口在计时外销毁
+        while created:
+            dispose(app, created.pop())
+
+    case("main_window_init", lambda _: created.append(new_window()), 1, "window",
+         repeat=args.repeat * LOOPS, setup=dispose_created)
+    dispose_created()
+
+    window = new_window()
+    window.show()
+    app.processEvents()
+
+    def apply_theme():
+        for _ in range(LOOPS):
+            window._apply_theme()
+
+    def apply_language():
+        for i in range(LOOPS):
+            window.lang = "en" if i % 2 else "zh"
+            window._apply_language_texts()
+
+    def refresh_icons():
+        for _ in range(LOOPS):
+            window._refresh_icons()
+
+    def settings_dialog():
+        for _ in range(LOOPS):
+            dlg = open_settings(window)
+            dlg.reject()
+            dlg.deleteLater()
+        app.processEvents()
+
+    def progress_updates():
+        window._set_progress_target(0, instant=True)
+        for i in range(PROGRESS_UPDATES):
+            window._on_worker_progress(i * 100 // PROGRESS_UPDATES, 120.0, (PROGRESS_UPDATES - i) / 120.0)
+            app.processEvents()
+
+    case("apply_theme", apply_theme, LOOPS, "call")
+    case("apply_language_texts", apply_language, LOOPS, "call")
+    case("refresh_icons", refresh_icons, LOOPS, "call")
+    case("open_settings_dialog", settings_dialog, LOOPS, "dialog")
+    case("progress_updates", progress_updates, PROGRESS_UPDATES, "update")
+    for name, minimized in (("job_cpu_visible", False), ("job_cpu_minimized", True)):
+        if selected(args, name):
+            cases[name] = job_cpu(app, window, minimized)
+            print(f"  {name}: {cases[name]['best_s'] * 1000:.1f}ms CPU, {cases[name]['paints']} paints",
+                  file=sys.stderr)
+    dispose(app, window)
+    if selected(args, "job_cpu_no_effects"):
+        # --no-effects：没有阴影与半透明背景
+        window = new_window(effects=False)
+        cases["job_cpu_no_effects"] = job_cpu(app, window, False)
+        print(f"  job_cpu_no_effects: {cases['job_cpu_no_effects']['best_s'] * 1000:.1f}ms CPU, "
+              f"{cases['job_cpu_no_effects']['paints']} paints", file=sys.stderr)
+        dispose(app, window)
+    return cases
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    stub_win32()
+    with tempfile.TemporaryDirectory() as settings_dir:
+        isolate_settings(settings_dir)
+        app = QApplication.instance() or QApplication(sys.argv[:1])
+        report = make_report("ui", run_cases(app, args))
+    report["qpa_platform"] = app.platformName()
+    return finish(args, report)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
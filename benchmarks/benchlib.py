@@ -0,0 +1,110 @@
+# benchlib.py
+"""基准脚本共用的计时、结果保存与回归比较。
+
+结果文件格式：
+    {"suite": ..., "python": ..., "platform": ..., "time": ...,
+     "cases": {name: {"best_s", "median_s", "repeat", "units", "unit", "ns_per_unit"}}}
+比较时以 best_s（多次重复中的最快一次，受系统噪声影响最小）为准。
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# 比较模式下允许的默认变慢比例
+DEFAULT_THRESHOLD = 0.20
+
+
+def measure(func, repeat: int = 5, units: int = 1, unit: str = "op", setup=None) -> dict:
+    """Time ``func()`` ``repeat`` times (``setup()`` runs untimed before each call)."""
+    times = []
+    for _ in range(max(1, repeat)):
+        arg = setup() if setup is not None else None
+        gc.collect()
+        start = time.perf_counter_ns()
+        func(arg) if setup is not None else func()
+        times.append(time.perf_counter_ns() - start)
+    best = min(times)
+    return {
+        "best_s": best / 1e9,
+        "median_s": statistics.median(times) / 1e9,
+        "repeat": len(times),
+        "units": units,
+        "unit": unit,
+        "ns_per_unit": round(best / max(1, units), 2),
+    }
+
+
+def make_report(suite: str, cases: dict) -> dict:
+    return {
+        "suite": suite,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "cases": cases,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> list[str]:
+    """Names of cases whose best time grew by more than ``threshold`` relative to the baseline."""
+    regressions = []
+    old_cases = baseline.get("cases", {})
+    for name, new in current.get("cases", {}).items():
+        old = old_cases.get(name)
+        if not old or not old.get("best_s"):
+            continue
+        if new["best_s"] > old["best_s"] * (1 + threshold):
+            regressions.append(name)
+    return regressions
+
+
+def format_report(current: dict, baseline: dict | None = None) -> str:
+    lines = [f"{'case':<32} {'best ms':>10} {'median ms':>10} {'ns/unit':>12}" + ("  change" if baseline else "")]
+    old_cases = (baseline or {}).get("cases", {})
+    for name, case in current["cases"].items():
+        line = (f"{name:<32} {case['best_s'] * 1000:>10.2f} {case['median_s'] * 1000:>10.2f} "
+                f"{case['ns_per_unit']:>9.1f}/{case['unit']}")
+        old = old_cases.get(name)
+        if old and old.get("best_s"):
+            line += f"  {(case['best_s'] / old['best_s'] - 1) * 100:+.1f}%"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--out", type=Path, help="把结果写入 JSON 文件")
+    parser.add_argument("--compare", type=Path, metavar="BASELINE", help="与基线结果比较，超过阈值则以 1 退出")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"允许的变慢比例 (默认 {DEFAULT_THRESHOLD})")
+    parser.add_argument("--repeat", type=int, default=5, help="每个用例的重复次数，取最快一次")
+    parser.add_argument("--only", action="append", metavar="CASE", help="只运行名称包含该子串的用例，可重复")
+
+
+def finish(args, report: dict) -> int:
+    """Print, save and compare a report; return the process exit code."""
+    baseline = None
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+    print(format_report(report, baseline))
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    if baseline is None:
+        return 0
+    regressions = compare(baseline, report, args.threshold)
+    if regressions:
+        print(f"Regressions beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+def selected(args, name: str) -> bool:
+    return not args.only or any(part in name for part in args.only)
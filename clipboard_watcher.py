@@ -0,0 +1,106 @@
+# clipboard_watcher.py
+import logging
+
+from PySide6.QtCore import QObject, QTimer
+
+from config import PREARM_DEBOUNCE_MS
+from core_engine import JobPreparer
+
+logger = logging.getLogger(__name__)
+
+
+class ClipboardWatcher(QObject):
+    """监听剪贴板变化，在后台预先准备好任务（切分 + 首个窗口的输入计划）。
+
+    dataChanged 可能在一次复制中触发多次，因此防抖后才读取文本；
+    热键触发时只要剪贴板内容与缓存一致，就可以直接启动已就绪的任务。
+    """
+
+    def __init__(self, clipboard, debounce_ms: int = PREARM_DEBOUNCE_MS, cache=None, parent=None):
+        super().__init__(parent)
+        self._clipboard = clipboard
+        self._cache = cache
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._prepare)
+        self._text = ""
+        self._preparer: JobPreparer | None = None
+        self._cached: JobPreparer | None = None
+        # dataChanged 之后、重新读取之前，缓存可能已过期
+        self._dirty = True
+        self.hits = 0
+        self.misses = 0
+        clipboard.dataChanged.connect(self._on_changed)
+        # 启动时剪贴板里已有的内容也预先准备
+        self._timer.start()
+
+    def _on_changed(self):
+        self._dirty = True
+        self._timer.start()
+
+    def _prepare(self):
+        self._dirty = False
+        text = self._clipboard.text()
+        if not text:
+            # 剪贴板被清空或换成了非文本（图片等）：旧任务不能再被热键直接启动
+            self._text = ""
+            self._cached = None
+            if self._preparer is not None:
+                self._preparer.cancel()
+            return
+        if text == self._text:
+            return
+        self._text = text
+        self._cached = None
+        if self._preparer is not None:
+            # 上一次准备尚未完成：结果作废，等它结束后再准备最新内容
+            self._preparer.cancel()
+            return
+        preparer = self._preparer = JobPreparer(text, compile_first=True, cache=self._cache)
+        preparer.finished.connect(self._on_prepared)
+        preparer.start()
+
+    def _on_prepared(self):
+        preparer, self._preparer = self._preparer, None
+        if preparer is not None and preparer.job is not None:
+            self._cached = preparer
+            logger.info("Clipboard job pre-armed in %.1fms", preparer.elapsed_ms)
+        elif self._text:
+            # 被取消的是旧内容，补做最新内容
+            self._text = ""
+            self._prepare()
+
+    def current(self) -> JobPreparer | None:
+        """Finished preparation when the clipboard has not changed since it was read.
+
+        命中时热键处理无需再读取剪贴板（大文本转换为 str 本身就要几十毫秒）。
+        """
+        if self._dirty or self._cached is None:
+            return None
+        self.hits += 1
+        return self._cached
+
+    def take(self, text: str) -> JobPreparer | None:
+        """Return the finished preparation for ``text``, or None.
+
+        任务对象不可变、计划由 worker 复制后使用，同一内容可反复启动。
+        """
+        cached = self._cached
+        if cached is not None and text == self._text:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        return None
+
+    def pending(self, text: str) -> JobPreparer | None:
+        """Preparation for ``text`` that is still running, if any."""
+        if self._preparer is not None and not self._preparer.cancelled and text == self._text:
+            return self._preparer
+        return None
+
+    def shutdown(self):
+        self._timer.stop()
+        if self._preparer is not None:
+            self._preparer.cancel()
+            self._preparer.wait()
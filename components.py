@@ -40,6 +40,11 @@ class ToggleSwitch(QCheckBox):
             end = self.width() - self.height() + 3
         else:
             end = 3
+        if not self.isVisible():
+            # 不可见时直接跳到终点，不启动动画定时器
+            self._anim.stop()
+            self.circlePosition = end
+            return
         self._anim.setStartValue(start)
         self._anim.setEndValue(end)
         self._anim.start()
@@ -9,16 +9,50 @@ APP_ID = "mihoyo.tool.app.v2.0"
 DEFAULT_BASE_DELAY_MS = 10
 DEFAULT_RANDOM_DELAY_MS = 5
 DEFAULT_COUNTDOWN_SEC = 3
+# 延迟分布：uniform / lognormal / natural (对数正态 + 标点、换行等字符类别倍率)
+DEFAULT_RHYTHM = "uniform"
+# 零延迟时的突发模式：每次 SendInput 最多打包的字素数 / 事件数
+DEFAULT_BURST_GRAPHEMES = 64
+DEFAULT_BURST_MAX_EVENTS = 1024
+# 停止延迟目标 (ms)：突发模式下单次 SendInput 的预计耗时不超过其一半，停止请求最多等待一个批次
+STOP_LATENCY_TARGET_MS = 5.0
+# 进度信号最高发送频率 (Hz)，以及百分比不变时刷新速度/剩余时间的间隔 (秒)
+DEFAULT_PROGRESS_HZ = 30
+PROGRESS_HEARTBEAT_SEC = 1.0
+# 超过该字符数的文本改为流式切分：首个窗口就绪即开始输入；流式读取的块大小
+STREAM_THRESHOLD_CHARS = 1_000_000
+STREAM_CHUNK_CHARS = 64 * 1024
+# 编译结果缓存上限（字节），按 LRU 淘汰；0 表示关闭
+PLAN_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# 剪贴板预准备：内容变化后等待该时长 (ms) 再读取并准备任务
+PREARM_DEBOUNCE_MS = 200
+# SendInput 只注入了字素的一部分时，补发剩余事件的最大尝试次数
+FINISH_GRAPHEME_RETRIES = 3
+# 输入流水线：生产者最多领先的窗口数
+PIPELINE_DEPTH = 4
+# 生产者编译窗口时每处理这么多个字素让出一次 GIL，节拍线程醒来时不必等满切换间隔 (5 ms)
+PIPELINE_YIELD_GRAPHEMES = 128
+# 时间线追踪环形缓冲区的事件数，写满后覆盖最旧的事件
+TRACE_CAPACITY = 1 << 18
+# --profile sample 模式的采样间隔 (ms)
+PROFILE_SAMPLE_INTERVAL_MS = 1
+# 独立进程引擎：界面轮询共享内存中进度的间隔 (ms)
+ENGINE_POLL_MS = 30
 # (显示文本, VK 键码, 修饰键组合)
 DEFAULT_START_HOTKEY = ("F9", 0x78, 0)
 DEFAULT_CONTINUE_HOTKEY = ("F11", 0x7A, 0)
 
 LOG_DIR = Path(os.getenv("LOCALAPPDATA", ".")) / "miHoYoTool"
 LOG_FILE = LOG_DIR / "app.log"
+# 每个任务的输入指标汇总（JSON Lines），与日志放在同一目录
+METRICS_FILE_NAME = "metrics.jsonl"
 LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
 # 日志轮转配置：1 MB * 3 份
 LOG_MAX_BYTES = 1_000_000
 LOG_BACKUP_COUNT = 3
+# metrics.jsonl 同样按大小轮转：每条汇总约 0.5 KB，1 MB 约两千个任务，保留一份备份
+METRICS_MAX_BYTES = 1_000_000
+METRICS_BACKUP_COUNT = 1
 
 
 def setup_logging(log_file: Path | None = None):
@@ -1,46 +1,55 @@
+import sys
 import time
-import random
 import logging
 import ctypes
-import unicodedata
-from ctypes import wintypes, Structure, Union, c_ulong, c_uint64, sizeof, POINTER, c_int, c_uint, c_long
-from PySide6.QtCore import QThread, Signal, QElapsedTimer
+import threading
+from array import array
+from bisect import bisect_right
+from ctypes import wintypes
+from PySide6.QtCore import QThread, Signal
+
+from config import (
+    DEFAULT_BURST_GRAPHEMES,
+    DEFAULT_BURST_MAX_EVENTS,
+    DEFAULT_PROGRESS_HZ,
+    DEFAULT_RHYTHM,
+    FINISH_GRAPHEME_RETRIES,
+    PIPELINE_YIELD_GRAPHEMES,
+    PROGRESS_HEARTBEAT_SEC,
+    STOP_LATENCY_TARGET_MS,
+)
+import grapheme
+import input_backends
+# INPUT 结构体继续从本模块导出，兼容旧的导入路径
+from input_backends import (
+    ULONG_PTR,
+    KEYBDINPUT,
+    MOUSEINPUT,
+    HARDWAREINPUT,
+    INPUT_UNION,
+    INPUT,
+    INPUT_SIZE,
+    InputBackend,
+    create_backend,
+    load_user32,
+)
+from metrics import JobMetrics, write_summary
+from scheduler import DeadlineScheduler
+from pipeline import WindowPipeline, yielding
+import profiling
+import tracing
+from plan_cache import PlanCache
+from typing_job import StreamingJob, TypingJob, prepare_job
+from rhythm import BLOCK_SIZE, DelaySchedule
 
-# 指针长度适配
-ULONG_PTR = c_uint64 if sizeof(ctypes.c_void_p) == 8 else c_ulong
 logger = logging.getLogger(__name__)
 
 
-class KEYBDINPUT(Structure):
-    _fields_ = [("wVk", wintypes.WORD), ("wScan", wintypes.WORD),
-                ("dwFlags", wintypes.DWORD), ("time", wintypes.DWORD),
-                ("dwExtraInfo", ULONG_PTR)]
-
-
-class MOUSEINPUT(Structure):
-    _fields_ = [("dx", c_long), ("dy", c_long),
-                ("mouseData", wintypes.DWORD), ("dwFlags", wintypes.DWORD),
-                ("time", wintypes.DWORD), ("dwExtraInfo", ULONG_PTR)]
-
-
-class HARDWAREINPUT(Structure):
-    _fields_ = [("uMsg", wintypes.DWORD), ("wParamL", wintypes.WORD), ("wParamH", wintypes.WORD)]
-
-
-class INPUT_UNION(Union):
-    _fields_ = [("ki", KEYBDINPUT), ("mi", MOUSEINPUT), ("hi", HARDWAREINPUT)]
-
-
-class INPUT(Structure):
-    _anonymous_ = ("_input",)
-    _fields_ = [("type", wintypes.DWORD), ("_input", INPUT_UNION)]
-
-
 class WinSystem:
-    INPUT_KEYBOARD = 1
-    KEYEVENTF_KEYUP = 0x0002
-    KEYEVENTF_UNICODE = 0x0004
-    VK_RETURN = 0x0D
+    INPUT_KEYBOARD = input_backends.INPUT_KEYBOARD
+    KEYEVENTF_KEYUP = input_backends.KEYEVENTF_KEYUP
+    KEYEVENTF_UNICODE = input_backends.KEYEVENTF_UNICODE
+    VK_RETURN = input_backends.VK_RETURN
     MOD_ALT = 0x0001
     MOD_CONTROL = 0x0002
     MOD_SHIFT = 0x0004
@@ -48,26 +57,27 @@ class WinSystem:
     WM_SYSCOMMAND = 0x0112
     SC_MINIMIZE = 0xF020
 
-    _user32 = ctypes.windll.user32
-    _shell32 = ctypes.windll.shell32
+    # Win32 DLL 在首次调用时才加载，保证非 Windows 平台也能导入本模块
+    @staticmethod
+    def _user32():
+        return load_user32()
 
-    _user32.SendInput.argtypes = [c_uint, POINTER(INPUT), c_int]
-    _user32.SendInput.restype = c_uint
-    _user32.SetWindowPos.argtypes = [wintypes.HWND, wintypes.HWND, c_int, c_int, c_int, c_int, c_uint]
-    _user32.SetWindowPos.restype = wintypes.BOOL
+    @staticmethod
+    def _shell32():
+        return ctypes.windll.shell32
 
     @staticmethod
     def is_user_an_admin() -> bool:
         try:
-            return WinSystem._shell32.IsUserAnAdmin()
+            return WinSystem._shell32().IsUserAnAdmin()
         except:
             return False
 
     @staticmethod
     def set_app_id(app_id: str):
         try:
-            WinSystem._shell32.SetCurrentProcessExplicitAppUserModelID(app_id)
-        except AttributeError:
+            WinSystem._shell32().SetCurrentProcessExplicitAppUserModelID(app_id)
+        except (AttributeError, OSError):
             pass
 
     @staticmethod
@@ -78,26 +88,61 @@ class WinSystem:
         SWP_NOACTIVATE = 0x0010
         flags = SWP_NOSIZE | SWP_NOMOVE | SWP_NOACTIVATE
         insert_after = wintypes.HWND(-1 if enable else -2)  # HWND_TOPMOST / HWND_NOTOPMOST
-        WinSystem._user32.SetWindowPos(wintypes.HWND(hwnd), insert_after, 0, 0, 0, 0, flags)
+        WinSystem._user32().SetWindowPos(wintypes.HWND(hwnd), insert_after, 0, 0, 0, 0, flags)
 
     @staticmethod
     def send_input_batch(inputs: list):
         n_inputs = len(inputs)
         input_array = (INPUT * n_inputs)(*inputs)
-        return WinSystem._user32.SendInput(n_inputs, input_array, sizeof(INPUT))
+        return WinSystem._user32().SendInput(n_inputs, input_array, INPUT_SIZE)
+
+    @staticmethod
+    def set_timer_resolution(enable: bool):
+        """Request 1 ms system timer resolution while typing (no-op off Windows)."""
+        if sys.platform != "win32":
+            return
+        winmm = ctypes.windll.winmm
+        if enable:
+            winmm.timeBeginPeriod(1)
+        else:
+            winmm.timeEndPeriod(1)
 
     @staticmethod
     def minimize_window_anim(hwnd: int):
-        WinSystem._user32.PostMessageW(wintypes.HWND(hwnd), WinSystem.WM_SYSCOMMAND, WinSystem.SC_MINIMIZE, 0)
+        WinSystem._user32().PostMessageW(wintypes.HWND(hwnd), WinSystem.WM_SYSCOMMAND, WinSystem.SC_MINIMIZE, 0)
 
     @staticmethod
     def register_hotkey(hwnd: int, hotkey_id: int, vk: int, modifiers: int = 0) -> bool:
         """Register global hotkey with optional modifier flags."""
-        return WinSystem._user32.RegisterHotKey(wintypes.HWND(hwnd), hotkey_id, modifiers, vk)
+        return WinSystem._user32().RegisterHotKey(wintypes.HWND(hwnd), hotkey_id, modifiers, vk)
 
     @staticmethod
     def unregister_hotkey(hwnd: int, hotkey_id: int) -> bool:
-        return WinSystem._user32.UnregisterHotKey(wintypes.HWND(hwnd), hotkey_id)
+        return WinSystem._user32().UnregisterHotKey(wintypes.HWND(hwnd), hotkey_id)
+
+
+class KeystrokePlan:
+    """一次编译好的整段输入：连续的 INPUT 数组 + 每个字素的事件偏移表。"""
+
+    __slots__ = ("events", "offsets")
+
+    def __init__(self, events, offsets: array):
+        self.events = events
+        # offsets[i] 为第 i 个字素的首个事件下标，末尾多一项为事件总数
+        self.offsets = offsets
+
+    @property
+    def total_graphemes(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def total_events(self) -> int:
+        return self.offsets[-1]
+
+    def span(self, start: int, end: int) -> tuple[int, int]:
+        """Return (first event, event count) covering graphemes [start, end)."""
+        first = self.offsets[start]
+        return first, self.offsets[end] - first
 
 
 class InputSimulator:
@@ -114,44 +159,14 @@ class InputSimulator:
                 units.extend([0xD800 + (cp >> 10), 0xDC00 + (cp & 0x3FF)])
         return units
 
-    @staticmethod
-    def _is_regional_indicator(cp: int) -> bool:
-        return 0x1F1E6 <= cp <= 0x1F1FF
-
     @staticmethod
     def iter_graphemes(text: str):
-        """Very small grapheme splitter to keep ZWJ/VS/RI sequences together."""
-        chars = list(text or "")
-        i = 0
-        while i < len(chars):
-            cluster = [chars[i]]
-            i += 1
-            while i < len(chars):
-                c = chars[i]
-                cp = ord(c)
-                prev_cp = ord(cluster[-1])
-                if c == "\u200d":  # ZWJ stays in cluster
-                    cluster.append(c)
-                    i += 1
-                    continue
-                if prev_cp == 0x200D:  # char after ZWJ joins cluster
-                    cluster.append(c)
-                    i += 1
-                    continue
-                if cp in (0xFE0E, 0xFE0F) or unicodedata.combining(c):
-                    cluster.append(c)
-                    i += 1
-                    continue
-                if InputSimulator._is_regional_indicator(prev_cp) and InputSimulator._is_regional_indicator(cp):
-                    cluster.append(c)
-                    i += 1
-                    continue
-                break
-            yield "".join(cluster)
+        """Split text into extended grapheme clusters (UAX #29)."""
+        return grapheme.iter_graphemes(text or "")
 
     @staticmethod
     def count_graphemes(text: str) -> int:
-        return sum(1 for _ in InputSimulator.iter_graphemes(text))
+        return grapheme.count_graphemes(text or "")
 
     @staticmethod
     def _make_input(vk=0, scan=0, flags=0) -> INPUT:
@@ -165,10 +180,11 @@ class InputSimulator:
         return inp
 
     @staticmethod
-    def send_char(char: str):
-        """Send a character or multi-codepoint grapheme (emoji/ZWJ supported)."""
+    def _grapheme_inputs(char: str) -> list[INPUT]:
+        """Build key down/up INPUTs for one grapheme (newline maps to VK_RETURN)."""
         if char == '\n':
-            return InputSimulator.send_vk(WinSystem.VK_RETURN)
+            return [InputSimulator._make_input(vk=WinSystem.VK_RETURN),
+                    InputSimulator._make_input(vk=WinSystem.VK_RETURN, flags=WinSystem.KEYEVENTF_KEYUP)]
 
         units = InputSimulator._utf16_units(char)
         inputs = []
@@ -176,7 +192,35 @@ class InputSimulator:
             inputs.append(InputSimulator._make_input(scan=unit, flags=WinSystem.KEYEVENTF_UNICODE))
         for unit in units:
             inputs.append(InputSimulator._make_input(scan=unit, flags=WinSystem.KEYEVENTF_UNICODE | WinSystem.KEYEVENTF_KEYUP))
+        return inputs
+
+    @staticmethod
+    def compile_plan(graphemes) -> KeystrokePlan:
+        """Compile graphemes into one contiguous INPUT buffer plus a per-grapheme offset table."""
+        # 相同字素只编码一次，之后按字节拼接，避免逐事件创建 ctypes 对象
+        encoded: dict[str, tuple[bytes, int]] = {}
+        chunks = []
+        offsets = array("I", [0])
+        total = 0
+        for g in graphemes:
+            entry = encoded.get(g)
+            if entry is None:
+                inputs = InputSimulator._grapheme_inputs(g)
+                entry = (bytes((INPUT * len(inputs))(*inputs)), len(inputs))
+                encoded[g] = entry
+            chunks.append(entry[0])
+            total += entry[1]
+            offsets.append(total)
+        events = (INPUT * total).from_buffer_copy(b"".join(chunks))
+        return KeystrokePlan(events, offsets)
 
+    @staticmethod
+    def send_char(char: str):
+        """Send a character or multi-codepoint grapheme (emoji/ZWJ supported)."""
+        if char == '\n':
+            return InputSimulator.send_vk(WinSystem.VK_RETURN)
+
+        inputs = InputSimulator._grapheme_inputs(char)
         sent = WinSystem.send_input_batch(inputs)
         if sent == 0:
             logger.warning("SendInput failed for char=%s", repr(char))
@@ -196,108 +240,468 @@ class InputSimulator:
         return True
 
 
+def cached_compile(cache: PlanCache | None, content_key: bytes | None, window_start: int,
+                   window: TypingJob, yield_every: int = 0) -> KeystrokePlan:
+    """Compile the window's plan, going through the plan cache when the job has a key.
+
+    ``yield_every`` > 0 releases the GIL every that many graphemes while compiling.
+    """
+    graphemes = window.iter_graphemes()
+    if yield_every > 0:
+        graphemes = yielding(graphemes, yield_every)
+    if cache is None or content_key is None:
+        return InputSimulator.compile_plan(graphemes)
+    plan = cache.get_plan(content_key, window_start)
+    if plan is None or plan.total_graphemes != window.total_graphemes:
+        plan = InputSimulator.compile_plan(graphemes)
+        cache.put_plan(content_key, window_start, plan)
+    return plan
+
+
+class ProgressReporter:
+    """合并进度更新：百分比变化（或心跳到期）且不超过频率上限时才真正发出。"""
+
+    def __init__(self, emit, total: int, start_offset: int = 0, max_hz: float = DEFAULT_PROGRESS_HZ,
+                 heartbeat_sec: float = PROGRESS_HEARTBEAT_SEC):
+        self._emit = emit
+        self.total = total
+        self.start_offset = start_offset
+        self._min_interval_ns = int(1_000_000_000 / max_hz) if max_hz > 0 else 0
+        self._heartbeat_ns = int(heartbeat_sec * 1_000_000_000)
+        self._start_ns = time.perf_counter_ns()
+        self._last_emit_ns = 0
+        self._last_percent = -1
+        self.emitted = 0
+        self.dropped = 0
+
+    def start(self):
+        self._start_ns = time.perf_counter_ns()
+
+    def update(self, done: int):
+        now = time.perf_counter_ns()
+        percent = self._percent(done)
+        since_last = now - self._last_emit_ns
+        due = percent != self._last_percent or since_last >= self._heartbeat_ns
+        if not due or since_last < self._min_interval_ns:
+            self.dropped += 1
+            return
+        self._send(done, percent, now)
+
+    def flush(self, done: int):
+        """Always emit the latest state (used at the end of a job)."""
+        now = time.perf_counter_ns()
+        self._send(done, self._percent(done), now)
+
+    def _percent(self, done: int) -> int:
+        # 流式任务的总量是估算值，可能略小于已完成数
+        return min(100, done * 100 // self.total) if self.total else 0
+
+    def _send(self, done: int, percent: int, now: int):
+        elapsed = (now - self._start_ns) / 1_000_000_000
+        typed = done - self.start_offset
+        rate = typed / elapsed if elapsed > 0 and typed > 0 else 0.0
+        eta = max(0, self.total - done) / rate if rate > 0 else -1.0
+        self._last_emit_ns = now
+        self._last_percent = percent
+        self.emitted += 1
+        tr = tracing.tracer
+        if tr is not None:
+            tr.instant("progress emit", done)
+        self._emit(percent, rate, eta)
+
+
+class JobPreparer(QThread):
+    """在后台线程规范化并切分文本，GUI 线程只在 finished 后取走 job。"""
+
+    def __init__(self, text: str, compile_first: bool = False, cache: PlanCache | None = None):
+        super().__init__()
+        self._text = text
+        self.cache = cache
+        # 预先编译首个窗口的输入计划，热键触发后可直接发送
+        self.compile_first = compile_first
+        self.job: TypingJob | StreamingJob | None = None
+        self.plans: dict[int, KeystrokePlan] = {}
+        self.elapsed_ms = 0.0
+        self.cancelled = False
+
+    def cancel(self):
+        """Discard the result; segmentation itself runs to completion in the background."""
+        self.cancelled = True
+
+    def run(self):
+        start = time.perf_counter()
+        text, self._text = self._text, None
+        job = prepare_job(text, cache=self.cache)
+        if self.compile_first and job:
+            for window_start, window in job.iter_windows(0, BLOCK_SIZE):
+                key = job.content_key if self.cache is not None else None
+                self.plans[window_start] = cached_compile(self.cache, key, window_start, window)
+                break
+        self.elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info("Job prepared in %.1fms: %d chars, %s", self.elapsed_ms, len(text),
+                    "streaming" if isinstance(job, StreamingJob) else f"{job.total_graphemes} graphemes")
+        if not self.cancelled:
+            self.job = job
+
+
 class PasteWorker(QThread):
-    progress_signal = Signal(int)
+    # (百分比, 字素/秒, 预计剩余秒数，未知时为 -1)
+    progress_signal = Signal(int, float, float)
     status_signal = Signal(str)
     finished_signal = Signal()
 
-    def __init__(self, content: str, base_delay: int, random_delay: int, start_offset: int = 0,
-                 countdown_seconds: int = 3):
+    def __init__(self, content: TypingJob | StreamingJob | str, base_delay: int, random_delay: int,
+                 start_offset: int = 0, countdown_seconds: int = 3, burst_graphemes: int = DEFAULT_BURST_GRAPHEMES,
+                 burst_max_events: int = DEFAULT_BURST_MAX_EVENTS, backend: InputBackend | str | None = None,
+                 rhythm: str = DEFAULT_RHYTHM, seed: int | None = None,
+                 plans: dict[int, KeystrokePlan] | None = None, trigger_ns: int | None = None,
+                 cache: PlanCache | None = None, metrics_file=None):
         super().__init__()
-        self.content = content or ""
-        self.graphemes = list(InputSimulator.iter_graphemes(self.content))
+        # 可直接传入 MainWindow 已切分好的任务或已打开的计划文件，字符串则在此切分
+        self.job = TypingJob(content) if isinstance(content, str) else content
         self.base_delay = base_delay
         self.random_delay = random_delay
-        self.total_graphemes = len(self.graphemes)
-        self.start_offset = max(0, min(start_offset, self.total_graphemes))
+        self.schedule = DelaySchedule(base_delay, random_delay, rhythm, seed)
+        self.start_offset = self.job.clamp(start_offset)
         self.countdown_seconds = max(0, countdown_seconds)
-        self.is_running = True
+        self.burst_graphemes = max(1, burst_graphemes)
+        self.burst_max_events = max(1, burst_max_events)
+        # 可传入后端实例，或后端名称（在工作线程中创建）
+        self.backend = backend
+        # stop() 通过事件唤醒正在等待的调度器，不必等待轮询周期
+        self._cancel = threading.Event()
+        self.scheduler = DeadlineScheduler(self._cancel)
+        self.progress: ProgressReporter | None = None
+        # 预编译好的窗口计划（窗口起始下标 -> 计划），用过即丢弃
+        self.plans = dict(plans or {})
+        self.cache = cache
+        # 热键触发时刻 (perf_counter_ns)，用于统计到首次发送的延迟
+        self.trigger_ns = trigger_ns
+        self.first_send_latency_ms: float | None = None
+        self.pipeline: WindowPipeline | None = None
+        # 停止请求时刻与最后一次发送结束时刻 (perf_counter_ns)，用于统计停止延迟
+        self.stop_requested_ns: int | None = None
+        self.stop_latency_ms: float | None = None
+        self._last_send_ns = 0
+        # 突发批次中每个事件的平均发送耗时（纳秒），用于按停止延迟目标限制批次大小
+        self._ns_per_event = 0
+        self._batch_budget_ns = int(STOP_LATENCY_TARGET_MS * 1_000_000 / 2)
+        # 每个任务的发送耗时 / 节拍误差直方图；指定文件时任务结束后追加一行汇总
+        self.metrics = JobMetrics()
+        self.metrics_file = metrics_file
         self.completed = False
         self.next_offset = self.start_offset
 
-    def stop(self):
+    @property
+    def burst_mode(self) -> bool:
+        """零延迟时把多个完整字素打包进一次 SendInput。"""
+        return self.schedule.is_zero and self.burst_graphemes > 1
+
+    @property
+    def total_graphemes(self) -> int:
+        """Grapheme count of the job (an estimate while a stream is still being read)."""
+        return self.job.estimated_total_graphemes()
+
+    @property
+    def is_running(self) -> bool:
+        return not self._cancel.is_set()
+
+    @is_running.setter
+    def is_running(self, value: bool):
+        if value:
+            self._cancel.clear()
+        else:
+            self._cancel.set()
+
+    def stop(self, requested_ns: int | None = None):
+        """Request a stop; ``requested_ns`` is when the user asked (defaults to now)."""
+        if self.stop_requested_ns is None:
+            self.stop_requested_ns = requested_ns or time.perf_counter_ns()
+        tr = tracing.tracer
+        if tr is not None:
+            tr.instant("stop requested")
         logger.info("PasteWorker stop requested")
         self.is_running = False
 
+    @staticmethod
+    def _send_graphemes(backend: InputBackend, plan: KeystrokePlan, start: int, end: int) -> int:
+        """Send graphemes [start, end); return the index right after the last fully sent grapheme."""
+        offsets = plan.offsets
+        pos = offsets[start]
+        stop = offsets[end]
+        while pos < stop:
+            # SendInput 可能只插入一部分事件，剩余部分从断点继续补发
+            sent = backend.send(plan.events, pos, stop - pos)
+            if sent <= 0:
+                break
+            pos += sent
+        if pos >= stop:
+            return end
+        # 失败时回退到最后一个完整字素的边界，续打从字素开头开始
+        index = bisect_right(offsets, pos, start, end + 1) - 1
+        if pos == offsets[index]:
+            return index
+        # 字素只注入了一部分：按下事件已经打出了字符，续打会重复；补发剩余事件把它打完
+        return PasteWorker._finish_grapheme(backend, plan, index, pos)
+
+    @staticmethod
+    def _finish_grapheme(backend: InputBackend, plan: KeystrokePlan, index: int, pos: int) -> int:
+        """Complete grapheme ``index`` from event ``pos``; return the grapheme boundary to resume from."""
+        stop = plan.offsets[index + 1]
+        for _ in range(FINISH_GRAPHEME_RETRIES):
+            sent = backend.send(plan.events, pos, stop - pos)
+            if sent > 0:
+                pos += sent
+                if pos >= stop:
+                    return index + 1
+        # 仍然失败：至少逐个补发未送出的抬起事件，避免按键保持按下状态
+        for i in range(pos, stop):
+            if plan.events[i].ki.dwFlags & WinSystem.KEYEVENTF_KEYUP:
+                backend.send(plan.events, i, 1)
+        logger.warning("Grapheme #%d was only partly sent; it may repeat when resuming", index)
+        return index
+
+    def _burst_end(self, plan: KeystrokePlan, start: int, total: int) -> int:
+        """Pick the batch end so it holds whole graphemes within both burst limits."""
+        end = min(total, start + self.burst_graphemes)
+        offsets = plan.offsets
+        max_events = self.burst_max_events
+        if self._ns_per_event:
+            # 批次中途无法取消，按实测耗时限制批次大小，停止请求最多等一个批次
+            max_events = max(1, min(max_events, self._batch_budget_ns // self._ns_per_event))
+        limit = offsets[start] + max_events
+        if offsets[end] > limit:
+            end = max(start + 1, bisect_right(offsets, limit, start, end + 1) - 1)
+        return end
+
     def run(self):
-        total = self.total_graphemes
         self.next_offset = self.start_offset
         logger.info(
-            "PasteWorker started: %d chars, base=%dms random=%dms offset=%d wait=%ds",
-            len(self.content),
+            "PasteWorker started: %s chars%s, base=%dms random=%dms rhythm=%s seed=%d offset=%d wait=%ds burst=%s",
+            self.job.total_chars if self.job.total_chars is not None else "?",
+            " (streaming)" if isinstance(self.job, StreamingJob) else "",
             self.base_delay,
             self.random_delay,
+            self.schedule.rhythm,
+            self.schedule.seed,
             self.start_offset,
             self.countdown_seconds,
+            self.burst_graphemes if self.burst_mode else "off",
         )
 
         stopped = False
+        # 追踪只在任务开始时取一次，未启用时下面的埋点都只是一次判空
+        tr = tracing.tracer
+        if tr is not None:
+            tr.name_thread("PasteWorker")
+        prof = profiling.profiler
+        if prof is not None:
+            prof.attach("PasteWorker")
+        progress = self.progress = ProgressReporter(self.progress_signal.emit, self.total_graphemes,
+                                                    self.start_offset)
+        backend = self.backend
+        owns_backend = not isinstance(backend, InputBackend)
+        WinSystem.set_timer_resolution(True)
         try:
+            if owns_backend:
+                try:
+                    backend = create_backend(backend)
+                except (OSError, ValueError) as exc:
+                    logger.error("Input backend unavailable: %s", exc)
+                    self.status_signal.emit("status:stopped")
+                    return
+            logger.info("PasteWorker input backend: %s", backend.name)
+            scheduler = self.scheduler
+            scheduler.start()
+            countdown_start_ns = time.perf_counter_ns()
+            if isinstance(self.job, TypingJob) and not self.schedule.is_zero:
+                # 只按字素数估算：逐字扫描整段文本会推迟首次按键
+                estimate_ms = self.schedule.estimate_count_ms(self.job.total_graphemes - self.start_offset)
+                logger.info("PasteWorker estimated typing time: %.1fs", estimate_ms / 1000)
+
             # 倒计时
             for i in range(self.countdown_seconds, 0, -1):
                 if not self.is_running:
                     stopped = True
                     break
                 self.status_signal.emit(f"status:preparing:{i}")
-                self._sleep_cancelable(1000)
+                scheduler.wait_next(1000)
 
             if stopped:
                 self.status_signal.emit("status:stopped")
                 return
 
-            if total == 0 or self.start_offset >= total:
+            job = self.job
+            if not job or not job.has_more(self.start_offset):
                 self.status_signal.emit("status:stopped")
-                self.progress_signal.emit(0)
+                self.progress_signal.emit(0, 0.0, -1.0)
                 return
 
-            self.status_signal.emit("status:typing")
-            for idx in range(self.start_offset, total):
-                if not self.is_running:
-                    stopped = True
-                    break
-
-                char = self.graphemes[idx]
-                if not InputSimulator.send_char(char):
-                    self.status_signal.emit("status:stopped")
-                    stopped = True
-                    logger.error("SendInput returned 0; stop typing")
-                    break
-
-                current_delay_ms = self.base_delay
-                if self.random_delay > 0:
-                    current_delay_ms += random.randrange(0, self.random_delay)
-                if current_delay_ms > 0:
-                    self._sleep_cancelable(current_delay_ms)
+            # 计划文件自带延迟时按文件中的节奏输入
+            burst = self.burst_mode and not getattr(job, "has_delays", False)
 
-                self.next_offset = idx + 1
-                progress = int(((idx + 1) / total) * 100)
-                self.progress_signal.emit(progress)
+            self.status_signal.emit("status:typing")
+            countdown_ns = time.perf_counter_ns() - countdown_start_ns
+            if tr is not None:
+                tr.complete("countdown", countdown_start_ns, countdown_start_ns + countdown_ns, self.countdown_seconds)
+            progress.start()
+            metrics = self.metrics
+            # 上一次等待的截止时刻，下一次发送时用于计算节拍误差
+            scheduled_ns = None
+            cache_key = job.content_key if self.cache is not None else None
+            # 切分、编码与事件构建在生产者线程中按窗口提前进行，本线程只负责节拍与发送；
+            # 窗口与延迟块对齐，流式任务在首个窗口切分完成后即可开始
+            pipeline = self.pipeline = WindowPipeline(
+                job.iter_windows(self.start_offset, BLOCK_SIZE),
+                lambda window_start, window: self._prepare_window(window_start, window, cache_key, burst),
+                self._cancel,
+            ).start()
+            anchored = False
+            try:
+                for window_start, count, plan, delays in pipeline:
+                    if not self.is_running:
+                        stopped = True
+                        break
+                    if not anchored:
+                        # 倒计时与首个窗口的编译耗时不计入按键节拍，否则开头会连发追赶
+                        scheduler.start()
+                        metrics.start()
+                        anchored = True
+                    progress.total = job.estimated_total_graphemes()
+                    idx = max(0, self.start_offset - window_start)
+                    while idx < count:
+                        if not self.is_running:
+                            stopped = True
+                            break
+
+                        end = self._burst_end(plan, idx, count) if burst else idx + 1
+                        send_start_ns = time.perf_counter_ns()
+                        reached = self._send_graphemes(backend, plan, idx, end)
+                        self._last_send_ns = time.perf_counter_ns()
+                        if scheduled_ns is not None:
+                            metrics.record_error(scheduled_ns, send_start_ns)
+                            scheduled_ns = None
+                        if tr is not None:
+                            tr.complete("SendInput", send_start_ns, self._last_send_ns, reached - idx)
+                        if reached > idx:
+                            events = plan.offsets[reached] - plan.offsets[idx]
+                            metrics.record_send(send_start_ns, self._last_send_ns, reached - idx, events)
+                            if burst:
+                                self._track_send_cost(self._last_send_ns - send_start_ns, events)
+                            if self.first_send_latency_ms is None:
+                                self._record_first_send(countdown_ns)
+                            self.next_offset = window_start + reached
+                            progress.update(self.next_offset)
+                        if reached < end:
+                            self.status_signal.emit("status:stopped")
+                            stopped = True
+                            logger.error("SendInput failed at grapheme #%d; stop typing", window_start + reached)
+                            break
+                        idx = reached
+                        if burst:
+                            continue
+
+                        current_delay_ms = delays[reached - 1]
+                        if current_delay_ms > 0:
+                            scheduler.wait_next(current_delay_ms)
+                            scheduled_ns = scheduler.deadline_ns
+                            if tr is not None:
+                                tr.complete("sleep", self._last_send_ns, time.perf_counter_ns(), current_delay_ms)
+                    if stopped:
+                        break
+            finally:
+                pipeline.close()
 
             if not stopped and self.is_running:
                 self.completed = True
-                self.next_offset = total
+                self.next_offset = progress.total = job.total_graphemes
                 self.status_signal.emit("status:finished")
-                self.progress_signal.emit(100)
+                progress.flush(self.next_offset)
                 logger.info("PasteWorker finished normally")
             else:
                 self.completed = False
+                progress.flush(self.next_offset)
                 logger.info("PasteWorker interrupted by user at offset=%d", self.next_offset)
                 self.status_signal.emit("status:stopped")
         finally:
+            WinSystem.set_timer_resolution(False)
+            if owns_backend and isinstance(backend, InputBackend):
+                backend.close()
+            self._record_stop_latency()
+            self._report_metrics(backend)
             self.finished_signal.emit()
             logger.info("PasteWorker exit (stopped=%s, completed=%s, next_offset=%d)", stopped, self.completed, self.next_offset)
+            logger.info("PasteWorker scheduler jitter: %s", self.scheduler.jitter.summary())
+            logger.info("PasteWorker progress updates: emitted=%d dropped=%d", progress.emitted, progress.dropped)
+            if self.cache is not None:
+                logger.info("PasteWorker plan cache: %s", self.cache.stats())
+            if self.pipeline is not None:
+                logger.info("PasteWorker pipeline: windows=%d stalls=%d", self.pipeline.produced, self.pipeline.stalls)
+            if prof is not None:
+                prof.detach("PasteWorker")
+
+    def _prepare_window(self, window_start: int, window, cache_key: bytes | None, burst: bool):
+        """Producer stage: compile the window's plan and delays (runs on the pipeline thread)."""
+        count = window.total_graphemes
+        if isinstance(window, KeystrokePlan):
+            # 计划文件的窗口本身就是映射好的计划，直接发送
+            plan = window
+        else:
+            plan = self.plans.pop(window_start, None)
+            if plan is None or plan.total_graphemes != count:
+                # 与节拍线程并行运行，编译期间定期让出 GIL
+                plan = cached_compile(self.cache, cache_key, window_start, window, PIPELINE_YIELD_GRAPHEMES)
+        delays = None if burst else self._window_delays(window_start, window, count)
+        return window_start, count, plan, delays
+
+    def _track_send_cost(self, elapsed_ns: int, events: int):
+        per_event = max(1, elapsed_ns // events)
+        if not self._ns_per_event:
+            self._ns_per_event = per_event
+        else:
+            # 指数滑动平均，偶发的慢调用不会让批次骤降
+            self._ns_per_event = max(1, self._ns_per_event + (per_event - self._ns_per_event) // 8)
+
+    def _record_stop_latency(self):
+        """Log how long a stop request took to reach the last keystroke and the loop exit."""
+        if self.stop_requested_ns is None:
+            return
+        now = time.perf_counter_ns()
+        self.stop_latency_ms = max(0, self._last_send_ns - self.stop_requested_ns) / 1_000_000
+        logger.info("PasteWorker stop latency: %.2fms to last keystroke, %.2fms to exit (target %.1fms)",
+                    self.stop_latency_ms, (now - self.stop_requested_ns) / 1_000_000, STOP_LATENCY_TARGET_MS)
+
+    def _report_metrics(self, backend):
+        if not self.metrics.graphemes:
+            return
+        summary = self.metrics.summary(
+            completed=self.completed, backend=getattr(backend, "name", str(backend)), rhythm=self.schedule.rhythm,
+            base_ms=self.base_delay, random_ms=self.random_delay, burst=self.burst_mode,
+            stop_latency_ms=self.stop_latency_ms)
+        logger.info("PasteWorker metrics: %s", summary)
+        if self.metrics_file is None:
+            return
+        try:
+            write_summary(self.metrics_file, summary)
+        except OSError as exc:
+            logger.warning("Cannot write metrics to %s: %s", self.metrics_file, exc)
+
+    def _window_delays(self, window_start: int, window, count: int):
+        stored = getattr(window, "delays", None)
+        if stored is not None:
+            return stored
+        return self.schedule.block(window_start // BLOCK_SIZE, window.first_codepoints(0, count))
+
+    def _record_first_send(self, countdown_ns: int):
+        if self.trigger_ns is None:
+            return
+        total_ns = time.perf_counter_ns() - self.trigger_ns
+        self.first_send_latency_ms = total_ns / 1_000_000
+        logger.info("Hotkey to first SendInput: %.1fms (excluding countdown %.1fms)",
+                    self.first_send_latency_ms, (total_ns - countdown_ns) / 1_000_000)
 
     def _sleep_cancelable(self, total_ms: int):
-        """可中断睡眠，避免忙等，占用低且响应 stop。"""
-        if total_ms <= 0:
+        """可中断睡眠：通过事件等待，stop 时立即返回。"""
+        if total_ms <= 0 or not self.is_running:
             return
-        timer = QElapsedTimer()
-        timer.start()
-        # 最小粒度 5ms，保证停止时 UI 反馈更快
-        while self.is_running:
-            elapsed = timer.elapsed()
-            if elapsed >= total_ms:
-                break
-            remaining = total_ms - elapsed
-            chunk = min(10, max(5, remaining))
-            QThread.msleep(int(chunk))
+        self.scheduler.sleep_for(total_ms)
@@ -0,0 +1,293 @@
+# engine_process.py
+"""可选：在独立进程中运行输入引擎。
+
+输入循环与 Qt 绘制、进度动画不再共享同一个 GIL，界面卡顿不会变成按键抖动。
+已切分的任务（文本 + 字素边界表）通过共享内存交给子进程，子进程不必重新切分；
+计划文件只传路径，由子进程自行映射。编码、复制、启动与回收子进程都在后台启动线程中完成，
+界面线程只创建进度块。子进程把进度、next_offset 与状态写入一小块共享内存，
+界面按固定间隔轮询；停止通过跨进程 Event 传递，续打仍然只需要一个字素下标。
+"""
+import logging
+import multiprocessing
+import struct
+import threading
+import time
+from array import array
+from multiprocessing import shared_memory
+from pathlib import Path
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from config import DEFAULT_BURST_GRAPHEMES, DEFAULT_BURST_MAX_EVENTS, DEFAULT_RHYTHM, ENGINE_POLL_MS, LOG_FILE
+from plan_file import PlanFile
+from typing_job import StreamingJob, TypingJob
+
+logger = logging.getLogger(__name__)
+
+STATUS_BYTES = 48
+# seq, next_offset, total, percent, rate, eta, stop_latency_ms, completed, finished, status
+_STATE = struct.Struct(f"<QqqidddBB{STATUS_BYTES}s")
+_SEQ = struct.Struct("<Q")
+# 读取时遇到写了一半的数据最多重试的次数；写入方在两次写序号之间退出时不会无限等待
+READ_RETRIES = 1000
+ENGINE_LOG_FILE = LOG_FILE.with_name("engine.log")
+
+
+class SharedState:
+    """共享内存中的进度块：引擎进程单写、界面单读，用顺序锁避免读到写了一半的数据。"""
+
+    def __init__(self, shm: shared_memory.SharedMemory):
+        self.shm = shm
+        self._seq = 0
+        self._fields = {"next_offset": 0, "total": 0, "percent": 0, "rate": 0.0, "eta": -1.0,
+                        "stop_latency_ms": -1.0, "completed": False, "finished": False, "status": ""}
+        # 读取方最近一次读到的一致快照
+        self._snapshot = dict(self._fields)
+
+    @classmethod
+    def create(cls) -> "SharedState":
+        state = cls(shared_memory.SharedMemory(create=True, size=_STATE.size))
+        state.update()
+        return state
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedState":
+        return cls(shared_memory.SharedMemory(name=name))
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def update(self, **changes):
+        """Publish changed fields (writer side)."""
+        fields = self._fields
+        fields.update(changes)
+        buf = self.shm.buf
+        # 奇数序号表示正在写入
+        self._seq += 1
+        _SEQ.pack_into(buf, 0, self._seq)
+        _STATE.pack_into(buf, 0, self._seq, fields["next_offset"], fields["total"], fields["percent"],
+                         fields["rate"], fields["eta"], fields["stop_latency_ms"], fields["completed"],
+                         fields["finished"], fields["status"].encode("ascii")[:STATUS_BYTES])
+        self._seq += 1
+        _SEQ.pack_into(buf, 0, self._seq)
+
+    def read(self) -> dict:
+        """Consistent snapshot of the fields (reader side).
+
+        Falls back to the last consistent snapshot if the writer stays mid-update for READ_RETRIES reads.
+        """
+        buf = self.shm.buf
+        for _ in range(READ_RETRIES):
+            values = _STATE.unpack_from(buf, 0)
+            if values[0] % 2 == 0 and _SEQ.unpack_from(buf, 0)[0] == values[0]:
+                break
+        else:
+            return dict(self._snapshot)
+        _, next_offset, total, percent, rate, eta, stop_latency_ms, completed, finished, status = values
+        self._snapshot = {"next_offset": next_offset, "total": total, "percent": percent, "rate": rate, "eta": eta,
+                          "stop_latency_ms": stop_latency_ms, "completed": bool(completed),
+                          "finished": bool(finished), "status": status.rstrip(b"\0").decode("ascii")}
+        return dict(self._snapshot)
+
+    def close(self, unlink: bool = False):
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def export_job(job) -> tuple[tuple, shared_memory.SharedMemory | None]:
+    """Describe ``job`` for the engine process; text jobs are copied into shared memory."""
+    if isinstance(job, PlanFile):
+        return ("plan", str(job.path)), None
+    if isinstance(job, StreamingJob):
+        data = "".join(job.iter_chunks()).encode("utf-8", "surrogatepass")
+        bounds = b""
+    else:
+        data = job.text.encode("utf-8", "surrogatepass")
+        bounds = job.boundaries.tobytes()
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(bounds) + len(data)))
+    shm.buf[:len(bounds)] = bounds
+    shm.buf[len(bounds):len(bounds) + len(data)] = data
+    kind = "stream" if isinstance(job, StreamingJob) else "text"
+    return (kind, shm.name, len(bounds), len(data)), shm
+
+
+def import_job(spec: tuple):
+    """Rebuild the job described by ``export_job`` inside the engine process."""
+    kind = spec[0]
+    if kind == "plan":
+        return PlanFile(spec[1])
+    _, name, bounds_size, data_size = spec
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        text = bytes(shm.buf[bounds_size:bounds_size + data_size]).decode("utf-8", "surrogatepass")
+        bounds = array("I")
+        bounds.frombytes(shm.buf[:bounds_size])
+    finally:
+        shm.close()
+    if kind == "stream":
+        return StreamingJob.from_text(text)
+    # 父进程已经规范化并切分过，直接复用边界表
+    return TypingJob._segmented(text, bounds)
+
+
+def _engine_main(job_spec: tuple, state_name: str, stop_event, stop_ns, worker_args: dict, log_file):
+    """Engine process entry point: run one PasteWorker synchronously and publish its state."""
+    from config import setup_logging
+    from core_engine import PasteWorker
+
+    state = SharedState.attach(state_name)
+    worker = None
+    try:
+        setup_logging(Path(log_file))
+        job = import_job(job_spec)
+        worker = PasteWorker(job, **worker_args)
+        # 子进程里没有事件循环，信号以直连方式在输入线程中同步调用
+        worker.status_signal.connect(lambda status: state.update(status=status))
+        worker.progress_signal.connect(lambda percent, rate, eta: state.update(
+            percent=percent, rate=rate, eta=eta, next_offset=worker.next_offset, total=worker.total_graphemes))
+        # 停止信号由独立线程等待，输入循环本身不轮询
+        # perf_counter_ns 在同一台机器的进程间可比，停止延迟从界面收到请求时算起
+        threading.Thread(target=lambda: stop_event.wait() and worker.stop(stop_ns.value or None),
+                         daemon=True).start()
+        worker.run()
+    except Exception:
+        logger.exception("Engine process failed")
+    finally:
+        if worker is not None:
+            state.update(next_offset=worker.next_offset, total=worker.total_graphemes or 0,
+                         stop_latency_ms=-1.0 if worker.stop_latency_ms is None else worker.stop_latency_ms,
+                         completed=worker.completed, finished=True)
+        else:
+            state.update(status="status:stopped", finished=True)
+        state.close()
+
+
+class ProcessPasteWorker(QObject):
+    """与 PasteWorker 接口相同，但输入循环运行在独立进程中；界面线程轮询共享内存转发信号。"""
+
+    progress_signal = Signal(int, float, float)
+    status_signal = Signal(str)
+    finished_signal = Signal()
+
+    def __init__(self, content: TypingJob | StreamingJob | PlanFile | str, base_delay: int, random_delay: int,
+                 start_offset: int = 0, countdown_seconds: int = 3, burst_graphemes: int = DEFAULT_BURST_GRAPHEMES,
+                 burst_max_events: int = DEFAULT_BURST_MAX_EVENTS, backend: str | None = None,
+                 rhythm: str = DEFAULT_RHYTHM, seed: int | None = None, trigger_ns: int | None = None,
+                 metrics_file=None, poll_ms: int = ENGINE_POLL_MS, log_file=ENGINE_LOG_FILE, parent=None):
+        super().__init__(parent)
+        self.job = TypingJob(content) if isinstance(content, str) else content
+        self.start_offset = self.job.clamp(start_offset)
+        self.next_offset = self.start_offset
+        self.completed = False
+        # 后端只能按名称传给子进程，实例无法跨进程共享
+        self._worker_args = {
+            "base_delay": base_delay, "random_delay": random_delay, "start_offset": self.start_offset,
+            "countdown_seconds": countdown_seconds, "burst_graphemes": burst_graphemes,
+            "burst_max_events": burst_max_events, "backend": backend, "rhythm": rhythm, "seed": seed,
+            "trigger_ns": trigger_ns, "metrics_file": metrics_file,
+        }
+        self._log_file = log_file
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stop_event = self._ctx.Event()
+        self._stop_ns = self._ctx.Value("q", 0, lock=False)
+        self.stop_latency_ms: float | None = None
+        self._process = None
+        self._launcher: threading.Thread | None = None
+        self._launched = threading.Event()
+        self._state: SharedState | None = None
+        self._job_shm: shared_memory.SharedMemory | None = None
+        self._running = False
+        self._last_status = ""
+        self._last_progress = None
+        self._total = self.job.estimated_total_graphemes()
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(poll_ms)
+        self._poll_timer.timeout.connect(self._poll)
+
+    @property
+    def total_graphemes(self) -> int:
+        return self._total
+
+    def start(self):
+        self._state = SharedState.create()
+        self._running = True
+        # 大文本的 UTF-8 编码、流式任务的拼接以及 spawn 时的参数序列化都与文本长度成正比，放到后台线程
+        self._launcher = threading.Thread(target=self._launch, name="EngineLauncher", daemon=True)
+        self._launcher.start()
+        self._poll_timer.start()
+
+    def _launch(self):
+        """Export the job into shared memory and spawn the engine process (launcher thread)."""
+        try:
+            job_spec, self._job_shm = export_job(self.job)
+            process = self._ctx.Process(
+                target=_engine_main, name="mihoyo-engine", daemon=True,
+                args=(job_spec, self._state.name, self._stop_event, self._stop_ns, self._worker_args, self._log_file))
+            process.start()
+            self._process = process
+            logger.info("Engine process started (pid=%s)", process.pid)
+        except Exception:
+            logger.exception("Engine process failed to start")
+        finally:
+            self._launched.set()
+        if self._process is not None:
+            # 在这里回收子进程，界面线程结束时不必 join
+            self._process.join()
+
+    def isRunning(self) -> bool:
+        return self._running
+
+    def stop(self, requested_ns: int | None = None):
+        if not self._stop_ns.value:
+            self._stop_ns.value = requested_ns or time.perf_counter_ns()
+        logger.info("Engine process stop requested")
+        self._stop_event.set()
+
+    def wait(self, timeout_ms: int | None = None) -> bool:
+        """Block until the engine process exits, then deliver its final state."""
+        if self._launcher is not None:
+            # 启动线程在子进程退出后才结束
+            self._launcher.join(None if timeout_ms is None else timeout_ms / 1000)
+        self._poll()
+        return not self._running
+
+    def _poll(self):
+        if not self._running or not self._launched.is_set():
+            return
+        if self._process is None:
+            self.status_signal.emit("status:stopped")
+            self._finish()
+            return
+        state = self._state.read()
+        self.next_offset = max(self.start_offset, state["next_offset"])
+        if state["total"]:
+            self._total = state["total"]
+        if state["status"] and state["status"] != self._last_status:
+            self._last_status = state["status"]
+            self.status_signal.emit(state["status"])
+        progress = (state["percent"], state["rate"], state["eta"])
+        if state["status"] and progress != self._last_progress:
+            self._last_progress = progress
+            self.progress_signal.emit(*progress)
+        if state["finished"]:
+            self.completed = state["completed"]
+            if state["stop_latency_ms"] >= 0:
+                self.stop_latency_ms = state["stop_latency_ms"]
+            self._finish()
+        elif not self._process.is_alive():
+            logger.error("Engine process exited unexpectedly (code=%s)", self._process.exitcode)
+            self.status_signal.emit("status:stopped")
+            self._finish()
+
+    def _finish(self):
+        self._running = False
+        self._poll_timer.stop()
+        self._state.close(unlink=True)
+        if self._job_shm is not None:
+            self._job_shm.close()
+            self._job_shm.unlink()
+            self._job_shm = None
+        logger.info("Engine process finished (completed=%s, next_offset=%d)", self.completed, self.next_offset)
+        self.finished_signal.emit()
@@ -0,0 +1,161 @@
+# grapheme.py
+"""UAX #29 扩展字素簇切分。
+
+属性表来自 grapheme_tables.py（由 scripts/gen_grapheme_tables.py 从 UCD 生成）。
+切分时先查表把每个码位映射为一个表示其断行类别的 ASCII 字母（有 NumPy 时向量化，否则 str.translate），
+再在这个类别串上跑一个只含单字母字符集的小正则，两步都在 C 中完成；
+直接在大字符集上匹配的正则在 re 中是逐个区间线性比较的，慢一个数量级以上。
+
+规则按 UAX #29 Table 1c 的正则形式表达（含 GB9c 印度系辅音连写与 GB11 emoji ZWJ 序列）；
+Unicode 18 起 GB9c 不再要求连接符前有辅音，只要 Linker [Extend Linker]* 之后即可接辅音。
+"""
+import re
+from array import array
+from itertools import accumulate
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 缺失时用 str.translate 查表，慢几倍但结果相同
+    np = None
+
+import grapheme_tables as tables
+
+UNICODE_VERSION = tables.UNICODE_VERSION
+
+_HANGUL_BASE = 0xAC00
+_HANGUL_LAST = 0xD7A3
+_HANGUL_T_COUNT = 28
+_MAX_CODEPOINT = 0x10FFFF
+
+# 类别字母；各表互不重叠，InCB 的 Extend/Linker 在 _class_table 中再细分
+_CLASS_ORDER = (
+    ("c", tables.CONTROL),
+    ("r", tables.CR),
+    ("n", tables.LF),
+    ("e", tables.EXTEND),
+    ("z", tables.ZWJ),
+    ("R", tables.REGIONAL_INDICATOR),
+    ("p", tables.PREPEND),
+    ("m", tables.SPACING_MARK),
+    ("L", tables.L),
+    ("V", tables.V),
+    ("T", tables.T),
+    ("E", tables.EXTENDED_PICTOGRAPHIC),
+    ("C", tables.INCB_CONSONANT),
+)
+_OTHER = "o"
+
+# 字素簇的正则形式，字母含义：
+#   o 其他  c/r/n Control/CR/LF  e Extend  x Extend 且 InCB=Extend  z ZWJ  m SpacingMark
+#   p Prepend  R 区域指示符  L/V/T/h/H 韩文字母与 LV/LVT 音节  E Extended_Pictographic
+#   C InCB=Consonant  k Extend 且 InCB=Linker  K 其他且 InCB=Linker
+_HANGUL = "L*(?:V+|hV*|H)T*|L+|T+"
+_XPICTO_SEQ = "E(?:[exk]*zE)*"
+# GB9c：连接符及其后的 InCB Extend/Linker 序列之后可以接一个辅音；
+# 该分支优先于普通 postcore，贪婪匹配保证取到最长的合法字素
+_LINKED_CORE = "[kK][xzk]*C?"
+_LINKED_POST = "k[xzk]*(?:C|[exzmk])?"
+_CLUSTER = f"rn|[crn]|p*(?:{_HANGUL}|RR|{_XPICTO_SEQ}|{_LINKED_CORE}|[^crn])(?:{_LINKED_POST}|[exzmk])*"
+CLUSTER_RE = re.compile(_CLUSTER)
+# 只在可能形成多码位字素的位置尝试匹配：首字符本身会与后文合并，或第二个字符是 postcore。
+# 在其余位置 search 直接在 C 中跳过，对应的字素一定只有一个码位
+MULTI_RE = re.compile(f"(?=[rpRLVThHkK]|.[exzmk])(?:{_CLUSTER})")
+# 预扫描：上述两类字母都不出现时每个码位就是一个独立字素，无需再匹配
+_JOINING_RE = re.compile("[rpRLVThHkKexzmk]")
+
+_ASCII_TABLE = {cp: "r" if cp == 0x0D else "n" if cp == 0x0A else "c" if cp < 0x20 or cp == 0x7F else _OTHER
+                for cp in range(0x80)}
+_classes: str | None = None
+_classes_np = None
+
+
+def _class_table() -> str:
+    """码位 -> 类别字母的查找串（首次遇到非 ASCII 文本时构建，约 1.1 MB）。"""
+    global _classes
+    if _classes is None:
+        table = bytearray(_OTHER.encode()) * (_MAX_CODEPOINT + 1)
+        for letter, ranges in _CLASS_ORDER:
+            code = ord(letter)
+            for start, end in ranges:
+                table[start:end + 1] = bytes([code]) * (end - start + 1)
+        # InCB=Extend 只细分 Extend（ZWJ 仍按 ZWJ 处理）；InCB=Linker 中属于 Extend 的
+        # 可出现在字素中间，其余（字母）只能开头
+        for ranges, inside, outside in ((tables.INCB_EXTEND, "x", None), (tables.INCB_LINKER, "k", "K")):
+            for start, end in ranges:
+                for cp in range(start, end + 1):
+                    if table[cp] == ord("e"):
+                        table[cp] = ord(inside)
+                    elif outside:
+                        table[cp] = ord(outside)
+        # LV 音节每 28 个出现一次，其余为 LVT；按算法生成而不是存表
+        hangul = range(_HANGUL_BASE, _HANGUL_LAST + 1)
+        table[_HANGUL_BASE:_HANGUL_LAST + 1] = b"H" * len(hangul)
+        table[_HANGUL_BASE:_HANGUL_LAST + 1:_HANGUL_T_COUNT] = b"h" * len(hangul[::_HANGUL_T_COUNT])
+        _classes = table.decode("latin-1")
+    return _classes
+
+
+def _classify(text: str) -> str | None:
+    """Class string for ``text``, or None when every code point is its own grapheme."""
+    if text.isascii():
+        # 纯 ASCII 只有 CR LF 会合并
+        if "\r" not in text:
+            return None
+        return text.translate(_ASCII_TABLE)
+    if np is not None:
+        global _classes_np
+        if _classes_np is None:
+            _classes_np = np.frombuffer(_class_table().encode("latin-1"), dtype=np.uint8)
+        codepoints = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype="<u4")
+        classes = _classes_np[codepoints].tobytes().decode("latin-1")
+    else:
+        classes = text.translate(_class_table())
+    if _JOINING_RE.search(classes) is None:
+        return None
+    return classes
+
+
+def _multi_spans(text: str):
+    """Yield (start, end) of every grapheme longer than one code point."""
+    classes = _classify(text)
+    if classes is None:
+        return iter(())
+    return (m.span() for m in MULTI_RE.finditer(classes))
+
+
+def grapheme_boundaries(text: str) -> array:
+    """Code point offsets of every grapheme start, plus len(text) as the final entry."""
+    bounds = array("I")
+    pos = 0
+    for start, end in _multi_spans(text):
+        bounds.extend(range(pos, start + 1))
+        pos = end
+    bounds.extend(range(pos, len(text) + 1))
+    return bounds
+
+
+def split_graphemes(text: str) -> list[str]:
+    out: list[str] = []
+    pos = 0
+    for start, end in _multi_spans(text):
+        out.extend(text[pos:start])
+        out.append(text[start:end])
+        pos = end
+    out.extend(text[pos:])
+    return out
+
+
+def iter_graphemes(text: str):
+    pos = 0
+    for start, end in _multi_spans(text):
+        yield from text[pos:start]
+        yield text[start:end]
+        pos = end
+    yield from text[pos:]
+
+
+def count_graphemes(text: str) -> int:
+    count = len(text)
+    for start, end in _multi_spans(text):
+        count -= end - start - 1
+    return count
@@ -0,0 +1,194 @@
+# hotkeys.py
+"""全局热键监听。
+
+RegisterHotKey 传入空窗口句柄时，WM_HOTKEY 会投递到注册它的线程的消息队列；
+Win32HotkeyListener 在专用线程里注册热键并运行一个最小的消息循环，
+不再依赖 MainWindow.nativeEvent，因此界面线程繁忙（设置对话框、大段文本准备）时热键照样即时到达。
+
+每个热键先在监听线程中调用 fast_handler（用于停止等线程安全且需要立即生效的操作），
+再通过 activated 信号排队交给界面线程处理其余逻辑。
+"""
+import ctypes
+import logging
+import queue
+import sys
+import threading
+import time
+from ctypes import wintypes
+
+from PySide6.QtCore import QObject, Signal
+
+import tracing
+from input_backends import load_user32
+
+logger = logging.getLogger(__name__)
+
+WM_QUIT = 0x0012
+WM_HOTKEY = 0x0312
+WM_USER = 0x0400
+# 界面线程请求在监听线程中执行注册/注销
+WM_APP_CALL = 0x8000 + 1
+PM_NOREMOVE = 0x0000
+# 跨线程注册请求的最长等待时间（秒）
+CALL_TIMEOUT_SEC = 1.0
+
+
+class HotkeyListener(QObject):
+    """热键监听接口：register/unregister 可在任意线程调用。
+
+    热键触发时发出 activated(id, 触发时刻 ns, handled)，handled 表示 fast_handler 已在监听线程中处理过这次按键。
+    """
+
+    activated = Signal(int, object, bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 在监听线程中同步调用的处理函数，签名为 (hotkey_id, trigger_ns) -> bool
+        self.fast_handler = None
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def register(self, hotkey_id: int, vk: int, modifiers: int = 0) -> bool:
+        raise NotImplementedError
+
+    def unregister(self, hotkey_id: int) -> bool:
+        raise NotImplementedError
+
+    def _dispatch(self, hotkey_id: int):
+        trigger_ns = time.perf_counter_ns()
+        handler = self.fast_handler
+        handled = False
+        if handler is not None:
+            try:
+                handled = bool(handler(hotkey_id, trigger_ns))
+            except Exception:
+                logger.exception("Hotkey fast handler failed for id=%d", hotkey_id)
+        tr = tracing.tracer
+        if tr is not None:
+            tr.name_thread("HotkeyListener")
+            tr.complete("hotkey", trigger_ns, time.perf_counter_ns(), hotkey_id)
+        self.activated.emit(hotkey_id, trigger_ns, handled)
+
+
+class Win32HotkeyListener(HotkeyListener):
+    """专用线程 + GetMessageW 消息循环；注册与注销都转发到该线程执行。"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._thread = threading.Thread(target=self._run, name="HotkeyListener", daemon=True)
+        self._requests: queue.Queue = queue.Queue()
+        self._ready = threading.Event()
+        self._thread_id = 0
+        self._registered: set[int] = set()
+
+    def start(self):
+        if not self._thread.is_alive():
+            self._thread.start()
+            self._ready.wait(CALL_TIMEOUT_SEC)
+
+    def stop(self):
+        if self._thread.is_alive() and self._thread_id:
+            load_user32().PostThreadMessageW(self._thread_id, WM_QUIT, 0, 0)
+            self._thread.join(CALL_TIMEOUT_SEC)
+
+    def register(self, hotkey_id: int, vk: int, modifiers: int = 0) -> bool:
+        return bool(self._call(self._register, hotkey_id, vk, modifiers))
+
+    def unregister(self, hotkey_id: int) -> bool:
+        return bool(self._call(self._unregister, hotkey_id))
+
+    def _register(self, hotkey_id: int, vk: int, modifiers: int) -> bool:
+        ok = bool(load_user32().RegisterHotKey(None, hotkey_id, modifiers, vk))
+        if ok:
+            self._registered.add(hotkey_id)
+        return ok
+
+    def _unregister(self, hotkey_id: int) -> bool:
+        self._registered.discard(hotkey_id)
+        return bool(load_user32().UnregisterHotKey(None, hotkey_id))
+
+    def _call(self, func, *args):
+        """Run ``func`` on the listener thread (hotkeys belong to the registering thread)."""
+        if threading.current_thread() is self._thread:
+            return func(*args)
+        if not self._thread.is_alive():
+            logger.warning("Hotkey listener is not running")
+            return False
+        done = threading.Event()
+        box = []
+        self._requests.put((func, args, box, done))
+        load_user32().PostThreadMessageW(self._thread_id, WM_APP_CALL, 0, 0)
+        if not done.wait(CALL_TIMEOUT_SEC):
+            logger.warning("Hotkey listener did not answer %s", func.__name__)
+            return False
+        return box[0] if box else False
+
+    def _drain_requests(self):
+        while True:
+            try:
+                func, args, box, done = self._requests.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                box.append(func(*args))
+            except OSError:
+                logger.exception("Hotkey request %s failed", func.__name__)
+            finally:
+                done.set()
+
+    def _run(self):
+        user32 = load_user32()
+        msg = wintypes.MSG()
+        # 先取一次消息以创建本线程的消息队列，之后 PostThreadMessageW 才能投递
+        user32.PeekMessageW(ctypes.byref(msg), None, WM_USER, WM_USER, PM_NOREMOVE)
+        self._thread_id = ctypes.windll.kernel32.GetCurrentThreadId()
+        self._ready.set()
+        try:
+            while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                if msg.message == WM_HOTKEY:
+                    self._dispatch(int(msg.wParam))
+                elif msg.message == WM_APP_CALL:
+                    self._drain_requests()
+        finally:
+            for hotkey_id in list(self._registered):
+                self._unregister(hotkey_id)
+            self._drain_requests()
+
+
+class FakeHotkeyListener(HotkeyListener):
+    """测试与非 Windows 平台使用：只记录注册表，press() 模拟按下热键。"""
+
+    def __init__(self, parent=None, fail_ids=()):
+        super().__init__(parent)
+        self.registered: dict[int, tuple[int, int]] = {}
+        # 注册这些 id 时返回失败，用于模拟热键冲突
+        self.fail_ids = set(fail_ids)
+
+    def register(self, hotkey_id: int, vk: int, modifiers: int = 0) -> bool:
+        if hotkey_id in self.fail_ids:
+            return False
+        self.registered[hotkey_id] = (vk, modifiers)
+        return True
+
+    def unregister(self, hotkey_id: int) -> bool:
+        return self.registered.pop(hotkey_id, None) is not None
+
+    def press(self, hotkey_id: int, blocking: bool = True):
+        """Simulate a hotkey press from a separate thread, like the real listener."""
+        if hotkey_id not in self.registered:
+            return
+        thread = threading.Thread(target=self._dispatch, args=(hotkey_id,), name="FakeHotkey")
+        thread.start()
+        if blocking:
+            thread.join()
+
+
+def create_hotkey_listener(parent=None) -> HotkeyListener:
+    """Win32 listener on Windows, a no-op fake elsewhere."""
+    if sys.platform == "win32":
+        return Win32HotkeyListener(parent)
+    return FakeHotkeyListener(parent)
@@ -0,0 +1,65 @@
+# icon_cache.py
+"""按 (图标名, 颜色, 尺寸, 设备像素比) 缓存栅格化后的图标。
+
+状态切换（开始、暂停、置顶）时界面会反复设置按钮图标；缓存命中时不访问磁盘、不解析 SVG、不绘制。
+SVG 缺失时的备用图标由调用方传入的工厂函数按需绘制，只在真正需要时调用一次。
+"""
+from collections.abc import Callable
+
+from PySide6.QtCore import QBuffer, QByteArray, QSize
+from PySide6.QtGui import QColor, QIcon, QImageReader, QPixmap
+
+
+def icon_from_data(data: bytes, size: int | None = None, dpr: float = 1.0) -> QIcon:
+    """Decode an in-memory image (every frame of an .ico; SVG rendered at ``size`` * ``dpr``)."""
+    buffer = QBuffer()
+    buffer.setData(QByteArray(data))
+    buffer.open(QBuffer.OpenModeFlag.ReadOnly)
+    reader = QImageReader(buffer)
+    if size is not None:
+        reader.setScaledSize(QSize(round(size * dpr), round(size * dpr)))
+    icon = QIcon()
+    while True:
+        image = reader.read()
+        if image.isNull():
+            break
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(dpr)
+        icon.addPixmap(pixmap)
+        if not reader.jumpToNextImage():
+            break
+    return icon
+
+
+class IconCache:
+    """所有窗口共用的图标缓存；结果在第一次请求时栅格化。"""
+
+    def __init__(self, load: Callable[[str], bytes | None]):
+        # load(文件名) -> SVG 内容，找不到时返回 None
+        self._load = load
+        self._icons: dict[tuple, QIcon] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, filename: str, color: QColor, size: int, dpr: float,
+            fallback: Callable[[], QIcon] | None = None) -> QIcon:
+        """Icon ``filename`` rasterized at ``size`` logical pixels for ``dpr``."""
+        key = (filename, QColor(color).rgba(), size, dpr)
+        icon = self._icons.get(key)
+        if icon is not None:
+            self.hits += 1
+            return icon
+        self.misses += 1
+        data = self._load(filename)
+        icon = icon_from_data(data, size, dpr) if data is not None else QIcon()
+        if icon.isNull() and fallback is not None:
+            source = fallback()
+            icon = QIcon(source.pixmap(QSize(size, size), dpr)) if not source.isNull() else source
+        self._icons[key] = icon
+        return icon
+
+    def clear(self):
+        self._icons.clear()
+
+    def __len__(self) -> int:
+        return len(self._icons)
@@ -0,0 +1,294 @@
+# input_backends.py
+import os
+import sys
+import ctypes
+import ctypes.util
+import logging
+from array import array
+from ctypes import wintypes, Structure, Union, c_ulong, c_uint64, sizeof, c_int, c_uint, c_long, c_void_p
+
+# 指针长度适配
+ULONG_PTR = c_uint64 if sizeof(ctypes.c_void_p) == 8 else c_ulong
+logger = logging.getLogger(__name__)
+
+INPUT_KEYBOARD = 1
+KEYEVENTF_KEYUP = 0x0002
+KEYEVENTF_UNICODE = 0x0004
+VK_RETURN = 0x0D
+
+# 未显式指定时可通过环境变量选择后端
+BACKEND_ENV = "MIHOYO_INPUT_BACKEND"
+
+
+class KEYBDINPUT(Structure):
+    _fields_ = [("wVk", wintypes.WORD), ("wScan", wintypes.WORD),
+                ("dwFlags", wintypes.DWORD), ("time", wintypes.DWORD),
+                ("dwExtraInfo", ULONG_PTR)]
+
+
+class MOUSEINPUT(Structure):
+    _fields_ = [("dx", c_long), ("dy", c_long),
+                ("mouseData", wintypes.DWORD), ("dwFlags", wintypes.DWORD),
+                ("time", wintypes.DWORD), ("dwExtraInfo", ULONG_PTR)]
+
+
+class HARDWAREINPUT(Structure):
+    _fields_ = [("uMsg", wintypes.DWORD), ("wParamL", wintypes.WORD), ("wParamH", wintypes.WORD)]
+
+
+class INPUT_UNION(Union):
+    _fields_ = [("ki", KEYBDINPUT), ("mi", MOUSEINPUT), ("hi", HARDWAREINPUT)]
+
+
+class INPUT(Structure):
+    _anonymous_ = ("_input",)
+    _fields_ = [("type", wintypes.DWORD), ("_input", INPUT_UNION)]
+
+
+INPUT_SIZE = sizeof(INPUT)
+
+_user32 = None
+
+
+def load_user32():
+    """Load user32 on first use so the module imports on every platform."""
+    global _user32
+    if _user32 is None:
+        user32 = ctypes.windll.user32
+        # 第二个参数按裸地址传递，便于直接把预编译缓冲区的切片交给 SendInput
+        user32.SendInput.argtypes = [c_uint, c_void_p, c_int]
+        user32.SendInput.restype = c_uint
+        user32.SetWindowPos.argtypes = [wintypes.HWND, wintypes.HWND, c_int, c_int, c_int, c_int, c_uint]
+        user32.SetWindowPos.restype = wintypes.BOOL
+        _user32 = user32
+    return _user32
+
+
+class InputBackend:
+    """输入后端接口：把预编译 INPUT 数组中的一段事件注入目标系统。"""
+
+    name = "base"
+
+    def send(self, events, first: int, count: int) -> int:
+        """Inject events[first:first + count]; return how many events were accepted."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class Win32Backend(InputBackend):
+    """SendInput 后端，直接按地址发送缓冲区切片。"""
+
+    name = "win32"
+
+    def __init__(self):
+        self._send_input = load_user32().SendInput
+
+    def send(self, events, first: int, count: int) -> int:
+        if count <= 0:
+            return 0
+        return self._send_input(count, ctypes.addressof(events) + first * INPUT_SIZE, INPUT_SIZE)
+
+
+class RecordingBackend(InputBackend):
+    """内存录制后端：不注入系统，只记录 (vk, scan, flags)，用于测试和跨平台基准。"""
+
+    name = "recording"
+
+    def __init__(self, record: bool = True):
+        self.record = record
+        self.events: list[tuple[int, int, int]] = []
+        self.calls = 0
+
+    def send(self, events, first: int, count: int) -> int:
+        if count <= 0:
+            return 0
+        self.calls += 1
+        if self.record:
+            for i in range(first, first + count):
+                ki = events[i].ki
+                self.events.append((ki.wVk, ki.wScan, ki.dwFlags))
+        return count
+
+    def text(self) -> str:
+        """Reconstruct the typed text from recorded key-down events."""
+        units = []
+        for vk, scan, flags in self.events:
+            if flags & KEYEVENTF_KEYUP:
+                continue
+            if flags & KEYEVENTF_UNICODE:
+                units.append(scan)
+            elif vk == VK_RETURN:
+                units.append(0x0A)
+        data = array("H", units)
+        if sys.byteorder != "little":
+            data.byteswap()
+        return data.tobytes().decode("utf-16-le", "replace")
+
+
+class X11Backend(InputBackend):
+    """X11 XTest 后端。
+
+    任意 Unicode 字符通过把一个空闲 keycode 临时映射到对应 keysym 后按下实现
+    （与 xdotool 相同做法）；uinput 只能发送物理键码，无法直接输入任意字符。
+    """
+
+    name = "x11"
+    XK_RETURN = 0xFF0D
+    # 控制字符没有对应的 Latin-1 keysym，需映射到功能键
+    CONTROL_KEYSYMS = {
+        0x08: 0xFF08,  # BackSpace
+        0x09: 0xFF09,  # Tab
+        0x0A: 0xFF0D,  # Return
+        0x0D: 0xFF0D,  # Return
+        0x1B: 0xFF1B,  # Escape
+        0x7F: 0xFFFF,  # Delete
+    }
+
+    def __init__(self, display: str | None = None):
+        x11_path = ctypes.util.find_library("X11")
+        xtst_path = ctypes.util.find_library("Xtst")
+        if not x11_path or not xtst_path:
+            raise OSError("libX11/libXtst not found")
+        self._x11 = ctypes.CDLL(x11_path)
+        self._xtst = ctypes.CDLL(xtst_path)
+        self._x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self._x11.XOpenDisplay.restype = c_void_p
+        self._x11.XKeysymToKeycode.argtypes = [c_void_p, c_ulong]
+        self._x11.XKeysymToKeycode.restype = ctypes.c_ubyte
+        self._x11.XkbKeycodeToKeysym.argtypes = [c_void_p, ctypes.c_ubyte, c_int, c_int]
+        self._x11.XkbKeycodeToKeysym.restype = c_ulong
+        self._x11.XChangeKeyboardMapping.argtypes = [c_void_p, c_int, c_int, ctypes.POINTER(c_ulong), c_int]
+        self._x11.XDisplayKeycodes.argtypes = [c_void_p, ctypes.POINTER(c_int), ctypes.POINTER(c_int)]
+        self._x11.XGetKeyboardMapping.argtypes = [c_void_p, ctypes.c_ubyte, c_int, ctypes.POINTER(c_int)]
+        self._x11.XGetKeyboardMapping.restype = ctypes.POINTER(c_ulong)
+        self._x11.XFree.argtypes = [c_void_p]
+        self._x11.XSync.argtypes = [c_void_p, c_int]
+        self._x11.XFlush.argtypes = [c_void_p]
+        self._x11.XCloseDisplay.argtypes = [c_void_p]
+        self._xtst.XTestFakeKeyEvent.argtypes = [c_void_p, c_uint, c_int, c_ulong]
+
+        self._display = self._x11.XOpenDisplay(display.encode() if display else None)
+        if not self._display:
+            raise OSError("cannot open X display")
+        # 借用的键码原来的 keysym，close() 时恢复，避免退出后用户键盘映射被改动
+        self._scratch, self._scratch_original = self._find_scratch_keycode()
+        self._scratch_keysym = 0
+        self._pending_high = 0
+        # 上一个字符是否为 \r，用于把 \r\n 合并为一次回车
+        self._after_cr = False
+
+    def _find_scratch_keycode(self) -> tuple[int, list[int]]:
+        min_kc, max_kc = c_int(), c_int()
+        self._x11.XDisplayKeycodes(self._display, ctypes.byref(min_kc), ctypes.byref(max_kc))
+        count = max_kc.value - min_kc.value + 1
+        per = c_int()
+        mapping = self._x11.XGetKeyboardMapping(self._display, min_kc.value, count, ctypes.byref(per))
+        try:
+            for idx in range(count - 1, -1, -1):
+                base = idx * per.value
+                if not any(mapping[base + j] for j in range(per.value)):
+                    return min_kc.value + idx, [0] * per.value
+            # 没有空闲键码时借用最后一个
+            base = (count - 1) * per.value
+            return max_kc.value, [mapping[base + j] for j in range(per.value)]
+        finally:
+            self._x11.XFree(mapping)
+
+    @classmethod
+    def keysym_for(cls, codepoint: int) -> int | None:
+        """X keysym that types ``codepoint`` (None for control characters without a key)."""
+        if codepoint in cls.CONTROL_KEYSYMS:
+            return cls.CONTROL_KEYSYMS[codepoint]
+        if codepoint < 0x20 or 0x7F <= codepoint < 0xA0:
+            return None
+        if codepoint < 0x100:
+            return codepoint
+        return 0x01000000 | codepoint
+
+    def _tap(self, keysym: int):
+        keycode = self._x11.XKeysymToKeycode(self._display, keysym)
+        if not keycode or self._x11.XkbKeycodeToKeysym(self._display, keycode, 0, 0) != keysym:
+            # 未映射或需要 Shift 等修饰键的字符：重映射空闲键码，避免处理修饰键状态
+            if self._scratch_keysym != keysym:
+                syms = (c_ulong * 1)(keysym)
+                self._x11.XChangeKeyboardMapping(self._display, self._scratch, 1, syms, 1)
+                self._x11.XSync(self._display, 0)
+                self._scratch_keysym = keysym
+            keycode = self._scratch
+        self._xtst.XTestFakeKeyEvent(self._display, keycode, 1, 0)
+        self._xtst.XTestFakeKeyEvent(self._display, keycode, 0, 0)
+        if keycode == self._scratch:
+            # 下次重映射前确保目标客户端已按当前映射处理了该按键
+            self._x11.XSync(self._display, 0)
+
+    def send(self, events, first: int, count: int) -> int:
+        if count <= 0:
+            return 0
+        for i in range(first, first + count):
+            ki = events[i].ki
+            flags = ki.dwFlags
+            if flags & KEYEVENTF_KEYUP:
+                continue
+            if flags & KEYEVENTF_UNICODE:
+                unit = ki.wScan
+                if 0xD800 <= unit < 0xDC00:
+                    self._pending_high = unit
+                    continue
+                if 0xDC00 <= unit < 0xE000 and self._pending_high:
+                    codepoint = 0x10000 + ((self._pending_high - 0xD800) << 10) + (unit - 0xDC00)
+                    self._pending_high = 0
+                else:
+                    codepoint = unit
+                after_cr, self._after_cr = self._after_cr, codepoint == 0x0D
+                if codepoint == 0x0A and after_cr:
+                    continue
+                keysym = self.keysym_for(codepoint)
+                if keysym is not None:
+                    self._tap(keysym)
+            elif ki.wVk == VK_RETURN:
+                self._after_cr = False
+                self._tap(self.XK_RETURN)
+        self._x11.XFlush(self._display)
+        return count
+
+    def close(self):
+        if self._display:
+            if self._scratch_keysym:
+                original = (c_ulong * len(self._scratch_original))(*self._scratch_original)
+                self._x11.XChangeKeyboardMapping(self._display, self._scratch, len(self._scratch_original),
+                                                 original, 1)
+                self._x11.XSync(self._display, 0)
+                self._scratch_keysym = 0
+            self._x11.XCloseDisplay(self._display)
+            self._display = None
+
+
+BACKENDS = {
+    Win32Backend.name: Win32Backend,
+    X11Backend.name: X11Backend,
+    RecordingBackend.name: RecordingBackend,
+}
+
+
+def create_backend(name: str | None = None) -> InputBackend:
+    """按名称创建后端；auto 时 Windows 用 SendInput，其他平台用 X11。
+
+    录制后端只在显式指定名称时使用：自动退回到它会让任务显示完成却什么也没输入。
+    """
+    name = (name or os.getenv(BACKEND_ENV) or "auto").lower()
+    if name != "auto":
+        backend_cls = BACKENDS.get(name)
+        if backend_cls is None:
+            raise ValueError(f"unknown input backend: {name}")
+        return backend_cls()
+
+    if sys.platform == "win32":
+        return Win32Backend()
+    if not os.getenv("DISPLAY"):
+        raise OSError("no input backend available: DISPLAY is not set (use --backend recording for a dry run)")
+    try:
+        return X11Backend()
+    except OSError as exc:
+        raise OSError(f"X11 input backend unavailable: {exc}") from exc
@@ -3,6 +3,7 @@ import subprocess
 import ctypes
 import logging
 import argparse
+import multiprocessing
 from pathlib import Path
 
 try:
@@ -12,9 +13,15 @@ except ImportError:
     sys.exit(1)
 
 from PySide6.QtWidgets import QApplication
+import profiling
+import tracing
+from assets import default_index, write_pack
 from core_engine import WinSystem
-from config import APP_ID, setup_logging
+from config import APP_ID, DEFAULT_RHYTHM, LOG_FILE, METRICS_FILE_NAME, TRACE_CAPACITY, setup_logging
 from main_window import MainWindow
+from metrics import format_summary, read_summaries
+from plan_file import PlanFile, PlanFileError, write_plan_file
+from rhythm import DelaySchedule
 
 
 logger = logging.getLogger(__name__)
@@ -24,31 +31,115 @@ def parse_args(argv):
     parser = argparse.ArgumentParser(description="miHoYo Tool")
     parser.add_argument("--base-ms", type=int, help="默认基础延迟 (毫秒)")
     parser.add_argument("--random-ms", type=int, help="默认随机浮动延迟 (毫秒)")
+    parser.add_argument("--burst-size", type=int, help="零延迟时每次发送的最大字素数 (1 为关闭突发模式)")
+    parser.add_argument("--burst-events", type=int, help="零延迟时每次发送的最大事件数")
+    parser.add_argument("--rhythm", choices=["uniform", "lognormal", "natural"], help="延迟分布")
+    parser.add_argument("--seed", type=int, help="延迟随机种子，便于复现同一节奏")
+    parser.add_argument("--backend", choices=["auto", "win32", "x11", "recording"],
+                        help="输入后端 (默认 auto：Windows 使用 SendInput)")
+    parser.add_argument("--prearm", action="store_true", help="剪贴板变化时预先准备任务，缩短热键到首次输入的延迟")
+    parser.add_argument("--plan-cache-mb", type=int, help="输入计划缓存上限 (MB，0 为关闭)")
+    parser.add_argument("--compile-plan", nargs=2, metavar=("SRC", "DST"),
+                        help="把 UTF-8 文本文件编译为计划文件后退出（指定延迟参数时一并写入延迟）")
+    parser.add_argument("--pack-assets", type=str, metavar="DST",
+                        help="把 svg/、assets/ 与 icon.ico 打包为单个资源文件后退出（放在程序目录下即优先载入）")
+    parser.add_argument("--plan", type=str, help="输入已编译的计划文件而不是剪贴板")
+    parser.add_argument("--no-effects", action="store_true", help="关闭窗口阴影与半透明背景，降低重绘开销")
+    parser.add_argument("--isolated-engine", action="store_true", help="在独立进程中运行输入引擎，避免界面卡顿影响按键节奏")
+    parser.add_argument("--show-metrics", type=int, nargs="?", const=10, metavar="N",
+                        help="打印最近 N 个任务的输入指标 (默认 10) 后退出")
+    parser.add_argument("--trace", type=str, metavar="FILE",
+                        help="记录输入时间线，退出时写入 Chrome/Perfetto trace JSON (chrome://tracing 或 ui.perfetto.dev 打开)")
+    parser.add_argument("--trace-capacity", type=int, default=TRACE_CAPACITY, metavar="N",
+                        help=f"追踪缓冲区保留的最近事件数 (默认 {TRACE_CAPACITY})")
+    parser.add_argument("--profile", nargs="?", const="cprofile", choices=profiling.MODES,
+                        help="分别剖析输入线程与界面线程，退出时在日志目录写出 .prof (cprofile，默认) "
+                             "或折叠栈 .collapsed (sample)")
     parser.add_argument("--log-file", type=str, help="自定义日志文件路径")
     return parser.parse_args(argv)
 
 
 def main():
     args = parse_args(sys.argv[1:])
+    metrics_file = (Path(args.log_file) if args.log_file else LOG_FILE).with_name(METRICS_FILE_NAME)
+    if args.show_metrics is not None:
+        summaries = read_summaries(metrics_file, args.show_metrics)
+        print("\n".join(map(format_summary, summaries)) if summaries else f"No metrics in {metrics_file}")
+        return
+
     log_file = setup_logging(Path(args.log_file) if args.log_file else None)
     logger.info("Launching miHoYo Tool (log at %s)", log_file)
 
+    if args.compile_plan:
+        # 编译计划文件不需要管理员权限与界面
+        src, dst = args.compile_plan
+        schedule = None
+        if args.base_ms or args.random_ms:
+            schedule = DelaySchedule(args.base_ms or 0, args.random_ms or 0, args.rhythm or DEFAULT_RHYTHM, args.seed)
+        write_plan_file(Path(src).read_text(encoding="utf-8"), dst, schedule)
+        return
+
+    assets = default_index()
+    logger.info("Asset index: %d files, %d bytes from %s", len(assets), assets.total_bytes, assets.source)
+    if args.pack_assets:
+        logger.info("Packed %d assets into %s", write_pack(assets, args.pack_assets), args.pack_assets)
+        return
+
+    plan = None
+    if args.plan:
+        try:
+            plan = PlanFile(args.plan)
+        except (OSError, PlanFileError) as exc:
+            logger.error("Cannot open plan file: %s", exc)
+            sys.exit(1)
+
     # 确保任务栏图标独立显示
     WinSystem.set_app_id(APP_ID)
 
-    if not WinSystem.is_user_an_admin():
+    # 提权只在 Windows 上有意义；其他平台（例如 --backend x11）直接运行
+    if sys.platform == "win32" and not WinSystem.is_user_an_admin():
         logger.warning("Elevating to administrator for hotkey and input APIs")
         # list2cmdline 保留包含空格的路径/参数
         params = subprocess.list2cmdline(sys.argv)
         ctypes.windll.shell32.ShellExecuteW(None, "runas", sys.executable, params, None, 1)
         sys.exit()
 
+    if args.trace:
+        if args.isolated_engine:
+            logger.warning("--trace only records this process; the isolated engine is not traced")
+        tracing.enable(args.trace_capacity).name_thread("UI")
+    if args.profile:
+        if args.isolated_engine:
+            logger.warning("--profile only covers this process; the isolated engine is not profiled")
+        profiling.enable(args.profile).attach("UI")
+
     app = QApplication(sys.argv)
-    window = MainWindow(base_override=args.base_ms, random_override=args.random_ms)
+    window = MainWindow(base_override=args.base_ms, random_override=args.random_ms,
+                        burst_graphemes=args.burst_size, burst_max_events=args.burst_events,
+                        backend=args.backend, rhythm=args.rhythm, seed=args.seed, prearm=args.prearm,
+                        plan_cache_bytes=None if args.plan_cache_mb is None else args.plan_cache_mb * 1024 * 1024,
+                        plan_file=plan, isolated_engine=args.isolated_engine, metrics_file=metrics_file,
+                        effects=not args.no_effects)
     window.show()
 
-    sys.exit(app.exec())
+    code = app.exec()
+    if profiling.profiler is not None:
+        profiling.profiler.detach("UI")
+        try:
+            for path in profiling.profiler.write(log_file.parent):
+                logger.info("Profile written to %s", path)
+        except OSError as exc:
+            logger.warning("Cannot write profile to %s: %s", log_file.parent, exc)
+    if tracing.tracer is not None:
+        try:
+            count = tracing.tracer.write(args.trace)
+            logger.info("Trace written to %s (%d events, %d recorded)", args.trace, count, tracing.tracer.recorded)
+        except OSError as exc:
+            logger.warning("Cannot write trace to %s: %s", args.trace, exc)
+    sys.exit(code)
 
 
 if __name__ == "__main__":
+    # 打包后的可执行文件也能以 spawn 方式启动引擎子进程
+    multiprocessing.freeze_support()
     main()
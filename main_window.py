@@ -1,15 +1,13 @@
 # main_window.py
 import sys
-import os
+import time
 import logging
-from pathlib import Path
-from ctypes import wintypes
 
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
                                QLabel, QLineEdit, QProgressBar, QPushButton, QApplication, QMessageBox,
                                QDialog, QDialogButtonBox, QFormLayout, QGraphicsDropShadowEffect, QFrame,
                                QSizePolicy)
-from PySide6.QtCore import Qt, QPoint, QSettings, Signal, QTimer, QSize
+from PySide6.QtCore import Qt, QEvent, QPoint, QSettings, Signal, QTimer, QSize
 from PySide6.QtGui import QKeySequence, QIcon, QPixmap, QPainter, QColor, QPen, QPainterPath, QTransform
 
 # 引入你的本地模块
@@ -17,12 +15,24 @@ from config import (
     DEFAULT_BASE_DELAY_MS,
     DEFAULT_RANDOM_DELAY_MS,
     DEFAULT_COUNTDOWN_SEC,
+    DEFAULT_BURST_GRAPHEMES,
+    DEFAULT_BURST_MAX_EVENTS,
+    DEFAULT_RHYTHM,
     DEFAULT_START_HOTKEY,
     DEFAULT_CONTINUE_HOTKEY,
+    PLAN_CACHE_MAX_BYTES,
 )
 from styles import THEMES
 from ui_texts import LANGS, get_text
-from core_engine import WinSystem, PasteWorker, InputSimulator
+from core_engine import WinSystem, PasteWorker, JobPreparer
+from clipboard_watcher import ClipboardWatcher
+from engine_process import ProcessPasteWorker
+from hotkeys import HotkeyListener, create_hotkey_listener
+from assets import default_index
+from icon_cache import IconCache, icon_from_data
+from plan_cache import PlanCache
+from typing_job import StreamingJob, TypingJob
+import tracing
 from components import ToggleSwitch  # <--- 必须导入这个新组件
 
 logger = logging.getLogger(__name__)
@@ -122,7 +132,7 @@ class SettingsDialog(QDialog):
     """
 
     def __init__(self, parent, lang: str, theme: str, base_delay: int, random_delay: int, countdown_seconds: int,
-                 start_hotkey: tuple, continue_hotkey: tuple):
+                 start_hotkey: tuple, continue_hotkey: tuple, effects: bool = True):
         super().__init__(parent)
         self.parent_ref = parent
         self.lang = lang
@@ -132,23 +142,26 @@ class SettingsDialog(QDialog):
 
         # 1. 设置无边框和透明背景，为了显示阴影
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint | Qt.WindowType.Dialog)
-        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        if effects:
+            self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
         self.resize(340, 500)
 
         # 主布局
         main_layout = QVBoxLayout(self)
-        main_layout.setContentsMargins(10, 10, 10, 10)  # 留出阴影空间
+        margin = 10 if effects else 0
+        main_layout.setContentsMargins(margin, margin, margin, margin)  # 留出阴影空间
 
         # 2. 背景容器 (模拟圆角卡片)
         self.container = QWidget()
         self.container.setObjectName("SettingsContainer")
 
         # 添加阴影
-        shadow = QGraphicsDropShadowEffect(self)
-        shadow.setBlurRadius(30)
-        shadow.setColor(QColor(0, 0, 0, 40))
-        shadow.setOffset(0, 8)
-        self.container.setGraphicsEffect(shadow)
+        if effects:
+            shadow = QGraphicsDropShadowEffect(self)
+            shadow.setBlurRadius(30)
+            shadow.setColor(QColor(0, 0, 0, 40))
+            shadow.setOffset(0, 8)
+            self.container.setGraphicsEffect(shadow)
 
         main_layout.addWidget(self.container)
 
@@ -482,17 +495,32 @@ class SettingsDialog(QDialog):
 class MainWindow(QMainWindow):
     HK_START = 101
     HK_CONTINUE = 102
-
-    def __init__(self, base_override: int | None = None, random_override: int | None = None):
+    # 按钮图标的逻辑尺寸 (px)
+    ICON_SIZE = 20
+    # 所有窗口共用；状态切换时设置图标只是一次字典查找
+    icons = IconCache(lambda filename: default_index().get("svg", filename))
+    _window_icon: QIcon | None = None
+
+    def __init__(self, base_override: int | None = None, random_override: int | None = None,
+                 burst_graphemes: int | None = None, burst_max_events: int | None = None,
+                 backend: str | None = None, rhythm: str | None = None, seed: int | None = None,
+                 prearm: bool = False, plan_cache_bytes: int | None = None, plan_file=None,
+                 isolated_engine: bool = False, hotkeys: HotkeyListener | None = None, metrics_file=None,
+                 effects: bool = True):
         super().__init__()
         self.lang = "zh"
         self.theme = "light"
         self.always_on_top = False
         self.base_override = base_override
         self.random_override = random_override
-        self.pending_total = 0
+        self.burst_graphemes = burst_graphemes if burst_graphemes is not None else DEFAULT_BURST_GRAPHEMES
+        self.burst_max_events = burst_max_events if burst_max_events is not None else DEFAULT_BURST_MAX_EVENTS
+        self.backend_name = backend
+        self.rhythm = rhythm or DEFAULT_RHYTHM
+        self.seed = seed
         self.countdown_seconds = DEFAULT_COUNTDOWN_SEC
-        self.pending_text = ""
+        # 当前/可续打的任务；与 PasteWorker 共享同一个任务对象
+        self.pending_job: TypingJob | StreamingJob | None = None
         self.pending_offset = 0
         self._hold_finish = False
 
@@ -501,9 +529,35 @@ class MainWindow(QMainWindow):
         self._spinner_index = 0
         self._spinner_active = False
         self.worker = None
+        # 后台准备任务（规范化 + 切分）的线程，完成前 worker 不会启动
+        self.preparer: JobPreparer | None = None
+        self._trigger_ns: int | None = None
+        # 重复输入同一段文本时复用切分结果与输入计划
+        cache_bytes = PLAN_CACHE_MAX_BYTES if plan_cache_bytes is None else plan_cache_bytes
+        self.plan_cache = PlanCache(cache_bytes) if cache_bytes > 0 else None
+        # 可选：剪贴板变化时预先准备任务，热键只需启动
+        self.clipboard_watcher = ClipboardWatcher(QApplication.clipboard(), cache=self.plan_cache,
+                                                  parent=self) if prearm else None
+        # 指定了已编译的计划文件时，开始热键输入该文件而不是剪贴板
+        self.plan_file = plan_file
+        # 输入循环放到独立进程中，不与界面共享 GIL
+        self.isolated_engine = isolated_engine
+        # 每个任务结束后把输入指标汇总追加到该文件
+        self.metrics_file = metrics_file
+        # 阴影与半透明背景让每次重绘都要整窗合成，低配机器上可以关闭
+        self.effects = effects
+        # 窗口最小化或隐藏时暂停动画定时器，恢复时一次性追上最新进度
+        self._ui_suspended = False
+        self._pending_progress_detail: tuple[float, float] | None = None
         self._progress_target = 0
         self._progress_timer = QTimer(self)
         self._progress_timer.timeout.connect(self._tick_progress)
+        # 热键在专用线程中监听；停止在该线程里立即生效，其余操作排队到界面线程
+        self._hotkey_trigger_ns: int | None = None
+        self.hotkeys = hotkeys or create_hotkey_listener(self)
+        self.hotkeys.fast_handler = self._on_hotkey_fast
+        self.hotkeys.activated.connect(self._on_hotkey)
+        self.hotkeys.start()
 
         self._init_window()
         self._setup_ui()
@@ -517,15 +571,20 @@ class MainWindow(QMainWindow):
         self.resize(340, 240)
         self.setWindowFlags(
             Qt.WindowType.FramelessWindowHint | Qt.WindowType.WindowSystemMenuHint | Qt.WindowType.WindowMinimizeButtonHint)
-        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
-        if os.path.exists("icon.ico"):
-            self.setWindowIcon(QIcon("icon.ico"))
+        if self.effects:
+            self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
+        if MainWindow._window_icon is None:
+            icon_data = default_index().get("icon.ico")
+            MainWindow._window_icon = icon_from_data(icon_data) if icon_data else QIcon()
+        if not MainWindow._window_icon.isNull():
+            self.setWindowIcon(MainWindow._window_icon)
 
     def _setup_ui(self):
         # 外层容器用于给阴影留出空间
         container = QWidget()
         container_layout = QVBoxLayout(container)
-        container_layout.setContentsMargins(12, 12, 12, 12)
+        margin = 12 if self.effects else 0
+        container_layout.setContentsMargins(margin, margin, margin, margin)
         container_layout.setSpacing(0)
 
         self.main_widget = QWidget()
@@ -538,11 +597,12 @@ class MainWindow(QMainWindow):
         layout.setSpacing(12)
 
         # 阴影效果
-        shadow = QGraphicsDropShadowEffect(self)
-        shadow.setBlurRadius(40)
-        shadow.setOffset(0, 8)
-        shadow.setColor(QColor(0, 0, 0, 30))
-        self.main_widget.setGraphicsEffect(shadow)
+        if self.effects:
+            shadow = QGraphicsDropShadowEffect(self)
+            shadow.setBlurRadius(40)
+            shadow.setOffset(0, 8)
+            shadow.setColor(QColor(0, 0, 0, 30))
+            self.main_widget.setGraphicsEffect(shadow)
 
         self._create_title_bar(layout)
 
@@ -743,47 +803,25 @@ class MainWindow(QMainWindow):
         painter.end()
         return QIcon(pm)
 
-    def _load_svg_icon(self, filename: str, fallback: QIcon | None = None) -> QIcon:
-        path = self._resolve_asset_path("svg", filename)
-        if path and path.exists():
-            return QIcon(str(path))
-        return fallback or QIcon()
-
-    def _resolve_asset_path(self, *parts: str) -> Path | None:
-        """Find asset path that works both in source and Nuitka onefile."""
-        # Nuitka onefile payload extraction directory
-        onefile_temp = os.environ.get("NUITKA_ONEFILE_TEMP")
-        candidates = []
-        if onefile_temp:
-            candidates.append(Path(onefile_temp))
-        # Directory of this file (source run)
-        try:
-            candidates.append(Path(__file__).resolve().parent)
-        except Exception:
-            pass
-        # Directory of executable (frozen)
-        if getattr(sys, "frozen", False):
-            candidates.append(Path(sys.executable).resolve().parent)
-        for base in candidates:
-            candidate = base.joinpath(*parts)
-            if candidate.exists():
-                return candidate
-        return None
+    def _load_svg_icon(self, filename: str, kind: str, color: QColor) -> QIcon:
+        # 备用图标只在 SVG 缺失且缓存未命中时绘制
+        return self.icons.get(filename, color, self.ICON_SIZE, self.devicePixelRatioF(),
+                              lambda: self._make_icon(kind, color))
 
     def _refresh_icons(self):
         color = self._icon_color()
         pin_icon_name = "push-pin.svg" if self.always_on_top else "push-pin-simple.svg"
-        pin_icon = self._load_svg_icon(pin_icon_name, self._make_icon("pin", color))
-        settings_icon = self._load_svg_icon("gear.svg", self._make_icon("settings", color))
-        min_icon = self._load_svg_icon("arrows-in-simple.svg", self._make_icon("minimize", color))
-        close_icon = self._load_svg_icon("x.svg", self._make_icon("close", color))
+        pin_icon = self._load_svg_icon(pin_icon_name, "pin", color)
+        settings_icon = self._load_svg_icon("gear.svg", "settings", color)
+        min_icon = self._load_svg_icon("arrows-in-simple.svg", "minimize", color)
+        close_icon = self._load_svg_icon("x.svg", "close", color)
 
         self.pin_btn.setIcon(pin_icon)
         self.settings_btn.setIcon(settings_icon)
         self.min_btn.setIcon(min_icon)
         self.close_btn.setIcon(close_icon)
 
-        icon_size = QSize(20, 20)
+        icon_size = QSize(self.ICON_SIZE, self.ICON_SIZE)
         for btn in [self.pin_btn, self.settings_btn, self.min_btn, self.close_btn]:
             btn.setIconSize(icon_size)
             btn.setText("")
@@ -820,17 +858,19 @@ class MainWindow(QMainWindow):
         self._apply_pin(self.always_on_top)
         self._update_toggle_button_text()
 
-    def _launch_worker(self, text: str, start_offset: int = 0, resume: bool = False):
+    def _can_resume(self) -> bool:
+        return bool(self.pending_job and self.pending_job.has_more(self.pending_offset))
+
+    def _launch_worker(self, job: TypingJob | StreamingJob, start_offset: int = 0, resume: bool = False,
+                       plans: dict | None = None, trigger_ns: int | None = None):
         if self.worker and self.worker.isRunning():
             return
-        if not text:
+        if not job:
             self.status_label.setText(self.s("empty_clipboard"))
             return
-        total_len = len(text)
-        total_graphemes = InputSimulator.count_graphemes(text)
+        total_graphemes = job.estimated_total_graphemes()
         initial_progress = int((start_offset / total_graphemes) * 100) if total_graphemes else 0
         self.pending_offset = start_offset
-        self.pending_total = total_graphemes
 
         self.start_btn.setEnabled(True)
         self.toggle_btn.setEnabled(True)
@@ -839,14 +879,24 @@ class MainWindow(QMainWindow):
         self._start_spinner()
         self._set_progress_target(initial_progress, instant=True)
 
-        self.worker = PasteWorker(text, self.base_delay, self.random_delay, start_offset, self.countdown_seconds)
-        self.worker.progress_signal.connect(self._set_progress_target)
+        if self.isolated_engine:
+            # 预编译计划与缓存留在本进程，子进程按窗口自行编译
+            self.worker = ProcessPasteWorker(job, self.base_delay, self.random_delay, start_offset,
+                                             self.countdown_seconds, self.burst_graphemes, self.burst_max_events,
+                                             self.backend_name, self.rhythm, self.seed, trigger_ns=trigger_ns,
+                                             metrics_file=self.metrics_file, parent=self)
+        else:
+            self.worker = PasteWorker(job, self.base_delay, self.random_delay, start_offset, self.countdown_seconds,
+                                      self.burst_graphemes, self.burst_max_events, self.backend_name,
+                                      self.rhythm, self.seed, plans=plans, trigger_ns=trigger_ns,
+                                      cache=self.plan_cache, metrics_file=self.metrics_file)
+        self.worker.progress_signal.connect(self._on_worker_progress)
         self.worker.status_signal.connect(self._set_status_text)
         self.worker.finished_signal.connect(self.on_finished)
         logger.info(
-            "Task started%s: %d chars, base=%dms random=%dms offset=%d wait=%ds",
+            "Task started%s: %s chars, base=%dms random=%dms offset=%d wait=%ds",
             " (resume)" if resume else "",
-            len(text),
+            job.total_chars,
             self.base_delay,
             self.random_delay,
             start_offset,
@@ -855,27 +905,79 @@ class MainWindow(QMainWindow):
         self.worker.start()
 
     def start_task(self):
+        trigger_ns = self._hotkey_trigger_ns or time.perf_counter_ns()
         if self.worker and self.worker.isRunning(): return
+        if self.preparer: return
+        if self.plan_file is not None:
+            self._hold_finish = False
+            self.pending_job = self.plan_file
+            self.pending_offset = 0
+            self._launch_worker(self.plan_file, start_offset=0, resume=False, trigger_ns=trigger_ns)
+            self._update_toggle_button_text()
+            return
+        watcher = self.clipboard_watcher
+        prepared = watcher.current() if watcher else None
+        if prepared:
+            self._hold_finish = False
+            self._trigger_ns = trigger_ns
+            self._start_prepared(prepared)
+            return
+        # QClipboard 只能在 GUI 线程访问；这里只取一份文本，规范化与切分交给后台线程
         text = QApplication.clipboard().text()
         if not text:
             self.status_label.setText(self.s("empty_clipboard"))
             logger.info("Start aborted: clipboard empty")
             return
         self._hold_finish = False
-        text = text.replace('\r\n', '\n')
-        self.pending_text = text
+        self._trigger_ns = trigger_ns
+        pending = None
+        if watcher:
+            prepared = watcher.take(text)
+            if prepared:
+                self._start_prepared(prepared)
+                return
+            pending = watcher.pending(text)
+        self._set_status_value("preparing_text")
+        self._start_spinner()
+        self.start_btn.setEnabled(False)
+        # 预准备仍在进行时直接接管它，不重复切分
+        self.preparer = pending or JobPreparer(text, cache=self.plan_cache)
+        self.preparer.finished.connect(self._on_job_prepared)
+        if pending is None:
+            self.preparer.start()
+        elif pending.isFinished():
+            # finished 可能在连接前已经发出
+            QTimer.singleShot(0, self._on_job_prepared)
+
+    def _on_job_prepared(self):
+        preparer, self.preparer = self.preparer, None
+        if preparer is None:
+            return
+        self.start_btn.setEnabled(True)
+        if preparer.job is None:
+            # 准备期间被取消
+            self._stop_spinner()
+            self.status_label.setText(self.s("stopped_by_user"))
+            self._update_toggle_button_text()
+            return
+        self._start_prepared(preparer)
+
+    def _start_prepared(self, preparer: JobPreparer):
+        self.pending_job = preparer.job
         self.pending_offset = 0
-        self._launch_worker(text, start_offset=0, resume=False)
+        self._launch_worker(self.pending_job, start_offset=0, resume=False,
+                            plans=preparer.plans, trigger_ns=self._trigger_ns)
         self._update_toggle_button_text()
 
     def continue_task(self):
-        if self.worker and self.worker.isRunning():
+        trigger_ns = self._hotkey_trigger_ns or time.perf_counter_ns()
+        if self.worker and self.worker.isRunning() or self.preparer:
             return
-        if not self.pending_text or self.pending_offset >= getattr(self, "pending_total", len(self.pending_text)):
+        if not self._can_resume():
             self.status_label.setText(self.s("no_pending"))
             return
         self._hold_finish = False
-        self._launch_worker(self.pending_text, start_offset=self.pending_offset, resume=True)
+        self._launch_worker(self.pending_job, start_offset=self.pending_offset, resume=True, trigger_ns=trigger_ns)
         self._update_toggle_button_text()
 
     def stop_task(self):
@@ -885,6 +987,9 @@ class MainWindow(QMainWindow):
             self._start_spinner()
             self.toggle_btn.setEnabled(False)
             logger.info("Stop requested by user")
+        elif self.preparer:
+            self.preparer.cancel()
+            logger.info("Stop requested while preparing")
 
     def on_finished(self):
         finished_worker = self.worker
@@ -896,25 +1001,23 @@ class MainWindow(QMainWindow):
 
         if finished_worker:
             if finished_worker.completed:
-                self.pending_text = ""
+                self.pending_job = None
                 self.pending_offset = 0
                 # 任务完成时保持 100%，避免立刻归零
                 self._set_progress_target(100, instant=True)
                 self.status_label.setText(self.s("done"))
                 self._hold_finish = True
             else:
-                if finished_worker.next_offset < len(finished_worker.content):
-                    self.pending_text = finished_worker.content
+                if finished_worker.job.has_more(finished_worker.next_offset):
+                    self.pending_job = finished_worker.job
                     self.pending_offset = finished_worker.next_offset
-                    total = finished_worker.total_graphemes or len(self.pending_text)
-                    self.pending_total = total
+                    total = finished_worker.total_graphemes
                     progress = int((self.pending_offset / total) * 100) if total else 0
                     self._set_progress_target(progress, instant=True)
                     self.status_label.setText(self.s("stopped_by_user"))
                 else:
-                    self.pending_text = ""
+                    self.pending_job = None
                     self.pending_offset = 0
-                    self.pending_total = 0
                     self._set_progress_target(0, instant=True)
                     self.status_label.setText(self.s("stopped_by_user"))
                 self._hold_finish = False
@@ -922,20 +1025,36 @@ class MainWindow(QMainWindow):
             self.status_label.setText(self.s("done"))
             self._hold_finish = True
 
-        can_resume = bool(self.pending_text and self.pending_offset < len(self.pending_text))
+        can_resume = self._can_resume()
         self.start_btn.setEnabled(True)
         self._update_toggle_button_text()
         logger.info("Task finished; resume_available=%s", can_resume)
 
-    def nativeEvent(self, event_type, message):
-        if event_type == b"windows_generic_MSG" or event_type == "windows_generic_MSG":
-            msg = wintypes.MSG.from_address(int(message))
-            if msg.message == 0x0312:  # WM_HOTKEY
-                if msg.wParam == self.HK_START:
-                    self.start_task()
-                elif msg.wParam == self.HK_CONTINUE:
-                    self._on_toggle_clicked()
-        return super().nativeEvent(event_type, message)
+    def _on_hotkey_fast(self, hotkey_id: int, trigger_ns: int) -> bool:
+        """Runs on the hotkey thread: stop a running worker without waiting for the UI thread."""
+        worker = self.worker
+        if hotkey_id == self.HK_CONTINUE and worker and worker.isRunning():
+            worker.stop(trigger_ns)
+            logger.info("Stop requested by hotkey")
+            return True
+        return False
+
+    def _on_hotkey(self, hotkey_id: int, trigger_ns: int, handled: bool):
+        if handled:
+            # 停止已在热键线程中生效，这里只更新界面；worker 可能已经结束
+            if self.worker and self.worker.isRunning():
+                self._set_status_value("stopping")
+                self._start_spinner()
+                self.toggle_btn.setEnabled(False)
+            return
+        self._hotkey_trigger_ns = trigger_ns
+        try:
+            if hotkey_id == self.HK_START:
+                self.start_task()
+            elif hotkey_id == self.HK_CONTINUE:
+                self._on_toggle_clicked()
+        finally:
+            self._hotkey_trigger_ns = None
 
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
@@ -963,23 +1082,32 @@ class MainWindow(QMainWindow):
         self.settings.setValue("continue_vk", self.continue_hotkey_vk)
         self.settings.setValue("continue_mod", self.continue_hotkey_mod)
         self.settings.setValue("continue_txt", self.continue_hotkey_text)
-        WinSystem.unregister_hotkey(int(self.winId()), self.HK_START)
-        WinSystem.unregister_hotkey(int(self.winId()), self.HK_CONTINUE)
+        self.hotkeys.unregister(self.HK_START)
+        self.hotkeys.unregister(self.HK_CONTINUE)
+        if self.preparer:
+            self.preparer.cancel()
+            self.preparer.wait()
+        if self.worker and self.worker.isRunning():
+            self.worker.stop()
+            self.worker.wait(2000)
+        if self.clipboard_watcher:
+            self.clipboard_watcher.shutdown()
+        self.hotkeys.stop()
         event.accept()
 
     def _register_hotkeys(self):
-        if self.start_hotkey_vk and not WinSystem.register_hotkey(
-                int(self.winId()), self.HK_START, self.start_hotkey_vk, self.start_hotkey_mod):
+        if self.start_hotkey_vk and not self.hotkeys.register(
+                self.HK_START, self.start_hotkey_vk, self.start_hotkey_mod):
             logger.warning("Hotkey restore failed: %s(%s)", self.start_hotkey_text, hex(self.start_hotkey_vk))
-        if self.continue_hotkey_vk and not WinSystem.register_hotkey(
-                int(self.winId()), self.HK_CONTINUE, self.continue_hotkey_vk, self.continue_hotkey_mod):
+        if self.continue_hotkey_vk and not self.hotkeys.register(
+                self.HK_CONTINUE, self.continue_hotkey_vk, self.continue_hotkey_mod):
             logger.warning("Hotkey restore failed: %s(%s)", self.continue_hotkey_text, hex(self.continue_hotkey_vk))
 
     def _apply_settings(self, base_delay: int, random_delay: int, countdown: int,
                         start_vk: int, start_mod: int, start_txt: str,
                         continue_vk: int, continue_mod: int, continue_txt: str):
-        WinSystem.unregister_hotkey(int(self.winId()), self.HK_START)
-        WinSystem.unregister_hotkey(int(self.winId()), self.HK_CONTINUE)
+        self.hotkeys.unregister(self.HK_START)
+        self.hotkeys.unregister(self.HK_CONTINUE)
 
         old_values = (
             self.start_hotkey_vk, self.start_hotkey_mod,
@@ -988,9 +1116,9 @@ class MainWindow(QMainWindow):
 
         def restore():
             if old_values[0]:
-                WinSystem.register_hotkey(int(self.winId()), self.HK_START, old_values[0], old_values[1])
+                self.hotkeys.register(self.HK_START, old_values[0], old_values[1])
             if old_values[2]:
-                WinSystem.register_hotkey(int(self.winId()), self.HK_CONTINUE, old_values[2], old_values[3])
+                self.hotkeys.register(self.HK_CONTINUE, old_values[2], old_values[3])
 
         actions = [
             {"name": "start", "vk": start_vk, "mod": start_mod, "txt": start_txt, "id": self.HK_START},
@@ -1011,7 +1139,7 @@ class MainWindow(QMainWindow):
             used[combo] = idx
 
         for act in actions:
-            if act["vk"] and not WinSystem.register_hotkey(int(self.winId()), act["id"], act["vk"], act["mod"]):
+            if act["vk"] and not self.hotkeys.register(act["id"], act["vk"], act["mod"]):
                 self._show_hotkey_notice(False, self.msg("hotkey_conflict_runtime", **{"key": act["txt"]}))
                 restore()
                 return
@@ -1047,8 +1175,8 @@ class MainWindow(QMainWindow):
 
     def _open_settings(self):
         # 防止误触：先停用快捷键和主要控制
-        WinSystem.unregister_hotkey(int(self.winId()), self.HK_START)
-        WinSystem.unregister_hotkey(int(self.winId()), self.HK_CONTINUE)
+        self.hotkeys.unregister(self.HK_START)
+        self.hotkeys.unregister(self.HK_CONTINUE)
         start_enabled = self.start_btn.isEnabled()
         toggle_enabled = self.toggle_btn.isEnabled()
         self.start_btn.setEnabled(False)
@@ -1063,6 +1191,7 @@ class MainWindow(QMainWindow):
             self.countdown_seconds,
             (self.start_hotkey_text, self.start_hotkey_vk, self.start_hotkey_mod),
             (self.continue_hotkey_text, self.continue_hotkey_vk, self.continue_hotkey_mod),
+            effects=self.effects,
         )
         try:
             if dlg.exec() == QDialog.DialogCode.Accepted:
@@ -1089,7 +1218,7 @@ class MainWindow(QMainWindow):
         finally:
             # 恢复按钮可用状态，结合当前运行状态
             worker_running = self.worker and self.worker.isRunning()
-            can_resume = bool(self.pending_text and self.pending_offset < len(self.pending_text))
+            can_resume = self._can_resume()
             self.start_btn.setEnabled(start_enabled and not worker_running)
             self.toggle_btn.setEnabled(toggle_enabled or worker_running or can_resume)
             self._update_toggle_button_text()
@@ -1099,7 +1228,8 @@ class MainWindow(QMainWindow):
             return
         self._spinner_active = True
         self._spinner_timer.timeout.connect(self._tick_spinner)
-        self._spinner_timer.start(120)
+        if not self._ui_suspended:
+            self._spinner_timer.start(120)
         self.status_spinner.setVisible(True)
 
     def _stop_spinner(self):
@@ -1124,9 +1254,68 @@ class MainWindow(QMainWindow):
             self.progress_bar.setValue(value)
             return
         self._progress_target = value
-        if not self._progress_timer.isActive():
+        if not self._ui_suspended and not self._progress_timer.isActive():
             self._progress_timer.start(16)
 
+    def _on_worker_progress(self, value: int, rate: float, eta: float):
+        tr = tracing.tracer
+        if tr is not None:
+            tr.instant("progress received", value)
+        self._set_progress_target(value)
+        if self._ui_suspended:
+            # 不可见时只记下最新数据，恢复时再生成提示文本
+            self._pending_progress_detail = (rate, eta)
+            return
+        self._set_progress_detail(rate, eta)
+
+    def _set_progress_detail(self, rate: float, eta: float):
+        if rate > 0:
+            eta_text = self._format_eta(eta) if eta >= 0 else "--"
+            self.progress_bar.setToolTip(self.msg("progress_detail", rate=rate, eta=eta_text))
+        else:
+            self.progress_bar.setToolTip("")
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            self._update_ui_suspended()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._update_ui_suspended()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._update_ui_suspended()
+
+    def _update_ui_suspended(self):
+        suspended = self.isMinimized() or not self.isVisible()
+        if suspended == self._ui_suspended:
+            return
+        self._ui_suspended = suspended
+        if suspended:
+            self._spinner_timer.stop()
+            self._progress_timer.stop()
+            logger.info("Window not visible; UI timers suspended")
+            return
+        # 恢复：直接跳到最新进度，不补播中间的动画帧
+        self.progress_bar.setValue(self._progress_target)
+        if self._pending_progress_detail is not None:
+            self._set_progress_detail(*self._pending_progress_detail)
+            self._pending_progress_detail = None
+        if self._spinner_active:
+            self._spinner_timer.start(120)
+        logger.info("Window visible; UI timers resumed")
+
+    @staticmethod
+    def _format_eta(seconds: float) -> str:
+        seconds = int(seconds + 0.5)
+        minutes, secs = divmod(seconds, 60)
+        hours, minutes = divmod(minutes, 60)
+        if hours:
+            return f"{hours}:{minutes:02d}:{secs:02d}"
+        return f"{minutes}:{secs:02d}"
+
     def _tick_progress(self):
         current = self.progress_bar.value()
         diff = self._progress_target - current
@@ -1154,7 +1343,7 @@ class MainWindow(QMainWindow):
         self.settings_btn.setToolTip(self.b("settings"))
 
         if not self.worker or not self.worker.isRunning():
-            if self.pending_text and self.pending_offset < len(self.pending_text):
+            if self._can_resume():
                 self.status_label.setText(self.s("resume_ready"))
             elif self._hold_finish:
                 self.status_label.setText(self.s("done"))
@@ -1219,26 +1408,28 @@ class MainWindow(QMainWindow):
 
     def _update_toggle_button_text(self):
         running = self.worker and self.worker.isRunning()
-        can_resume = bool(self.pending_text and self.pending_offset < len(self.pending_text))
+        can_resume = self._can_resume()
         # 暂停/继续共用同一热键，图标随状态变化
         text = self.continue_hotkey_text
+        white = QColor("#FFFFFF")
         if can_resume and not running:
-            icon = self._load_svg_icon("play.svg", self._make_icon("minimize", QColor("#FFFFFF")))
+            icon = self._load_svg_icon("play.svg", "minimize", white)
         else:
-            icon = self._load_svg_icon("pause.svg", self._make_icon("minimize", QColor("#FFFFFF")))
+            icon = self._load_svg_icon("pause.svg", "minimize", white)
 
+        icon_size = QSize(self.ICON_SIZE, self.ICON_SIZE)
         self.toggle_btn.setText(text)
         self.toggle_btn.setIcon(icon)
-        self.toggle_btn.setIconSize(QSize(20, 20))
+        self.toggle_btn.setIconSize(icon_size)
         self.start_btn.setText(self.start_hotkey_text)
-        self.start_btn.setIcon(self._load_svg_icon("rocket-launch.svg", self._make_icon("minimize", QColor("#FFFFFF"))))
-        self.start_btn.setIconSize(QSize(20, 20))
+        self.start_btn.setIcon(self._load_svg_icon("rocket-launch.svg", "minimize", white))
+        self.start_btn.setIconSize(icon_size)
 
     def _on_toggle_clicked(self):
-        if self.worker and self.worker.isRunning():
+        if self.worker and self.worker.isRunning() or self.preparer:
             self.stop_task()  # 充当“暂停”
             return
-        if self.pending_text and self.pending_offset < len(self.pending_text):
+        if self._can_resume():
             self.continue_task()
         else:
             self.start_task()
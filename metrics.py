@@ -0,0 +1,190 @@
+# metrics.py
+"""每个任务的输入指标：SendInput 调用耗时、计划发送时刻与实际发送时刻之差、有效速度。
+
+耗时记录在固定桶数的对数-线性直方图（HDR 风格）中：每个 2 的幂区间再均分为 16 个子桶，
+相对误差不超过 1/16，记录一次只是一次位运算和数组自增，开销与事件数无关。
+任务结束时汇总为一行 JSON，追加到日志目录下的 metrics.jsonl；文件超过上限时像日志一样轮转为 .1、.2。
+"""
+import json
+import logging
+import time
+from array import array
+from pathlib import Path
+
+from config import METRICS_BACKUP_COUNT, METRICS_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+SUB_BUCKET_BITS = 5
+_SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+_HALF = _SUB_BUCKETS // 2
+# 最大可记录约 2^45 ns（约 9.8 小时），更大的值计入最后一个桶
+MAX_SHIFT = 40
+BUCKET_COUNT = _SUB_BUCKETS + MAX_SHIFT * _HALF
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def _bucket(value: int) -> int:
+    if value < _SUB_BUCKETS:
+        return max(0, value)
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    if shift > MAX_SHIFT:
+        return BUCKET_COUNT - 1
+    return _SUB_BUCKETS + (shift - 1) * _HALF + (value >> shift) - _HALF
+
+
+def _bucket_upper(index: int) -> int:
+    """Largest value that falls into bucket ``index``."""
+    if index < _SUB_BUCKETS:
+        return index
+    shift = (index - _SUB_BUCKETS) // _HALF + 1
+    sub = (index - _SUB_BUCKETS) % _HALF + _HALF
+    return ((sub + 1) << shift) - 1
+
+
+class Histogram:
+    """固定桶数的对数-线性直方图（整数值，通常为纳秒）。"""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = array("Q", bytes(8 * BUCKET_COUNT))
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value: int):
+        if value < 0:
+            value = 0
+        self.counts[_bucket(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, pct: float) -> int:
+        """Upper bound of the bucket holding the ``pct`` percentile (clamped to the exact max)."""
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * pct // 100))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(_bucket_upper(index), self.max)
+        return self.max
+
+    def summary(self, scale: float = 1.0, digits: int = 1) -> dict:
+        """Count, mean, percentiles and max, each divided by ``scale``."""
+        if not self.count:
+            return {"count": 0}
+        out = {"count": self.count, "mean": round(self.total / self.count / scale, digits)}
+        for pct in PERCENTILES:
+            out[f"p{pct:g}"] = round(self.percentile(pct) / scale, digits)
+        out["max"] = round(self.max / scale, digits)
+        return out
+
+
+class JobMetrics:
+    """单个任务的指标收集器，由 PasteWorker 在输入线程中调用。"""
+
+    def __init__(self):
+        self.send_ns = Histogram()
+        self.send_error_ns = Histogram()
+        self.graphemes = 0
+        self.events = 0
+        self._start_ns = 0
+        self._end_ns = 0
+
+    def start(self):
+        self._start_ns = self._end_ns = time.perf_counter_ns()
+
+    def record_send(self, start_ns: int, end_ns: int, graphemes: int, events: int):
+        self.send_ns.record(end_ns - start_ns)
+        self.graphemes += graphemes
+        self.events += events
+        self._end_ns = end_ns
+
+    def record_error(self, scheduled_ns: int, actual_ns: int):
+        """How late a send started relative to its scheduled deadline."""
+        self.send_error_ns.record(actual_ns - scheduled_ns)
+
+    @property
+    def elapsed_s(self) -> float:
+        return max(0, self._end_ns - self._start_ns) / 1_000_000_000
+
+    def summary(self, **extra) -> dict:
+        elapsed = self.elapsed_s
+        out = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "graphemes": self.graphemes,
+            "events": self.events,
+            "elapsed_s": round(elapsed, 3),
+            "chars_per_s": round(self.graphemes / elapsed, 1) if elapsed > 0 else 0.0,
+            "send_us": self.send_ns.summary(1000),
+            "send_error_us": self.send_error_ns.summary(1000),
+        }
+        out.update(extra)
+        return out
+
+
+def _backup(path: Path, index: int) -> Path:
+    return path.with_name(f"{path.name}.{index}")
+
+
+def _rotate(path: Path, backup_count: int):
+    """Shift metrics.jsonl -> .1 -> .2 ..., dropping the oldest (same scheme as RotatingFileHandler)."""
+    if backup_count <= 0:
+        path.unlink(missing_ok=True)
+        return
+    for index in range(backup_count - 1, 0, -1):
+        source = _backup(path, index)
+        if source.exists():
+            source.replace(_backup(path, index + 1))
+    path.replace(_backup(path, 1))
+
+
+def write_summary(path: Path, summary: dict, max_bytes: int = METRICS_MAX_BYTES,
+                  backup_count: int = METRICS_BACKUP_COUNT):
+    """Append one job summary as a JSON line, rotating the file once it would exceed ``max_bytes``."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    line = (json.dumps(summary, ensure_ascii=False) + "\n").encode("utf-8")
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        size = 0
+    if max_bytes > 0 and size and size + len(line) > max_bytes:
+        _rotate(path, backup_count)
+        logger.info("Rotated metrics file %s", path)
+    with open(path, "ab") as f:
+        f.write(line)
+
+
+def read_summaries(path: Path, limit: int | None = None, backup_count: int = METRICS_BACKUP_COUNT) -> list[dict]:
+    """Most recent job summaries (oldest first), including rotated backups; malformed lines are skipped."""
+    path = Path(path)
+    out = []
+    for source in [_backup(path, i) for i in range(backup_count, 0, -1)] + [path]:
+        if not source.exists():
+            continue
+        with open(source, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    out.append(json.loads(line))
+                except ValueError:
+                    continue
+    return out[-limit:] if limit else out
+
+
+def format_summary(summary: dict) -> str:
+    def stats(name):
+        h = summary.get(name) or {}
+        if not h.get("count"):
+            return "-"
+        return f"p50={h['p50']} p99={h['p99']} max={h['max']}"
+
+    return (f"{summary.get('time', '?')}  {summary.get('graphemes', 0)} graphemes in {summary.get('elapsed_s', 0)}s "
+            f"({summary.get('chars_per_s', 0)}/s)  completed={summary.get('completed')}\n"
+            f"    SendInput us: {stats('send_us')}\n"
+            f"    send error us: {stats('send_error_us')}")
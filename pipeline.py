@@ -0,0 +1,123 @@
+# pipeline.py
+"""切分 → 编码 → 构建事件 与 节拍/发送 之间的生产者-消费者流水线。
+
+前几个阶段（字素切分、UTF-16 展开、INPUT 构建、延迟块生成）在生产者线程里按窗口进行，
+通过有界队列交给节拍线程；节拍线程只负责等待和发送，其唤醒时间不再受文本编码开销影响。
+队列有界，生产者最多领先 depth 个窗口，内存占用与文本长度无关。
+生产者是纯 Python 计算、一直持有 GIL，因此在窗口之间以及编译窗口期间（yielding）主动让出。
+"""
+import queue
+import threading
+import time
+
+import tracing
+from config import PIPELINE_DEPTH, PIPELINE_YIELD_GRAPHEMES
+
+# 生产者轮询取消标志的间隔（秒）
+_PUT_TIMEOUT = 0.05
+_END = object()
+
+
+def yielding(items, every: int = PIPELINE_YIELD_GRAPHEMES):
+    """Pass ``items`` through, releasing the GIL after every ``every`` items."""
+    count = 0
+    for item in items:
+        yield item
+        count += 1
+        if count == every:
+            count = 0
+            time.sleep(0)
+
+
+class _Failure:
+    __slots__ = ("exc",)
+
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+class WindowPipeline:
+    """在后台线程中按窗口准备输入计划，消费端按顺序迭代 prepare 的结果。
+
+    windows 为 (window_start, window) 迭代器，prepare(window_start, window) 返回交给消费端的条目；
+    生产者中的异常会在消费端迭代到该位置时重新抛出。
+    """
+
+    def __init__(self, windows, prepare, cancel: threading.Event, depth: int = PIPELINE_DEPTH):
+        self._windows = windows
+        self._prepare = prepare
+        self._cancel = cancel
+        # 消费端提前结束（发送失败等）时通知生产者退出
+        self._closed = threading.Event()
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, depth))
+        self._thread = threading.Thread(target=self._produce, name="WindowPipeline", daemon=True)
+        self.produced = 0
+        # 首个窗口之后，消费端取条目时需要等待（生产者落后）的次数
+        self.stalls = 0
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _stopped(self) -> bool:
+        return self._cancel.is_set() or self._closed.is_set()
+
+    def _put(self, item) -> bool:
+        while not self._stopped():
+            try:
+                self._queue.put(item, timeout=_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        tr = tracing.tracer
+        if tr is not None:
+            tr.name_thread("WindowPipeline")
+        try:
+            for window_start, window in self._windows:
+                start_ns = time.perf_counter_ns()
+                item = self._prepare(window_start, window)
+                if tr is not None:
+                    tr.complete("prepare window", start_ns, time.perf_counter_ns(), window_start)
+                if not self._put(item):
+                    return
+                self.produced += 1
+                time.sleep(0)
+        except BaseException as exc:  # 交给消费端处理
+            self._put(_Failure(exc))
+            return
+        self._put(_END)
+
+    def __iter__(self):
+        get = self._queue.get
+        # 第一个窗口总要等生产者准备，不算停顿
+        first = True
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                if not first:
+                    self.stalls += 1
+                # 取消时生产者不再写入，这里也要能退出
+                while True:
+                    try:
+                        item = get(timeout=_PUT_TIMEOUT)
+                        break
+                    except queue.Empty:
+                        if self._stopped() or not self._thread.is_alive() and self._queue.empty():
+                            return
+            first = False
+            if item is _END:
+                return
+            if isinstance(item, _Failure):
+                raise item.exc
+            yield item
+
+    def close(self):
+        """Stop the producer thread."""
+        self._closed.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
@@ -0,0 +1,93 @@
+# plan_cache.py
+import sys
+import ctypes
+import logging
+import threading
+from collections import OrderedDict
+
+from config import PLAN_CACHE_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+# 条目类型：整段任务（文本 + 边界表）或某个窗口的输入计划
+_JOB = -1
+
+
+def job_nbytes(job) -> int:
+    return sys.getsizeof(job.text) + len(job.boundaries) * job.boundaries.itemsize
+
+
+def plan_nbytes(plan) -> int:
+    return ctypes.sizeof(plan.events) + len(plan.offsets) * plan.offsets.itemsize
+
+
+class PlanCache:
+    """按内容哈希缓存切分结果与编译好的窗口计划，LRU，按总字节数淘汰。
+
+    键为 (规范化文本的 blake2b 摘要, 窗口起始下标)；窗口与延迟块对齐，
+    续打时从任意偏移开始都能命中同一批窗口计划。预准备线程与工作线程会并发访问，内部加锁。
+    """
+
+    def __init__(self, max_bytes: int = PLAN_CACHE_MAX_BYTES):
+        self.max_bytes = max(0, max_bytes)
+        self._entries: OrderedDict[tuple[bytes, int], tuple[object, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, key: tuple[bytes, int]):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def _put(self, key: tuple[bytes, int], value, nbytes: int):
+        # 单个条目超过上限时不缓存，避免把其余条目全部挤出
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._entries[key] = (value, nbytes)
+            self.bytes += nbytes
+            while self.bytes > self.max_bytes:
+                _, (_, size) = self._entries.popitem(last=False)
+                self.bytes -= size
+                self.evictions += 1
+
+    def get_job(self, content_key: bytes):
+        return self._get((content_key, _JOB))
+
+    def put_job(self, content_key: bytes, job):
+        self._put((content_key, _JOB), job, job_nbytes(job))
+
+    def get_plan(self, content_key: bytes, window_start: int):
+        return self._get((content_key, window_start))
+
+    def put_plan(self, content_key: bytes, window_start: int, plan):
+        self._put((content_key, window_start), plan, plan_nbytes(plan))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
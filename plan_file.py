@@ -0,0 +1,251 @@
+# plan_file.py
+"""可直接内存映射执行的已编译输入计划文件。
+
+布局（小端，各段按 64 字节对齐）：
+    header   固定长度的文件头，见 _HEADER
+    events   连续的 INPUT 数组，与 SendInput 的内存布局一致
+    offsets  uint32 字素边界表：第 i 个字素的首个事件下标，末尾多一项为事件总数
+    delays   可选，float64，每个字素之后的延迟 (ms)
+
+打开文件时读取文件头、建立映射并检查一遍边界表（事件下标会直接换算成 SendInput 的内存地址）；
+输入时按窗口把映射中的事件切片直接交给输入后端，续打只需要一个字素下标。
+INPUT 的大小随指针宽度变化，文件头记录编译时的大小，只能在同一架构的机器之间共享。
+"""
+import logging
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from array import array
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # 没有 NumPy 时逐项检查边界表
+    np = None
+
+from core_engine import INPUT, INPUT_SIZE, InputSimulator, KeystrokePlan, WinSystem
+from rhythm import BLOCK_SIZE, DelaySchedule
+from typing_job import prepare_job
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"MHYPLAN\0"
+# 版本 2 去掉了无法校验的内容摘要字段
+VERSION = 2
+FLAG_DELAYS = 0x0001
+# 偏移表为 uint32，事件总数不能超过该值
+MAX_EVENTS = (1 << 32) - 1
+_ALIGN = 64
+# magic, version, flags, INPUT 大小, 窗口大小, 字素数, 事件数, 字符数,
+# events/offsets/delays 段的偏移, 延迟参数 (base, random, seed, rhythm)
+_HEADER = struct.Struct("<8sHHIIQQQQQQIIQ16s")
+HEADER_SIZE = -(-_HEADER.size // _ALIGN) * _ALIGN
+
+
+class PlanFileError(ValueError):
+    """The file is not a plan file this build can execute."""
+
+
+def _align(pos: int) -> int:
+    return -(-pos // _ALIGN) * _ALIGN
+
+
+def _pad(f):
+    f.write(bytes(_align(f.tell()) - f.tell()))
+
+
+def write_plan_file(source, path, schedule: DelaySchedule | None = None) -> int:
+    """Compile ``source`` (text or job) into a plan file at ``path``; return the grapheme count.
+
+    With a non-zero ``schedule`` the per-grapheme delays are baked into the file.
+    """
+    job = prepare_job(source) if isinstance(source, str) else source
+    if schedule is not None and schedule.is_zero:
+        schedule = None
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # 先写临时文件再替换，中途失败不会留下半个计划文件
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        # 事件段边写边产生，偏移表与延迟写入旁路临时文件，内存占用只与窗口大小有关
+        with os.fdopen(fd, "w+b") as f, tempfile.TemporaryFile() as offsets_f, tempfile.TemporaryFile() as delays_f:
+            f.write(bytes(HEADER_SIZE))
+            events_pos = f.tell()
+            total_events = 0
+            graphemes = 0
+            offsets_f.write(array("I", [0]).tobytes())
+            for window_start, window in job.iter_windows(0, BLOCK_SIZE):
+                plan = InputSimulator.compile_plan(window.iter_graphemes())
+                f.write(memoryview(plan.events).cast("B"))
+                # 先检查再构建 array("I")，否则越界时只会得到裸 OverflowError
+                if total_events + plan.total_events > MAX_EVENTS:
+                    raise PlanFileError("plan has too many events for a 32-bit offset table")
+                shifted = array("I", (total_events + o for o in plan.offsets[1:]))
+                offsets_f.write(shifted.tobytes())
+                if schedule is not None:
+                    count = window.total_graphemes
+                    delays = schedule.block(window_start // BLOCK_SIZE, window.first_codepoints(0, count))
+                    delays_f.write(delays.tobytes())
+                total_events += plan.total_events
+                graphemes += window.total_graphemes
+
+            _pad(f)
+            offsets_pos = f.tell()
+            offsets_f.seek(0)
+            shutil.copyfileobj(offsets_f, f)
+            delays_pos = 0
+            if schedule is not None:
+                _pad(f)
+                delays_pos = f.tell()
+                delays_f.seek(0)
+                shutil.copyfileobj(delays_f, f)
+
+            f.seek(0)
+            f.write(_HEADER.pack(
+                MAGIC, VERSION, FLAG_DELAYS if schedule is not None else 0, INPUT_SIZE, BLOCK_SIZE,
+                graphemes, total_events, job.total_chars or 0,
+                events_pos, offsets_pos, delays_pos,
+                schedule.base_delay if schedule else 0,
+                schedule.random_delay if schedule else 0,
+                schedule.seed if schedule else 0,
+                (schedule.rhythm if schedule else "").encode("ascii"),
+            ))
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+    logger.info("Plan file written: %s (%d graphemes, %d events, delays=%s)",
+                path, graphemes, total_events, schedule is not None)
+    return graphemes
+
+
+class PlanWindow(KeystrokePlan):
+    """计划文件中的一个窗口：events 为整段映射，offsets 为边界表的零拷贝切片（绝对事件下标）。"""
+
+    __slots__ = ("delays",)
+
+    def __init__(self, events, offsets, delays=None):
+        super().__init__(events, offsets)
+        self.delays = delays
+
+    def first_codepoints(self, start: int, end: int) -> array:
+        """First code point of each grapheme in [start, end), decoded from its key-down events."""
+        events = self.events
+        offsets = self.offsets
+        out = array("I")
+        for i in range(start, end):
+            ki = events[offsets[i]].ki
+            if ki.wVk == WinSystem.VK_RETURN:
+                out.append(0x0A)
+                continue
+            unit = ki.wScan
+            if 0xD800 <= unit < 0xDC00 and offsets[i + 1] - offsets[i] >= 4:
+                low = events[offsets[i] + 1].ki.wScan
+                unit = 0x10000 + ((unit - 0xD800) << 10) + (low - 0xDC00)
+            out.append(unit)
+        return out
+
+
+def _offsets_valid(offsets, total_events: int) -> bool:
+    """Offsets start at 0, never decrease and end at ``total_events``, so every window stays inside the events."""
+    if offsets[0] != 0 or offsets[-1] != total_events:
+        return False
+    if np is not None:
+        table = np.frombuffer(offsets, dtype=np.uint32)
+        return not (table[1:] < table[:-1]).any()
+    return all(a <= b for a, b in zip(offsets, offsets[1:]))
+
+
+class PlanFile:
+    """已打开的计划文件，满足 PasteWorker 的任务接口（iter_windows / has_more / clamp）。"""
+
+    # 计划本身已在文件里，不再进入内存中的计划缓存
+    content_key = None
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+            if len(header) < _HEADER.size:
+                raise PlanFileError(f"{self.path}: file too short for a plan header")
+            fields = _HEADER.unpack_from(header)
+            (magic, version, flags, input_size, self.block_size, self._graphemes, self._events, self._chars,
+             events_pos, offsets_pos, delays_pos, base, rand, seed, rhythm) = fields
+            if magic != MAGIC:
+                raise PlanFileError(f"{self.path}: not a plan file")
+            if version != VERSION:
+                raise PlanFileError(f"{self.path}: unsupported plan version {version}")
+            if input_size != INPUT_SIZE:
+                raise PlanFileError(f"{self.path}: compiled for INPUT size {input_size}, this build uses {INPUT_SIZE}")
+            size = os.fstat(f.fileno()).st_size
+            end = (delays_pos + 8 * self._graphemes) if flags & FLAG_DELAYS else offsets_pos + 4 * (self._graphemes + 1)
+            if end > size or events_pos + INPUT_SIZE * self._events > offsets_pos:
+                raise PlanFileError(f"{self.path}: truncated plan file")
+            # ACCESS_COPY 映射可写（写时复制），ctypes 才能在其上建立零拷贝数组
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        self.has_delays = bool(flags & FLAG_DELAYS)
+        self.rhythm = rhythm.rstrip(b"\0").decode("ascii")
+        self.base_delay, self.random_delay, self.seed = base, rand, seed
+        view = memoryview(self._mm)
+        self._offsets = view[offsets_pos:offsets_pos + 4 * (self._graphemes + 1)].cast("I")
+        if not _offsets_valid(self._offsets, self._events):
+            self._offsets.release()
+            view.release()
+            self._mm.close()
+            raise PlanFileError(f"{self.path}: corrupt offset table")
+        self._event_array = (INPUT * self._events).from_buffer(self._mm, events_pos)
+        self._delays = view[delays_pos:delays_pos + 8 * self._graphemes].cast("d") if self.has_delays else None
+        logger.info("Plan file mapped: %s (%d graphemes, %d events, delays=%s)",
+                    self.path, self._graphemes, self._events, self.has_delays)
+
+    @property
+    def total_graphemes(self) -> int:
+        return self._graphemes
+
+    @property
+    def total_events(self) -> int:
+        return self._events
+
+    @property
+    def total_chars(self) -> int:
+        return self._chars
+
+    def estimated_total_graphemes(self) -> int:
+        return self._graphemes
+
+    def has_more(self, index: int) -> bool:
+        return index < self._graphemes
+
+    def __len__(self) -> int:
+        return self._graphemes
+
+    def __bool__(self) -> bool:
+        return self._graphemes > 0
+
+    def clamp(self, index: int) -> int:
+        return max(0, min(index, self._graphemes))
+
+    def iter_windows(self, start: int, size: int):
+        """Yield (first index, PlanWindow) for aligned windows of ``size`` graphemes from the one holding ``start``."""
+        total = self._graphemes
+        for first in range(start - start % size, total, size):
+            last = min(first + size, total)
+            delays = self._delays[first:last] if self._delays is not None else None
+            yield first, PlanWindow(self._event_array, self._offsets[first:last + 1], delays)
+
+    def close(self):
+        """Release the mapping; windows still held elsewhere keep it alive until they are dropped."""
+        self._event_array = self._offsets = self._delays = None
+        try:
+            self._mm.close()
+        except BufferError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,148 @@
+# profiling.py
+"""可选的性能剖析（--profile），按线程分别统计输入线程与界面线程的耗时。
+
+两种模式：
+- cprofile：确定性剖析，每个线程名一个 cProfile.Profile，退出时写出 profile-<线程名>.prof，
+  可用 pstats / snakeviz 查看；开销较大，会拉长按键节拍。
+- sample：后台线程按固定间隔读取被剖析线程的调用栈，退出时写出 profile-<线程名>.collapsed
+  （折叠栈格式，可直接交给 flamegraph.pl / speedscope）；开销小，节拍基本不受影响。
+
+Python 3.12 起 cProfile 基于 sys.monitoring，整个进程同一时刻只能启用一个且覆盖所有线程，
+无法再按线程区分界面与输入线程，此时 cprofile 自动改用 sample 模式。
+
+未启用时 profiler 为 None，埋点处只多一次判空。
+"""
+import cProfile
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from config import PROFILE_SAMPLE_INTERVAL_MS
+
+logger = logging.getLogger(__name__)
+
+MODES = ("cprofile", "sample")
+# 3.12+ 的 cProfile 不能在多个线程上各启用一个
+CPROFILE_PER_THREAD = sys.version_info < (3, 12)
+
+# 全局剖析器，由 enable() 创建；埋点处先判断是否为 None
+profiler: "Profiler | None" = None
+
+
+class Profiler:
+    """按线程名汇总剖析结果；同名线程（例如每个任务新建的 PasteWorker）累计到同一份结果。"""
+
+    def __init__(self, mode: str = "cprofile", interval_ms: float = PROFILE_SAMPLE_INTERVAL_MS):
+        if mode not in MODES:
+            raise ValueError(f"unknown profile mode: {mode}")
+        if mode == "cprofile" and not CPROFILE_PER_THREAD:
+            logger.warning("cProfile cannot profile threads separately on Python %d.%d; sampling instead",
+                           *sys.version_info[:2])
+            mode = "sample"
+        self.mode = mode
+        self.interval_s = max(0.0001, interval_ms / 1000)
+        self._profiles: dict[str, cProfile.Profile] = {}
+        self._stacks: dict[str, Counter] = {}
+        # 正在采样的线程：ident -> 线程名
+        self._threads: dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._sampler: threading.Thread | None = None
+        self._closed = threading.Event()
+        self.samples = 0
+
+    def attach(self, name: str):
+        """Start profiling the calling thread under ``name``."""
+        if self.mode == "sample":
+            with self._lock:
+                self._threads[threading.get_ident()] = name
+                self._stacks.setdefault(name, Counter())
+                if self._sampler is None:
+                    self._sampler = threading.Thread(target=self._sample_loop, name="ProfileSampler", daemon=True)
+                    self._sampler.start()
+            return
+        profile = self._profiles.get(name)
+        if profile is None:
+            profile = self._profiles[name] = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as exc:
+            # 已有其他剖析器（例如外部的 cProfile）占用
+            logger.warning("Cannot profile thread %s: %s", name, exc)
+
+    def detach(self, name: str):
+        """Stop profiling the calling thread."""
+        if self.mode == "sample":
+            with self._lock:
+                self._threads.pop(threading.get_ident(), None)
+            return
+        profile = self._profiles.get(name)
+        if profile is not None:
+            profile.disable()
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        while not self._closed.wait(self.interval_s):
+            with self._lock:
+                threads = dict(self._threads)
+            if not threads:
+                continue
+            frames = sys._current_frames()
+            for ident, name in threads.items():
+                frame = frames.get(ident)
+                if frame is None or ident == own:
+                    continue
+                self._stacks[name][_collapse(frame)] += 1
+                self.samples += 1
+
+    def close(self):
+        self._closed.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+    def write(self, directory) -> list[Path]:
+        """Write one file per profiled thread into ``directory``; return the written paths."""
+        self.close()
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        written = []
+        for name, profile in self._profiles.items():
+            profile.disable()
+            path = directory / f"profile-{name}.prof"
+            profile.dump_stats(path)
+            written.append(path)
+        for name, stacks in self._stacks.items():
+            if not stacks:
+                continue
+            path = directory / f"profile-{name}.collapsed"
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            written.append(path)
+        return written
+
+
+def _collapse(frame) -> str:
+    """Root-first ``func (file:line);...`` stack, the collapsed-stack format used by flame graph tools."""
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+        frame = frame.f_back
+    parts.reverse()
+    return ";".join(parts)
+
+
+def enable(mode: str = "cprofile", interval_ms: float = PROFILE_SAMPLE_INTERVAL_MS) -> Profiler:
+    global profiler
+    profiler = Profiler(mode, interval_ms)
+    return profiler
+
+
+def disable():
+    global profiler
+    if profiler is not None:
+        profiler.close()
+    profiler = None
@@ -0,0 +1,129 @@
+# rhythm.py
+import math
+import random
+import unicodedata
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 缺失时退回逐个生成的纯 Python 实现
+    np = None
+
+RHYTHMS = ("uniform", "lognormal", "natural")
+# 每块生成的字素数；块按绝对下标对齐，同一 seed 下续打得到的延迟与首次一致
+BLOCK_SIZE = 4096
+LOGNORMAL_SIGMA = 0.4
+
+CLASS_NORMAL = 0
+CLASS_PUNCT = 1
+CLASS_SPACE = 2
+CLASS_NEWLINE = 3
+# natural 节奏下不同字符类别的延迟倍率
+DEFAULT_CLASS_MULTIPLIERS = {CLASS_NORMAL: 1.0, CLASS_PUNCT: 1.8, CLASS_SPACE: 1.3, CLASS_NEWLINE: 3.0}
+
+_class_table: bytes | None = None
+
+
+def _char_class_table() -> bytes:
+    """BMP 字符类别表（首次使用时构建）。"""
+    global _class_table
+    if _class_table is None:
+        table = bytearray(0x10000)
+        for cp in range(0x10000):
+            ch = chr(cp)
+            if ch == "\n":
+                table[cp] = CLASS_NEWLINE
+            elif ch.isspace():
+                table[cp] = CLASS_SPACE
+            elif unicodedata.category(ch).startswith("P"):
+                table[cp] = CLASS_PUNCT
+        _class_table = bytes(table)
+    return _class_table
+
+
+class DelaySchedule:
+    """按块预先生成每个字素之后的延迟 (ms)，热循环里只需按下标取值。"""
+
+    def __init__(self, base_delay: int, random_delay: int, rhythm: str = "uniform", seed: int | None = None,
+                 class_multipliers: dict[int, float] | None = None):
+        if rhythm not in RHYTHMS:
+            raise ValueError(f"unknown rhythm: {rhythm}")
+        self.base_delay = max(0, base_delay)
+        self.random_delay = max(0, random_delay)
+        self.rhythm = rhythm
+        # 未指定 seed 时随机取一个并记录到日志，便于复现
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(1 << 63)
+        if class_multipliers is None and rhythm == "natural":
+            class_multipliers = DEFAULT_CLASS_MULTIPLIERS
+        self.class_multipliers = class_multipliers
+
+    @property
+    def is_zero(self) -> bool:
+        return self.base_delay == 0 and self.random_delay == 0
+
+    @property
+    def mean_delay(self) -> float:
+        """Expected delay before class multipliers are applied."""
+        if self.rhythm == "uniform":
+            return self.base_delay + max(0, self.random_delay - 1) / 2
+        return self.base_delay + self.random_delay / 2
+
+    def _lognormal_mu(self) -> float:
+        # 让对数正态分布的期望等于 base + random / 2
+        return math.log(max(self.mean_delay, 0.001)) - LOGNORMAL_SIGMA ** 2 / 2
+
+    def _multipliers(self, codepoints) -> list[float] | None:
+        if not self.class_multipliers:
+            return None
+        table = _char_class_table()
+        weights = [self.class_multipliers.get(c, 1.0) for c in range(4)]
+        if np is not None:
+            cps = np.asarray(codepoints, dtype=np.uint32)
+            classes = np.frombuffer(table, dtype=np.uint8)[np.minimum(cps, 0xFFFF)]
+            classes[cps > 0xFFFF] = CLASS_NORMAL
+            return np.asarray(weights)[classes]
+        return [weights[table[cp]] if cp <= 0xFFFF else weights[0] for cp in codepoints]
+
+    def block(self, block_index: int, codepoints) -> array:
+        """Delays for the aligned block ``block_index``; ``codepoints`` are first code points of its graphemes."""
+        count = len(codepoints)
+        if self.is_zero or count == 0:
+            return array("d", bytes(8 * count))
+        if np is not None:
+            return array("d", self._block_numpy(block_index, codepoints, count).tobytes())
+        return self._block_python(block_index, codepoints, count)
+
+    def _block_numpy(self, block_index: int, codepoints, count: int):
+        rng = np.random.default_rng([self.seed, block_index])
+        if self.rhythm == "uniform":
+            delays = np.full(count, float(self.base_delay))
+            if self.random_delay > 0:
+                delays += rng.integers(0, self.random_delay, size=count)
+        else:
+            delays = rng.lognormal(self._lognormal_mu(), LOGNORMAL_SIGMA, size=count)
+            np.minimum(delays, (self.base_delay + self.random_delay) * 4, out=delays)
+        multipliers = self._multipliers(codepoints)
+        if multipliers is not None:
+            delays *= multipliers
+        return delays
+
+    def _block_python(self, block_index: int, codepoints, count: int) -> array:
+        rng = random.Random(self.seed * 1_000_003 + block_index)
+        if self.rhythm == "uniform":
+            if self.random_delay > 0:
+                delays = array("d", (self.base_delay + rng.randrange(0, self.random_delay) for _ in range(count)))
+            else:
+                delays = array("d", [float(self.base_delay)]) * count
+        else:
+            mu = self._lognormal_mu()
+            upper = (self.base_delay + self.random_delay) * 4
+            delays = array("d", (min(upper, rng.lognormvariate(mu, LOGNORMAL_SIGMA)) for _ in range(count)))
+        multipliers = self._multipliers(codepoints)
+        if multipliers is not None:
+            for i, m in enumerate(multipliers):
+                delays[i] *= m
+        return delays
+
+    def estimate_count_ms(self, count: int) -> float:
+        """O(1) expected duration of ``count`` graphemes (ignores per-character pauses)."""
+        return 0.0 if self.is_zero else self.mean_delay * max(0, count)
@@ -0,0 +1,105 @@
+# scheduler.py
+import math
+import time
+import threading
+
+# 截止时间前最后这段时间改为让出 CPU 的自旋，避免系统定时器粒度导致的超时
+SPIN_NS = 1_000_000
+# 落后计划超过该值时重新对齐，避免追赶时把积压的按键连发出去
+MAX_LAG_NS = 100_000_000
+# 提前唤醒量的上限，防止定时器精度很差时退化为长时间自旋
+MAX_SLACK_NS = 4_000_000
+
+
+class JitterStats:
+    """唤醒时间相对截止时间的偏差统计（纳秒，正值表示晚到）。"""
+
+    __slots__ = ("count", "total", "total_sq", "max", "resyncs")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.total_sq = 0
+        self.max = 0
+        self.resyncs = 0
+
+    def add(self, lateness_ns: int):
+        self.count += 1
+        self.total += lateness_ns
+        self.total_sq += lateness_ns * lateness_ns
+        if lateness_ns > self.max:
+            self.max = lateness_ns
+
+    def summary(self) -> dict:
+        if not self.count:
+            return {"count": 0, "mean_us": 0.0, "stdev_us": 0.0, "max_us": 0.0, "resyncs": self.resyncs}
+        mean = self.total / self.count
+        variance = max(0.0, self.total_sq / self.count - mean * mean)
+        return {
+            "count": self.count,
+            "mean_us": round(mean / 1000, 1),
+            "stdev_us": round(math.sqrt(variance) / 1000, 1),
+            "max_us": round(self.max / 1000, 1),
+            "resyncs": self.resyncs,
+        }
+
+
+class DeadlineScheduler:
+    """基于绝对截止时间的节拍器。
+
+    每次延迟都累加到上一个截止时间上，而不是从发送结束时重新计时，因此误差不会累积；
+    粗等待通过 Event.wait 完成（stop 时立即唤醒），并根据实测的超时量提前醒来，
+    最后一小段用让出 CPU 的自旋补齐。
+    """
+
+    def __init__(self, cancel_event: threading.Event | None = None):
+        self.cancel_event = cancel_event or threading.Event()
+        self.jitter = JitterStats()
+        self._deadline = time.perf_counter_ns()
+        # Event.wait 的平均超时量（纳秒），用于提前唤醒
+        self._slack_ns = 0
+
+    def start(self):
+        """Anchor the schedule at the current instant."""
+        self._deadline = time.perf_counter_ns()
+
+    @property
+    def deadline_ns(self) -> int:
+        """Absolute deadline of the most recent wait_next (perf_counter_ns)."""
+        return self._deadline
+
+    def wait_next(self, delay_ms: float) -> bool:
+        """Sleep until the next absolute deadline; return False if cancelled."""
+        self._deadline += int(delay_ms * 1_000_000)
+        now = time.perf_counter_ns()
+        if now - self._deadline > MAX_LAG_NS:
+            self.jitter.resyncs += 1
+            self._deadline = now
+        return self.sleep_until(self._deadline)
+
+    def sleep_for(self, delay_ms: float) -> bool:
+        """Sleep relative to now without touching the running schedule."""
+        return self.sleep_until(time.perf_counter_ns() + int(delay_ms * 1_000_000), record=False)
+
+    def sleep_until(self, deadline_ns: int, record: bool = True) -> bool:
+        cancel = self.cancel_event
+        while True:
+            remaining = deadline_ns - time.perf_counter_ns()
+            if remaining <= 0:
+                break
+            coarse = remaining - SPIN_NS - self._slack_ns
+            if coarse > 0:
+                target = time.perf_counter_ns() + coarse
+                if cancel.wait(coarse / 1_000_000_000):
+                    return False
+                # 指数滑动平均，只跟踪正向超时
+                overshoot = time.perf_counter_ns() - target
+                overshoot = min(max(0, overshoot), MAX_SLACK_NS)
+                self._slack_ns += (overshoot - self._slack_ns) // 8
+            else:
+                if cancel.is_set():
+                    return False
+                time.sleep(0)
+        if record:
+            self.jitter.add(time.perf_counter_ns() - deadline_ns)
+        return not cancel.is_set()
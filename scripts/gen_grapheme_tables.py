@@ -0,0 +1,112 @@
+"""Generate grapheme_tables.py from the Unicode Character Database.
+
+Usage:
+    python scripts/gen_grapheme_tables.py [UCD_DIR] [--version 18.0.0]
+
+UCD_DIR must contain GraphemeBreakProperty.txt, emoji-data.txt and
+DerivedCoreProperties.txt; without it the files are downloaded from unicode.org.
+"""
+import argparse
+import re
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+OUTPUT = ROOT / "grapheme_tables.py"
+UCD_URL = "https://www.unicode.org/Public/{version}/ucd/{path}"
+SOURCES = {
+    "GraphemeBreakProperty.txt": "auxiliary/GraphemeBreakProperty.txt",
+    "emoji-data.txt": "emoji/emoji-data.txt",
+    "DerivedCoreProperties.txt": "DerivedCoreProperties.txt",
+}
+LINE_RE = re.compile(r"^([0-9A-F]+)(?:\.\.([0-9A-F]+))?\s*;\s*([\w]+)(?:\s*;\s*(\w+))?")
+
+# 输出表名 -> (源文件, 属性, 属性值)
+TABLES = {
+    "CR": ("GraphemeBreakProperty.txt", "CR", None),
+    "LF": ("GraphemeBreakProperty.txt", "LF", None),
+    "CONTROL": ("GraphemeBreakProperty.txt", "Control", None),
+    "EXTEND": ("GraphemeBreakProperty.txt", "Extend", None),
+    "ZWJ": ("GraphemeBreakProperty.txt", "ZWJ", None),
+    "REGIONAL_INDICATOR": ("GraphemeBreakProperty.txt", "Regional_Indicator", None),
+    "PREPEND": ("GraphemeBreakProperty.txt", "Prepend", None),
+    "SPACING_MARK": ("GraphemeBreakProperty.txt", "SpacingMark", None),
+    "L": ("GraphemeBreakProperty.txt", "L", None),
+    "V": ("GraphemeBreakProperty.txt", "V", None),
+    "T": ("GraphemeBreakProperty.txt", "T", None),
+    "EXTENDED_PICTOGRAPHIC": ("emoji-data.txt", "Extended_Pictographic", None),
+    "INCB_CONSONANT": ("DerivedCoreProperties.txt", "InCB", "Consonant"),
+    "INCB_LINKER": ("DerivedCoreProperties.txt", "InCB", "Linker"),
+    "INCB_EXTEND": ("DerivedCoreProperties.txt", "InCB", "Extend"),
+}
+
+
+def read_source(ucd_dir: Path | None, version: str, name: str) -> str:
+    if ucd_dir:
+        return (ucd_dir / name).read_text(encoding="utf-8")
+    with urllib.request.urlopen(UCD_URL.format(version=version, path=SOURCES[name])) as resp:
+        return resp.read().decode("utf-8")
+
+
+def parse_ranges(text: str, prop: str, value: str | None) -> list[tuple[int, int]]:
+    ranges = []
+    for line in text.splitlines():
+        match = LINE_RE.match(line)
+        if not match or match.group(3) != prop or match.group(4) != value:
+            continue
+        start = int(match.group(1), 16)
+        end = int(match.group(2) or match.group(1), 16)
+        ranges.append((start, end))
+    ranges.sort()
+    merged: list[tuple[int, int]] = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def render(version: str, tables: dict[str, list[tuple[int, int]]]) -> str:
+    lines = [
+        f'"""Grapheme_Cluster_Break property ranges (Unicode {version}).',
+        "",
+        "Generated by scripts/gen_grapheme_tables.py; do not edit by hand.",
+        "Hangul LV/LVT syllables are derived algorithmically in grapheme.py.",
+        '"""',
+        "",
+        f'UNICODE_VERSION = "{version}"',
+    ]
+    for name, ranges in tables.items():
+        lines.append("")
+        lines.append(f"{name} = (")
+        row = []
+        for start, end in ranges:
+            row.append(f"(0x{start:X}, 0x{end:X}),")
+            if len(row) == 4:
+                lines.append("    " + " ".join(row))
+                row = []
+        if row:
+            lines.append("    " + " ".join(row))
+        lines.append(")")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("ucd_dir", nargs="?", type=Path)
+    parser.add_argument("--version", default="18.0.0")
+    args = parser.parse_args()
+
+    sources = {name: read_source(args.ucd_dir, args.version, name) for name in SOURCES}
+    header = sources["GraphemeBreakProperty.txt"].splitlines()[0]
+    version_match = re.search(r"-(\d+\.\d+\.\d+)\.txt", header)
+    version = version_match.group(1) if version_match else args.version
+
+    tables = {name: parse_ranges(sources[src], prop, value) for name, (src, prop, value) in TABLES.items()}
+    OUTPUT.write_text(render(version, tables), encoding="utf-8")
+    print(f"wrote {OUTPUT} (Unicode {version})")
+
+
+if __name__ == "__main__":
+    main()
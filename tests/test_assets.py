@@ -0,0 +1,55 @@
+import logging
+
+from assets import PACK_NAME, AssetIndex, default_index, read_pack, write_pack
+
+
+def _make_root(root, files):
+    for name, data in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    return root
+
+
+def test_index_loads_assets_and_first_root_wins(tmp_path):
+    first = _make_root(tmp_path / "a", {"svg/x.svg": b"<svg a/>", "icon.ico": b"ico"})
+    second = _make_root(tmp_path / "b", {"svg/x.svg": b"<svg b/>", "assets/demo.svg": b"demo", "other.txt": b"-"})
+    index = AssetIndex([first, second])
+    assert index.names() == ["assets/demo.svg", "icon.ico", "svg/x.svg"]
+    assert index.get("svg", "x.svg") == b"<svg a/>"
+    assert index.path("assets", "demo.svg") == second / "assets" / "demo.svg"
+    assert index.total_bytes == len(b"<svg a/>ico") + 4
+    # 建立索引后删除文件不影响查找：内容已在内存中
+    (first / "svg" / "x.svg").unlink()
+    assert index.get("svg", "x.svg") == b"<svg a/>"
+
+
+def test_missing_asset_reported_once(tmp_path, caplog):
+    index = AssetIndex([tmp_path])
+    with caplog.at_level(logging.WARNING, logger="assets"):
+        assert index.get("svg", "missing.svg") is None
+        assert index.get("svg", "missing.svg") is None
+    assert [r.getMessage().startswith("Asset not found: svg/missing.svg") for r in caplog.records] == [True]
+
+
+def test_pack_round_trip_and_preferred(tmp_path):
+    source = _make_root(tmp_path / "src", {"svg/x.svg": b"<svg/>", "icon.ico": bytes(range(256))})
+    target = _make_root(tmp_path / "dist", {"svg/x.svg": b"stale"})
+    assert write_pack(AssetIndex([source]), target / PACK_NAME) == 2
+    assert read_pack(target / PACK_NAME) == {"svg/x.svg": b"<svg/>", "icon.ico": bytes(range(256))}
+    index = AssetIndex([target])
+    assert index.source == str(target / PACK_NAME)
+    assert index.get("svg", "x.svg") == b"<svg/>"
+    assert index.path("svg", "x.svg") is None
+
+
+def test_corrupt_pack_falls_back_to_directories(tmp_path):
+    root = _make_root(tmp_path, {"svg/x.svg": b"<svg/>", PACK_NAME: b"garbage"})
+    assert AssetIndex([root]).get("svg", "x.svg") == b"<svg/>"
+
+
+def test_default_index_covers_repo_assets():
+    index = default_index()
+    assert index is default_index()
+    for name in ("svg/gear.svg", "svg/play.svg", "assets/demo.svg", "icon.ico"):
+        assert name in index
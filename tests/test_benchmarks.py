@@ -0,0 +1,83 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+
+BENCHMARKS = Path(__file__).resolve().parent.parent / "benchmarks"
+sys.path.insert(0, str(BENCHMARKS))
+
+import bench_engine  # noqa: E402
+from benchlib import compare  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def qapp():
+    app = QCoreApplication.instance()
+    if app is None:
+        app = QCoreApplication(sys.argv)
+    return app
+
+
+def _report(**cases):
+    return {"cases": {name: {"best_s": best} for name, best in cases.items()}}
+
+
+def test_compare_flags_only_slowdowns_beyond_threshold():
+    baseline = _report(a=1.0, b=1.0, c=1.0)
+    current = _report(a=1.1, b=1.3, c=0.5, new=9.0)
+    assert compare(baseline, current, 0.2) == ["b"]
+    assert compare(baseline, current, 0.05) == ["a", "b"]
+
+
+def test_corpora_are_deterministic_and_sized():
+    first = bench_engine.build_corpora(0.001)
+    assert first == bench_engine.build_corpora(0.001)
+    assert set(first) == {"ascii", "cjk", "emoji", "mixed"}
+    assert "‍" in first["emoji"]
+    assert all(len(text.encode("utf-8")) >= 1000 for text in first.values())
+
+
+def test_engine_suite_writes_and_compares(tmp_path, monkeypatch):
+    monkeypatch.setattr(bench_engine, "CORPUS_BYTES", {"ascii": 2048, "emoji": 2048})
+    out = tmp_path / "engine.json"
+    args = ["--quick", "--repeat", "1", "--only", "compile_plan", "--only", "worker_burst"]
+    assert bench_engine.main(args + ["--out", str(out)]) == 0
+    report = json.loads(out.read_text(encoding="utf-8"))
+    assert set(report["cases"]) == {"compile_plan/ascii", "compile_plan/emoji",
+                                    "worker_burst/ascii", "worker_burst/emoji"}
+    for case in report["cases"].values():
+        case["best_s"] /= 1000
+    out.write_text(json.dumps(report), encoding="utf-8")
+    assert bench_engine.main(args + ["--compare", str(out)]) == 1
+
+
+def test_pacing_case_reports_send_error():
+    case = bench_engine.pacing_error("abcdefghij" * 20, graphemes=50)
+    assert 50 <= case["units"] < 200 and case["unit"] == "send"
+    assert 0 <= case["median_s"] <= case["best_s"] and case["max_ms"] * 1e6 >= case["ns_per_unit"]
+
+
+def test_bench_ui_runs_offscreen(tmp_path):
+    # 需要 QApplication，与测试进程共用的 QCoreApplication 冲突，在子进程中运行
+    out = tmp_path / "ui.json"
+    env = {**os.environ, "QT_QPA_PLATFORM": "offscreen", "LOCALAPPDATA": str(tmp_path)}
+    result = subprocess.run([sys.executable, str(BENCHMARKS / "bench_ui.py"), "--repeat", "1", "--out", str(out)],
+                            cwd=tmp_path, env=env, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    report = json.loads(out.read_text(encoding="utf-8"))
+    assert report["suite"] == "ui" and report["qpa_platform"] == "offscreen"
+    assert set(report["cases"]) == {
+        "main_window_init", "apply_theme", "apply_language_texts", "refresh_icons", "open_settings_dialog",
+        "progress_updates", "job_cpu_visible", "job_cpu_minimized", "job_cpu_no_effects",
+    }
+    for case in report["cases"].values():
+        assert case["best_s"] > 0 and case["ns_per_unit"] > 0
+    assert report["cases"]["main_window_init"]["repeat"] == 20
+    # 最小化后动画定时器停止、绘制次数下降；CPU 比值受机器负载影响，只留在报告里
+    visible, minimized = report["cases"]["job_cpu_visible"], report["cases"]["job_cpu_minimized"]
+    assert visible["timers_active"] and not minimized["timers_active"]
+    assert minimized["paints"] < visible["paints"]
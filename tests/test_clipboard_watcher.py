@@ -0,0 +1,79 @@
+import sys
+import time
+
+import pytest
+from PySide6.QtCore import QCoreApplication, QObject, Signal
+
+from clipboard_watcher import ClipboardWatcher
+
+
+@pytest.fixture(scope="session", autouse=True)
+def qapp():
+    app = QCoreApplication.instance()
+    if app is None:
+        app = QCoreApplication(sys.argv)
+    return app
+
+
+class FakeClipboard(QObject):
+    dataChanged = Signal()
+
+    def __init__(self, text=""):
+        super().__init__()
+        self._text = text
+
+    def text(self):
+        return self._text
+
+    def set_text(self, text):
+        self._text = text
+        self.dataChanged.emit()
+
+
+def _spin_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        QCoreApplication.processEvents()
+        time.sleep(0.005)
+    return predicate()
+
+
+def test_watcher_prearms_latest_clipboard_text():
+    clipboard = FakeClipboard()
+    watcher = ClipboardWatcher(clipboard, debounce_ms=10)
+    clipboard.set_text("first")
+    clipboard.set_text("héllo\r\nworld")
+    assert _spin_until(lambda: watcher.take("héllo\r\nworld") is not None)
+
+    prepared = watcher.take("héllo\r\nworld")
+    assert prepared.job.text == "héllo\nworld"
+    assert prepared.plans[0].total_graphemes == prepared.job.total_graphemes
+    assert watcher.take("first") is None
+    assert watcher.current() is prepared
+    # 剪贴板变化后、重新准备前不能再使用旧缓存
+    clipboard.set_text("next")
+    assert watcher.current() is None
+    assert watcher.hits >= 1 and watcher.misses >= 1
+    watcher.shutdown()
+
+
+def test_cleared_clipboard_drops_prepared_job():
+    clipboard = FakeClipboard()
+    watcher = ClipboardWatcher(clipboard, debounce_ms=10)
+    clipboard.set_text("secret")
+    assert _spin_until(lambda: watcher.current() is not None)
+
+    # 密码管理器清空剪贴板，或复制了图片（text() 为空）
+    clipboard.set_text("")
+    assert _spin_until(lambda: not watcher._timer.isActive())
+    assert watcher.current() is None
+    assert watcher.take("secret") is None
+
+    # 清空时仍在准备的旧内容也不能在之后变成可用缓存
+    clipboard.set_text("x" * 200_000)
+    QCoreApplication.processEvents()
+    assert _spin_until(lambda: watcher._preparer is not None or watcher.current() is not None)
+    clipboard.set_text("")
+    assert _spin_until(lambda: watcher._preparer is None and not watcher._timer.isActive())
+    assert watcher.current() is None
+    watcher.shutdown()
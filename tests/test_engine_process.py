@@ -0,0 +1,164 @@
+import struct
+import sys
+import time
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+
+from engine_process import ProcessPasteWorker, SharedState, export_job, import_job
+from plan_file import PlanFile, write_plan_file
+from typing_job import StreamingJob, TypingJob
+
+
+@pytest.fixture(scope="session", autouse=True)
+def qapp():
+    app = QCoreApplication.instance()
+    if app is None:
+        app = QCoreApplication(sys.argv)
+    return app
+
+
+def test_shared_state_round_trip():
+    writer = SharedState.create()
+    reader = SharedState.attach(writer.name)
+    try:
+        writer.update(next_offset=42, total=100, percent=42, rate=12.5, eta=4.0, status="status:typing")
+        state = reader.read()
+        assert state["next_offset"] == 42 and state["percent"] == 42 and state["rate"] == 12.5
+        assert state["status"] == "status:typing" and not state["finished"]
+    finally:
+        reader.close()
+        writer.close(unlink=True)
+
+
+def test_shared_state_read_gives_up_on_half_written_state():
+    writer = SharedState.create()
+    reader = SharedState.attach(writer.name)
+    try:
+        writer.update(next_offset=7, status="status:typing")
+        assert reader.read()["next_offset"] == 7
+        # 写入方在奇数序号之后退出：读取不能一直等下去，返回上一次一致的快照
+        struct.pack_into("<Q", writer.shm.buf, 0, 99)
+        state = reader.read()
+        assert state["next_offset"] == 7 and state["status"] == "status:typing" and not state["finished"]
+    finally:
+        reader.close()
+        writer.close(unlink=True)
+
+
+@pytest.mark.parametrize("job", [TypingJob("a\r\nb😊👨‍👩‍👧"), StreamingJob.from_text("a\r\nb😊👨‍👩‍👧", chunk_chars=3)])
+def test_export_job_round_trip(job):
+    spec, shm = export_job(job)
+    try:
+        copy = import_job(spec)
+    finally:
+        shm.close()
+        shm.unlink()
+    assert type(copy) is type(job)
+    if isinstance(job, TypingJob):
+        assert copy.text == job.text and copy.boundaries == job.boundaries
+    else:
+        assert [w.text for _, w in copy.iter_windows(0, 2)] == [w.text for _, w in job.iter_windows(0, 2)]
+
+
+def _run(worker):
+    statuses = []
+    finished = []
+    worker.status_signal.connect(statuses.append)
+    worker.finished_signal.connect(lambda: finished.append(True))
+    worker.start()
+    return statuses, finished
+
+
+def test_process_worker_completes(tmp_path):
+    job = TypingJob("héllo 😊\n" * 50)
+    worker = ProcessPasteWorker(job, 0, 0, countdown_seconds=0, backend="recording", log_file=tmp_path / "engine.log")
+    statuses, finished = _run(worker)
+    assert worker.isRunning()
+    assert worker.wait(30000)
+    assert finished == [True]
+    assert worker.completed and worker.next_offset == job.total_graphemes
+    assert statuses[-1] == "status:finished"
+
+
+def test_process_worker_stop_and_resume(tmp_path):
+    job = TypingJob("abcdefghij" * 100)
+    log_file = tmp_path / "engine.log"
+    worker = ProcessPasteWorker(job, 2, 0, countdown_seconds=0, backend="recording", log_file=log_file)
+    _run(worker)
+    deadline = time.monotonic() + 30
+    while worker.next_offset == 0 and time.monotonic() < deadline:
+        QCoreApplication.processEvents()
+        time.sleep(0.01)
+    worker.stop()
+    assert worker.wait(30000)
+    assert not worker.completed
+    assert 0 < worker.next_offset < job.total_graphemes
+
+    # 续打语义不变：从上次的字素下标继续
+    resumed = ProcessPasteWorker(job, 0, 0, start_offset=worker.next_offset, countdown_seconds=0,
+                                 backend="recording", log_file=log_file)
+    _run(resumed)
+    assert resumed.wait(30000)
+    assert resumed.completed and resumed.next_offset == job.total_graphemes
+
+
+def test_process_worker_runs_plan_file(tmp_path):
+    path = tmp_path / "job.plan"
+    write_plan_file("plan file text", path)
+    worker = ProcessPasteWorker(PlanFile(path), 0, 0, countdown_seconds=0, backend="recording",
+                                log_file=tmp_path / "engine.log")
+    _run(worker)
+    assert worker.wait(30000)
+    assert worker.completed and worker.next_offset == 14
+
+
+def test_process_worker_exports_off_calling_thread(tmp_path, monkeypatch):
+    import threading
+
+    import engine_process
+
+    threads = []
+
+    def recording_export(job):
+        threads.append(threading.current_thread())
+        return export_job(job)
+
+    monkeypatch.setattr(engine_process, "export_job", recording_export)
+    job = StreamingJob.from_text("streamed text " * 20, chunk_chars=8)
+    worker = ProcessPasteWorker(job, 0, 0, countdown_seconds=0, backend="recording", log_file=tmp_path / "engine.log")
+    _run(worker)
+    assert worker.wait(30000)
+    # start() 只交出句柄：编码与复制在启动线程中完成
+    assert threads and threads[0] is not threading.current_thread()
+    assert worker.completed and worker.next_offset == worker.total_graphemes == 280
+
+
+def test_process_worker_reports_launch_failure(tmp_path, monkeypatch):
+    import engine_process
+
+    def failing_export(job):
+        raise OSError("no shared memory")
+
+    monkeypatch.setattr(engine_process, "export_job", failing_export)
+    worker = ProcessPasteWorker(TypingJob("abc"), 0, 0, countdown_seconds=0, backend="recording",
+                                log_file=tmp_path / "engine.log")
+    statuses, finished = _run(worker)
+    assert worker.wait(30000)
+    assert finished == [True] and statuses == ["status:stopped"]
+    assert not worker.completed and worker.next_offset == 0
+
+
+def test_process_worker_notices_killed_engine(tmp_path):
+    worker = ProcessPasteWorker(TypingJob("abcdefghij" * 100), 5, 0, countdown_seconds=0, backend="recording",
+                                log_file=tmp_path / "engine.log")
+    statuses, finished = _run(worker)
+    deadline = time.monotonic() + 30
+    while worker.next_offset == 0 and time.monotonic() < deadline:
+        QCoreApplication.processEvents()
+        time.sleep(0.01)
+    assert worker.next_offset > 0, "engine process never reported progress"
+    worker._process.kill()
+    assert worker.wait(30000)
+    assert finished == [True] and statuses[-1] == "status:stopped"
+    assert not worker.completed
@@ -0,0 +1,67 @@
+from pathlib import Path
+
+import pytest
+
+import grapheme
+from core_engine import InputSimulator
+
+BREAK_TEST = Path(__file__).parent / "data" / "GraphemeBreakTest.txt"
+
+
+def _load_break_test():
+    cases = []
+    for line in BREAK_TEST.read_text(encoding="utf-8").splitlines():
+        data = line.split("#", 1)[0].strip()
+        if not data:
+            continue
+        clusters, current = [], ""
+        for token in data.split():
+            if token == "÷":
+                if current:
+                    clusters.append(current)
+                current = ""
+            elif token != "×":
+                current += chr(int(token, 16))
+        cases.append(("".join(clusters), clusters))
+    return cases
+
+
+BREAK_CASES = _load_break_test()
+
+
+def test_break_test_file_version_matches_tables():
+    header = BREAK_TEST.read_text(encoding="utf-8").splitlines()[0]
+    assert grapheme.UNICODE_VERSION in header
+    assert len(BREAK_CASES) > 800
+
+
+@pytest.mark.parametrize("text,expected", BREAK_CASES)
+def test_official_break_cases(text, expected):
+    assert grapheme.split_graphemes(text) == expected
+    assert list(grapheme.iter_graphemes(text)) == expected
+    assert grapheme.count_graphemes(text) == len(expected)
+    bounds = grapheme.grapheme_boundaries(text)
+    assert [text[a:b] for a, b in zip(bounds, bounds[1:])] == expected
+
+
+def test_fast_path_and_scripts():
+    assert grapheme.split_graphemes("ab\r\nc") == ["a", "b", "\r\n", "c"]
+    assert grapheme.split_graphemes("中文，好") == ["中", "文", "，", "好"]
+    # 韩文字母组合、天城文辅音连写、带 ZWJ 的家庭 emoji
+    assert grapheme.split_graphemes("각") == ["각"]
+    assert grapheme.split_graphemes("क्षि") == ["क्षि"]
+    assert grapheme.split_graphemes("👨‍👩‍👧‍👦🇨🇳🇯") == ["👨‍👩‍👧‍👦", "🇨🇳", "🇯"]
+    assert list(grapheme.grapheme_boundaries("abc")) == [0, 1, 2, 3]
+    assert list(grapheme.grapheme_boundaries("")) == [0]
+
+
+def test_input_simulator_delegates():
+    assert list(InputSimulator.iter_graphemes("éx")) == ["é", "x"]
+    assert InputSimulator.count_graphemes("👍🏽👍") == 2
+
+
+def test_translate_fallback_matches_numpy(monkeypatch):
+    text = "".join(t for t, _ in BREAK_CASES)
+    expected = grapheme.split_graphemes(text)
+    monkeypatch.setattr(grapheme, "np", None)
+    assert grapheme.split_graphemes(text) == expected
@@ -0,0 +1,74 @@
+import sys
+import threading
+import time
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+
+from core_engine import PasteWorker
+from hotkeys import FakeHotkeyListener, create_hotkey_listener
+from input_backends import RecordingBackend
+
+
+@pytest.fixture(scope="session", autouse=True)
+def qapp():
+    app = QCoreApplication.instance()
+    if app is None:
+        app = QCoreApplication(sys.argv)
+    return app
+
+
+def test_fake_listener_registration():
+    listener = FakeHotkeyListener(fail_ids={2})
+    assert listener.register(1, 0x78)
+    assert not listener.register(2, 0x7A)
+    assert listener.registered == {1: (0x78, 0)}
+    assert listener.unregister(1)
+    assert not listener.unregister(1)
+
+
+def test_press_runs_fast_handler_off_ui_thread_and_queues_activation(qapp):
+    listener = FakeHotkeyListener()
+    listener.register(7, 0x78)
+    fast = []
+    activated = []
+    listener.fast_handler = lambda hotkey_id, ns: fast.append((hotkey_id, threading.current_thread())) or True
+    listener.activated.connect(lambda hotkey_id, ns, handled: activated.append((hotkey_id, handled)))
+    listener.press(7)
+    assert fast and fast[0][0] == 7 and fast[0][1] is not threading.main_thread()
+    # activated 排队到界面线程，事件循环处理后才到达
+    assert activated == []
+    qapp.processEvents()
+    assert activated == [(7, True)]
+    # 未注册的热键不触发
+    listener.press(8)
+    qapp.processEvents()
+    assert activated == [(7, True)]
+
+
+def test_stop_hotkey_is_not_delayed_by_busy_ui_thread():
+    worker = PasteWorker("abcdefghij" * 1000, 5, 0, countdown_seconds=0,
+                         backend=RecordingBackend(record=False))
+    listener = FakeHotkeyListener()
+    listener.register(102, 0x7A)
+    listener.fast_handler = lambda hotkey_id, ns: worker.stop()
+    worker.start()
+    deadline = time.monotonic() + 5
+    while worker.next_offset == 0 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    if worker.next_offset == 0:
+        worker.stop()
+        worker.wait(1000)
+        pytest.fail("worker did not start typing within 5s")
+    listener.press(102, blocking=False)
+    # 模拟界面线程忙（没有处理事件），停止仍应立即生效
+    start = time.perf_counter()
+    assert worker.wait(1000)
+    assert time.perf_counter() - start < 0.2
+    assert not worker.completed
+
+
+def test_default_listener_off_windows_is_fake():
+    if sys.platform == "win32":
+        pytest.skip("Win32 listener on Windows")
+    assert isinstance(create_hotkey_listener(), FakeHotkeyListener)
@@ -0,0 +1,85 @@
+import sys
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+from PySide6.QtGui import QColor
+
+import icon_cache
+from icon_cache import IconCache
+
+
+@pytest.fixture(scope="session", autouse=True)
+def qapp():
+    app = QCoreApplication.instance()
+    if app is None:
+        app = QCoreApplication(sys.argv)
+    return app
+
+
+class FakeIcon:
+    def __init__(self, name, null=False):
+        self.name = name
+        self.null = null
+
+    def isNull(self):
+        return self.null
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    # 栅格化需要 QGuiApplication；这里只检查缓存逻辑，解码替换为记录参数的假图标
+    monkeypatch.setattr(icon_cache, "icon_from_data", lambda data, size, dpr: FakeIcon((data, size, dpr)))
+    calls = []
+
+    def load(filename):
+        calls.append(filename)
+        return None if filename == "missing.svg" else f"<svg {filename}/>".encode()
+
+    return calls, load
+
+
+def test_same_key_hits_without_loading_again(loads):
+    calls, load = loads
+    cache = IconCache(load)
+    first = cache.get("gear.svg", QColor("#112233"), 20, 1.0)
+    # 颜色按值比较，不同的 QColor 对象也命中
+    assert cache.get("gear.svg", QColor("#112233"), 20, 1.0) is first
+    assert calls == ["gear.svg"]
+    assert (cache.hits, cache.misses, len(cache)) == (1, 1, 1)
+    assert first.name == (b"<svg gear.svg/>", 20, 1.0)
+
+
+@pytest.mark.parametrize("color, size, dpr", [("#445566", 20, 1.0), ("#112233", 24, 1.0), ("#112233", 20, 2.0)])
+def test_different_color_size_or_dpr_misses(loads, color, size, dpr):
+    calls, load = loads
+    cache = IconCache(load)
+    first = cache.get("gear.svg", QColor("#112233"), 20, 1.0)
+    other = cache.get("gear.svg", QColor(color), size, dpr)
+    assert other is not first
+    assert calls == ["gear.svg", "gear.svg"]
+    assert (cache.hits, cache.misses, len(cache)) == (0, 2, 2)
+
+
+def test_fallback_only_used_when_svg_missing(loads):
+    calls, load = loads
+    cache = IconCache(load)
+    fallbacks = []
+
+    def fallback():
+        fallbacks.append(True)
+        return FakeIcon("drawn", null=True)
+
+    icon = cache.get("gear.svg", QColor("red"), 20, 1.0, fallback)
+    assert icon.name == (b"<svg gear.svg/>", 20, 1.0)
+    assert fallbacks == []
+
+    missing = cache.get("missing.svg", QColor("red"), 20, 1.0, fallback)
+    assert fallbacks == [True]
+    # 备用图标同样被缓存，再次请求不再绘制
+    assert cache.get("missing.svg", QColor("red"), 20, 1.0, fallback) is missing
+    assert fallbacks == [True] and calls == ["gear.svg", "missing.svg"]
+
+    cache.clear()
+    assert len(cache) == 0
+    cache.get("missing.svg", QColor("red"), 20, 1.0, fallback)
+    assert fallbacks == [True, True]
@@ -0,0 +1,85 @@
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# MainWindow 需要 QApplication，与测试进程共用的 QCoreApplication 冲突，脚本在子进程中运行
+SCRIPT = textwrap.dedent("""
+    import sys
+    import tempfile
+
+    sys.path[:0] = [{root!r}, {benchmarks!r}]
+
+    from PySide6.QtWidgets import QApplication
+
+    from bench_ui import isolate_settings, new_window, stub_win32
+
+    stub_win32()
+    isolate_settings(tempfile.mkdtemp())
+    app = QApplication(sys.argv[:1])
+    window = new_window()
+    window.show()
+    app.processEvents()
+    assert not window._ui_suspended
+
+    window._set_progress_target(10, instant=True)
+    window._on_worker_progress(10, 100.0, 30.0)
+    tooltip = window.progress_bar.toolTip()
+    window._start_spinner()
+    assert window._spinner_timer.isActive()
+
+    # 最小化：两个定时器都停止
+    window.showMinimized()
+    app.processEvents()
+    assert window._ui_suspended
+    assert not window._spinner_timer.isActive() and not window._progress_timer.isActive()
+
+    # 不可见期间的进度只更新目标值，进度条与提示文本不变
+    window._on_worker_progress(40, 110.0, 20.0)
+    window._on_worker_progress(60, 120.0, 5.0)
+    app.processEvents()
+    assert window.progress_bar.value() == 10 and window._progress_target == 60
+    assert window.progress_bar.toolTip() == tooltip
+    assert window._pending_progress_detail == (120.0, 5.0)
+    assert not window._progress_timer.isActive()
+
+    # 恢复：直接跳到最新目标，补上提示文本，重新启动转圈
+    window.showNormal()
+    app.processEvents()
+    assert not window._ui_suspended
+    assert window.progress_bar.value() == 60
+    assert window.progress_bar.toolTip() == window.msg("progress_detail", rate=120.0, eta=window._format_eta(5.0))
+    assert window.progress_bar.toolTip() != tooltip
+    assert window._pending_progress_detail is None
+    assert window._spinner_timer.isActive() and not window._progress_timer.isActive()
+
+    # 隐藏到托盘与最小化同样处理
+    window.hide()
+    app.processEvents()
+    assert window._ui_suspended and not window._spinner_timer.isActive()
+    window.show()
+    app.processEvents()
+    assert not window._ui_suspended and window._spinner_timer.isActive()
+
+    # 停止转圈后恢复不会重新启动它
+    window._stop_spinner()
+    window.showMinimized()
+    app.processEvents()
+    window.showNormal()
+    app.processEvents()
+    assert not window._spinner_timer.isActive()
+    print("ok")
+""")
+
+
+def test_minimized_window_suspends_and_restores_ui(tmp_path):
+    script = tmp_path / "idle_mode.py"
+    script.write_text(SCRIPT.format(root=str(ROOT), benchmarks=str(ROOT / "benchmarks")), encoding="utf-8")
+    env = {**os.environ, "QT_QPA_PLATFORM": "offscreen", "LOCALAPPDATA": str(tmp_path)}
+    result = subprocess.run([sys.executable, str(script)], cwd=tmp_path, env=env, capture_output=True, text=True,
+                            timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().endswith("ok")
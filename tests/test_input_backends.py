@@ -0,0 +1,58 @@
+import pytest
+
+from core_engine import InputSimulator
+from input_backends import RecordingBackend, X11Backend, create_backend
+
+
+def test_recording_backend_roundtrip():
+    text = "a😊\n👨‍👩‍👧‍👦"
+    plan = InputSimulator.compile_plan(InputSimulator.iter_graphemes(text))
+    backend = RecordingBackend()
+    first, count = plan.span(0, plan.total_graphemes)
+    assert backend.send(plan.events, first, count) == count
+    assert len(backend.events) == plan.total_events
+    assert backend.text() == text
+
+
+def test_recording_backend_without_record():
+    plan = InputSimulator.compile_plan(["a", "b"])
+    backend = RecordingBackend(record=False)
+    assert backend.send(plan.events, 0, plan.total_events) == 4
+    assert backend.events == []
+    assert backend.calls == 1
+
+
+def test_create_backend_by_name(monkeypatch):
+    monkeypatch.delenv("MIHOYO_INPUT_BACKEND", raising=False)
+    assert isinstance(create_backend("recording"), RecordingBackend)
+    monkeypatch.setenv("MIHOYO_INPUT_BACKEND", "recording")
+    assert isinstance(create_backend(), RecordingBackend)
+    with pytest.raises(ValueError):
+        create_backend("nope")
+
+
+def test_auto_backend_never_falls_back_to_recording(monkeypatch):
+    monkeypatch.delenv("MIHOYO_INPUT_BACKEND", raising=False)
+    monkeypatch.setattr("sys.platform", "linux")
+    monkeypatch.delenv("DISPLAY", raising=False)
+    with pytest.raises(OSError, match="DISPLAY"):
+        create_backend()
+
+    def broken(*args, **kwargs):
+        raise OSError("cannot open X display")
+
+    monkeypatch.setenv("DISPLAY", ":99")
+    monkeypatch.setattr(X11Backend, "__init__", broken)
+    with pytest.raises(OSError, match="X11"):
+        create_backend("auto")
+
+
+def test_x11_keysyms_for_control_characters():
+    assert X11Backend.keysym_for(ord("\t")) == 0xFF09
+    assert X11Backend.keysym_for(ord("\n")) == 0xFF0D
+    assert X11Backend.keysym_for(ord("\r")) == 0xFF0D
+    assert X11Backend.keysym_for(ord("a")) == ord("a")
+    assert X11Backend.keysym_for(0xE9) == 0xE9
+    assert X11Backend.keysym_for(0x4E2D) == 0x01004E2D
+    assert X11Backend.keysym_for(0x01) is None
+    assert X11Backend.keysym_for(0x85) is None
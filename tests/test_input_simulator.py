@@ -42,3 +42,22 @@ def test_send_char_zwj_sequence(monkeypatch):
     assert InputSimulator.send_char(family) is True
     # 4 emojis (2 units each) + 3 ZWJ = 11 code units -> 22 INPUTs
     assert captured.get("len") == 22
+
+
+def test_compile_plan_offsets():
+    plan = InputSimulator.compile_plan(["a", "😊", "\n", "a"])
+    assert plan.total_graphemes == 4
+    # a: 2, 😊: 4, \n: 2 (VK_RETURN down/up), a: 2
+    assert list(plan.offsets) == [0, 2, 6, 8, 10]
+    assert plan.total_events == len(plan.events) == 10
+    assert plan.span(1, 3) == (2, 6)
+    assert plan.events[6].ki.wVk == WinSystem.VK_RETURN
+    assert plan.events[7].ki.dwFlags == WinSystem.KEYEVENTF_KEYUP
+    assert plan.events[8].ki.wScan == ord("a")
+    assert plan.events[8].ki.dwFlags == WinSystem.KEYEVENTF_UNICODE
+
+
+def test_compile_plan_empty():
+    plan = InputSimulator.compile_plan([])
+    assert plan.total_graphemes == 0
+    assert plan.total_events == 0
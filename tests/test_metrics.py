@@ -0,0 +1,80 @@
+import random
+import sys
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+
+from core_engine import PasteWorker
+from input_backends import RecordingBackend
+from metrics import BUCKET_COUNT, Histogram, _bucket, _bucket_upper, format_summary, read_summaries, write_summary
+
+
+@pytest.fixture(scope="session", autouse=True)
+def qapp():
+    app = QCoreApplication.instance()
+    if app is None:
+        app = QCoreApplication(sys.argv)
+    return app
+
+
+def test_buckets_are_monotonic_and_bounded():
+    last = -1
+    for value in list(range(0, 5000)) + [10 ** 6, 10 ** 9, 2 ** 43]:
+        index = _bucket(value)
+        assert index >= last
+        assert value <= _bucket_upper(index)
+        last = index
+    assert _bucket(2 ** 60) == BUCKET_COUNT - 1
+    # 最后一个桶的上界约为 2^45 ns（约 9.8 小时）
+    assert _bucket_upper(BUCKET_COUNT - 1) == 2 ** 45 - 1
+
+
+def test_percentiles_within_relative_error():
+    rng = random.Random(1)
+    values = sorted(int(rng.lognormvariate(10, 1.5)) for _ in range(20000))
+    hist = Histogram()
+    for v in values:
+        hist.record(v)
+    for pct in (50, 90, 99):
+        exact = values[int(len(values) * pct / 100) - 1]
+        assert abs(hist.percentile(pct) - exact) <= exact / 16 + 1
+    assert hist.percentile(100) == hist.max == values[-1]
+    summary = hist.summary(1000)
+    assert summary["count"] == 20000 and summary["max"] == round(values[-1] / 1000, 1)
+    assert Histogram().summary() == {"count": 0}
+
+
+def test_worker_appends_job_summary(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    for _ in range(2):
+        worker = PasteWorker("héllo 😊" * 20, 1, 0, countdown_seconds=0, backend=RecordingBackend(record=False),
+                             metrics_file=path)
+        worker.run()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("not json\n")
+    summaries = read_summaries(path)
+    assert len(summaries) == 2
+    last = summaries[-1]
+    assert last["graphemes"] == 140 and last["completed"] and last["backend"] == "recording"
+    assert last["send_us"]["count"] == 140
+    # 每个字素之后都有 1ms 等待，除第一个外的发送都有节拍误差记录
+    assert last["send_error_us"]["count"] == 139
+    assert last["chars_per_s"] > 0
+    assert "p99=" in format_summary(last)
+    assert read_summaries(path, 1) == [last]
+    assert read_summaries(tmp_path / "missing.jsonl") == []
+
+
+def test_metrics_file_rotates_at_size_cap(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    record = {"graphemes": 0, "pad": "x" * 80}
+    line_bytes = len(b'{"graphemes": 0, "pad": "') + 80 + len(b'"}\n') + len(b', "n": 0')
+    for n in range(10):
+        write_summary(path, {**record, "n": n}, max_bytes=line_bytes * 3, backup_count=2)
+    # 当前文件不超过上限，最旧的备份被丢弃
+    assert path.stat().st_size <= line_bytes * 3
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["metrics.jsonl", "metrics.jsonl.1", "metrics.jsonl.2"]
+    assert not (tmp_path / "metrics.jsonl.3").exists()
+    # 每个文件最多 3 条：.2 = 3..5，.1 = 6..8，当前 = 9
+    assert [s["n"] for s in read_summaries(path, backup_count=2)] == list(range(3, 10))
+    assert [s["n"] for s in read_summaries(path, 2, backup_count=2)] == [8, 9]
@@ -4,7 +4,9 @@ import time
 import pytest
 from PySide6.QtCore import QCoreApplication
 
-from core_engine import PasteWorker
+from core_engine import JobPreparer, PasteWorker, ProgressReporter
+from input_backends import RecordingBackend
+from typing_job import StreamingJob, TypingJob
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -31,3 +33,192 @@ def test_cancelable_sleep_respects_delay():
     worker._sleep_cancelable(30)
     elapsed = time.perf_counter() - start
     assert 0.02 <= elapsed <= 0.2
+
+
+class FakeBackend(RecordingBackend):
+    """按脚本返回值模拟 SendInput 的部分写入 / 失败。"""
+
+    def __init__(self, replies=None):
+        super().__init__()
+        self.spans = []
+        self.replies = list(replies or [])
+
+    def send(self, events, first, count):
+        self.spans.append((first, count))
+        if self.replies:
+            # 部分写入时被接受的事件同样会被目标程序收到
+            accepted = self.replies.pop(0)
+            return super().send(events, first, accepted) if accepted > 0 else accepted
+        return super().send(events, first, count)
+
+
+def test_burst_mode_batches_whole_graphemes():
+    backend = FakeBackend()
+    worker = PasteWorker("abcdefghij", 0, 0, countdown_seconds=0, burst_graphemes=4, backend=backend)
+    assert worker.burst_mode
+    worker.run()
+    assert worker.completed
+    # 10 个字素按 4/4/2 打包，每个字素 2 个事件
+    assert backend.spans == [(0, 8), (8, 8), (16, 4)]
+    assert backend.text() == "abcdefghij"
+
+
+def test_burst_mode_partial_send_finishes_grapheme_and_types_once():
+    # 第一批只写入 3 个事件（字素 #1 的按下事件），随后失败；补发其抬起事件后停止
+    backend = FakeBackend(replies=[3, 0])
+    worker = PasteWorker("abcdef", 0, 0, countdown_seconds=0, burst_graphemes=4, backend=backend)
+    worker.run()
+    assert not worker.completed
+    assert worker.next_offset == 2
+    assert backend.text() == "ab"
+    resumed = PasteWorker("abcdef", 0, 0, start_offset=worker.next_offset, countdown_seconds=0,
+                          burst_graphemes=4, backend=backend)
+    resumed.run()
+    assert resumed.completed
+    # 每个字符恰好输入一次，且每个按下都有对应的抬起
+    assert backend.text() == "abcdef"
+    downs = [e for e in backend.events if not e[2] & 0x0002]
+    assert len(downs) * 2 == len(backend.events)
+
+
+def test_partial_grapheme_releases_pressed_keys_when_send_keeps_failing():
+    # 😊 为代理对：2 个按下 + 2 个抬起；只接受第一个按下，之后一直失败
+    backend = FakeBackend(replies=[1, 0, 0, 0, 0])
+    worker = PasteWorker("😊x", 0, 0, countdown_seconds=0, burst_graphemes=4, backend=backend)
+    worker.run()
+    assert not worker.completed
+    assert worker.next_offset == 0
+    # 补发重试耗尽后逐个发送剩余的两个抬起事件
+    assert backend.spans[-2:] == [(2, 1), (3, 1)]
+
+
+def test_burst_mode_respects_event_limit():
+    backend = FakeBackend()
+    # 每个 emoji 4 个事件，上限 10 个事件 -> 每批 2 个字素
+    worker = PasteWorker("😊" * 5, 0, 0, countdown_seconds=0, burst_graphemes=64, burst_max_events=10,
+                         backend=backend)
+    worker.run()
+    assert worker.completed
+    assert [count for _, count in backend.spans] == [8, 8, 4]
+    assert backend.text() == "😊" * 5
+
+
+def test_progress_reporter_coalesces_updates():
+    sent = []
+    reporter = ProgressReporter(lambda *args: sent.append(args), total=10_000, max_hz=30)
+    reporter.start()
+    for done in range(1, 10_001):
+        reporter.update(done)
+    reporter.flush(10_000)
+    # 紧密循环中 30Hz 限速只会放行首个更新，其余被合并
+    assert reporter.emitted == len(sent) < 10
+    assert reporter.dropped == 10_000 - (reporter.emitted - 1)
+    percent, rate, eta = sent[-1]
+    assert percent == 100
+    assert rate > 0
+    assert eta == 0
+
+
+def test_progress_reporter_emits_on_percent_change():
+    sent = []
+    reporter = ProgressReporter(lambda *args: sent.append(args), total=4, max_hz=0)
+    for done in (1, 1, 2, 3, 4):
+        reporter.update(done)
+    assert [p for p, _, _ in sent] == [25, 50, 75, 100]
+    assert reporter.dropped == 1
+
+
+def test_worker_shares_typing_job():
+    job = TypingJob("héllo")
+    backend = RecordingBackend()
+    worker = PasteWorker(job, 0, 0, start_offset=2, countdown_seconds=0, backend=backend)
+    assert worker.job is job
+    worker.run()
+    assert backend.text() == "llo"
+    assert worker.completed and worker.next_offset == job.total_graphemes
+
+
+def test_streaming_job_types_same_keys_and_delays_as_eager():
+    text = "héllo wörld\n" * 900
+    runs = []
+    for job in (TypingJob(text), StreamingJob.from_text(text, chunk_chars=500)):
+        backend = RecordingBackend()
+        worker = PasteWorker(job, 0, 3, countdown_seconds=0, backend=backend, seed=7)
+        waits = []
+        worker.scheduler.wait_next = lambda ms: waits.append(ms) or True
+        worker.run()
+        assert worker.completed
+        runs.append((backend.text(), waits, worker.next_offset))
+    assert runs[0] == runs[1]
+    assert runs[0][0] == text
+
+
+def test_job_preparer_segments_off_thread():
+    preparer = JobPreparer("a\r\nb😊")
+    preparer.start()
+    assert preparer.wait(5000)
+    assert isinstance(preparer.job, TypingJob)
+    assert preparer.job.text == "a\nb😊"
+
+    cancelled = JobPreparer("abc")
+    cancelled.cancel()
+    cancelled.run()
+    assert cancelled.job is None
+
+
+class SlowBackend(RecordingBackend):
+    """每个事件耗时固定的后端，用于验证突发批次按停止延迟目标收缩。"""
+
+    def __init__(self, ns_per_event):
+        super().__init__(record=False)
+        self.ns_per_event = ns_per_event
+        self.batches = []
+
+    def send(self, events, first, count):
+        self.batches.append(count)
+        end = time.perf_counter_ns() + count * self.ns_per_event
+        while time.perf_counter_ns() < end:
+            pass
+        return count
+
+
+def test_burst_batches_shrink_to_stop_latency_budget():
+    # 每个事件 10us，批次预算 2.5ms -> 约 250 个事件
+    backend = SlowBackend(10_000)
+    worker = PasteWorker("abcdefghij" * 300, 0, 0, countdown_seconds=0, burst_graphemes=1000,
+                         burst_max_events=2000, backend=backend)
+    worker.run()
+    assert worker.completed
+    assert backend.batches[0] == 2000
+    assert max(backend.batches[2:]) <= 400
+
+
+def test_stop_latency_is_recorded():
+    worker = PasteWorker("abcdefghij" * 1000, 2, 0, countdown_seconds=0, backend=RecordingBackend(record=False))
+    worker.start()
+    deadline = time.monotonic() + 5
+    while worker.next_offset < 5 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    worker.stop()
+    assert worker.wait(1000)
+    assert worker.next_offset >= 5, "worker did not type 5 graphemes within 5s"
+    assert not worker.completed
+    assert worker.stop_latency_ms is not None and worker.stop_latency_ms < 5
+
+
+def test_pacing_starts_when_first_window_is_ready(monkeypatch):
+    import core_engine
+
+    compile_window = core_engine.cached_compile
+
+    def slow_compile(*args, **kwargs):
+        time.sleep(0.05)
+        return compile_window(*args, **kwargs)
+
+    # 首个窗口编译 50ms：节拍若在编译前起算，开头的发送会晚约 50ms 并连发追赶
+    monkeypatch.setattr(core_engine, "cached_compile", slow_compile)
+    worker = PasteWorker("abcdefghij", 1, 0, countdown_seconds=0, backend=RecordingBackend(record=False))
+    worker.run()
+    assert worker.completed
+    assert worker.metrics.send_error_ns.count == 9
+    assert worker.metrics.send_error_ns.max < 25_000_000
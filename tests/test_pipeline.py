@@ -0,0 +1,103 @@
+import sys
+import threading
+import time
+
+import pytest
+
+from pipeline import WindowPipeline
+
+
+def _windows(n):
+    return ((i * 10, f"w{i}") for i in range(n))
+
+
+def test_pipeline_yields_prepared_windows_in_order():
+    pipeline = WindowPipeline(_windows(20), lambda start, w: (start, w.upper()), threading.Event(), depth=2).start()
+    try:
+        items = list(pipeline)
+    finally:
+        pipeline.close()
+    assert items == [(i * 10, f"W{i}") for i in range(20)]
+    assert pipeline.produced == 20
+
+
+def test_pipeline_reraises_producer_errors():
+    def prepare(start, window):
+        if start == 30:
+            raise ValueError("boom")
+        return start
+
+    pipeline = WindowPipeline(_windows(10), prepare, threading.Event()).start()
+    seen = []
+    with pytest.raises(ValueError):
+        for item in pipeline:
+            seen.append(item)
+    pipeline.close()
+    assert seen == [0, 10, 20]
+
+
+def test_pipeline_close_unblocks_producer_and_leaves_switch_interval_alone():
+    before = sys.getswitchinterval()
+    # 队列深度 1，消费端只取一项就退出，生产者应在 close 后结束而不是阻塞在 put 上
+    pipeline = WindowPipeline(_windows(1000), lambda start, w: start, threading.Event(), depth=1).start()
+    assert next(iter(pipeline)) == 0
+    pipeline.close()
+    assert not pipeline._thread.is_alive()
+    # 切换间隔是进程级设置，流水线不应改动（会影响界面线程）
+    assert sys.getswitchinterval() == before
+
+
+def _drain_slowly(pipeline):
+    # 消费端每项之后稍等，给生产者追上的时间，只有真正慢的窗口才造成停顿
+    items = []
+    try:
+        for item in pipeline:
+            items.append(item)
+            time.sleep(0.01)
+    finally:
+        pipeline.close()
+    return items
+
+
+def test_pipeline_stalls_exclude_first_window():
+    def slow_first(start, window):
+        if start == 0:
+            time.sleep(0.05)
+        return start
+
+    pipeline = WindowPipeline(_windows(3), slow_first, threading.Event(), depth=4).start()
+    assert _drain_slowly(pipeline) == [0, 10, 20]
+    assert pipeline.stalls == 0
+
+    def slow_second(start, window):
+        if start == 10:
+            time.sleep(0.05)
+        return start
+
+    pipeline = WindowPipeline(_windows(3), slow_second, threading.Event(), depth=4).start()
+    assert _drain_slowly(pipeline) == [0, 10, 20]
+    assert pipeline.stalls == 1
+
+
+def test_pipeline_stops_when_cancelled():
+    cancel = threading.Event()
+    release = threading.Event()
+
+    def prepare(start, window):
+        release.wait(1)
+        return start
+
+    pipeline = WindowPipeline(_windows(5), prepare, cancel).start()
+    cancel.set()
+    release.set()
+    assert list(pipeline) in ([], [0])
+    pipeline.close()
+
+
+def test_yielding_releases_gil_every_n_items(monkeypatch):
+    import pipeline
+
+    sleeps = []
+    monkeypatch.setattr(pipeline.time, "sleep", sleeps.append)
+    assert list(pipeline.yielding(range(10), every=4)) == list(range(10))
+    assert sleeps == [0, 0]
@@ -0,0 +1,61 @@
+import sys
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+
+from core_engine import InputSimulator, PasteWorker
+from input_backends import RecordingBackend
+from plan_cache import PlanCache, plan_nbytes
+from typing_job import prepare_job
+
+
+@pytest.fixture(scope="session", autouse=True)
+def qapp():
+    app = QCoreApplication.instance()
+    if app is None:
+        app = QCoreApplication(sys.argv)
+    return app
+
+
+def test_lru_evicts_by_bytes():
+    plan = InputSimulator.compile_plan(list("abcd"))
+    size = plan_nbytes(plan)
+    cache = PlanCache(max_bytes=size * 2)
+    cache.put_plan(b"k", 0, plan)
+    cache.put_plan(b"k", 4096, plan)
+    assert cache.get_plan(b"k", 0) is plan  # 0 变为最近使用
+    cache.put_plan(b"k", 8192, plan)
+    assert cache.get_plan(b"k", 4096) is None
+    assert cache.get_plan(b"k", 0) is plan
+    assert cache.bytes == size * 2
+    assert cache.stats()["evictions"] == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_oversized_entry_is_not_cached():
+    cache = PlanCache(max_bytes=10)
+    cache.put_plan(b"k", 0, InputSimulator.compile_plan(list("abc")))
+    assert len(cache) == 0
+
+
+def test_prepare_job_reuses_cached_segmentation():
+    cache = PlanCache()
+    first = prepare_job("模板\r\n文本", cache=cache)
+    second = prepare_job("模板\n文本", cache=cache)
+    assert second is first
+    assert cache.hits == 1
+
+
+def test_resume_reuses_cached_plans():
+    cache = PlanCache()
+    job = prepare_job("résumé 😊\n" * 1000, cache=cache)
+    full = RecordingBackend()
+    PasteWorker(job, 0, 0, countdown_seconds=0, backend=full, cache=cache).run()
+    misses = cache.misses
+
+    resumed = RecordingBackend()
+    worker = PasteWorker(job, 0, 0, start_offset=5000, countdown_seconds=0, backend=resumed, cache=cache)
+    worker.run()
+    assert worker.completed
+    assert cache.misses == misses
+    assert resumed.text() == "".join(job.iter_graphemes(5000))
@@ -0,0 +1,133 @@
+import struct
+import sys
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+
+from core_engine import PasteWorker
+from input_backends import RecordingBackend
+import plan_file
+from plan_file import HEADER_SIZE, PlanFile, PlanFileError, write_plan_file
+from rhythm import DelaySchedule
+from typing_job import TypingJob
+
+
+@pytest.fixture(scope="session", autouse=True)
+def qapp():
+    app = QCoreApplication.instance()
+    if app is None:
+        app = QCoreApplication(sys.argv)
+    return app
+
+
+TEXT = "héllo 😊 wörld\n👨‍👩‍👧 नमस्ते\n" * 400
+
+
+def _run(job, start_offset=0, seed=7, random_delay=3):
+    backend = RecordingBackend()
+    worker = PasteWorker(job, 0, random_delay, start_offset=start_offset, countdown_seconds=0,
+                         backend=backend, rhythm="natural", seed=seed)
+    waits = []
+    worker.scheduler.wait_next = lambda ms: waits.append(ms) or True
+    worker.run()
+    return backend, waits, worker
+
+
+def test_plan_file_types_same_events_and_delays_as_text(tmp_path):
+    path = tmp_path / "job.plan"
+    count = write_plan_file(TEXT, path)
+    with PlanFile(path) as plan:
+        assert plan.total_graphemes == count == TypingJob(TEXT).total_graphemes
+        assert not plan.has_delays
+        from_file = _run(plan)
+    from_text = _run(TypingJob(TEXT))
+    assert from_file[0].events == from_text[0].events
+    # 未写入延迟时按当前节奏生成，首码位从事件中还原
+    assert from_file[1] == from_text[1]
+    assert from_file[2].completed and from_file[2].next_offset == count
+
+
+def test_plan_file_resumes_from_offset(tmp_path):
+    path = tmp_path / "job.plan"
+    write_plan_file(TEXT, path)
+    job = TypingJob(TEXT)
+    plan = PlanFile(path)
+    backend, _, worker = _run(plan, start_offset=5000)
+    assert backend.text() == "".join(job.iter_graphemes(5000))
+    assert worker.next_offset == job.total_graphemes
+    plan.close()
+
+
+def test_plan_file_stored_delays_override_settings(tmp_path):
+    path = tmp_path / "job.plan"
+    schedule = DelaySchedule(20, 10, "lognormal", seed=3)
+    write_plan_file(TEXT, path, schedule)
+    plan = PlanFile(path)
+    assert plan.has_delays and plan.rhythm == "lognormal" and plan.seed == 3
+    # 零延迟设置下也按文件中的延迟输入，而不是突发模式
+    _, waits, worker = _run(plan, random_delay=0)
+    job = TypingJob(TEXT)
+    expected = []
+    for start in range(0, job.total_graphemes, 4096):
+        end = min(start + 4096, job.total_graphemes)
+        expected.extend(schedule.block(start // 4096, job.first_codepoints(start, end)))
+    assert waits == [d for d in expected if d > 0]
+    assert worker.completed
+
+
+def test_plan_file_rejects_foreign_files(tmp_path):
+    bogus = tmp_path / "bogus.plan"
+    bogus.write_bytes(b"x" * HEADER_SIZE)
+    with pytest.raises(PlanFileError):
+        PlanFile(bogus)
+
+    path = tmp_path / "job.plan"
+    write_plan_file("abc", path)
+    data = bytearray(path.read_bytes())
+    # INPUT 大小不同（其他指针宽度下编译）的文件不能直接执行
+    struct.pack_into("<I", data, 12, 28 if data[12] != 28 else 40)
+    other = tmp_path / "other.plan"
+    other.write_bytes(bytes(data))
+    with pytest.raises(PlanFileError):
+        PlanFile(other)
+    truncated = tmp_path / "truncated.plan"
+    truncated.write_bytes(path.read_bytes()[:HEADER_SIZE + 10])
+    with pytest.raises(PlanFileError):
+        PlanFile(truncated)
+
+
+def test_offset_table_overflow_raises_plan_file_error(tmp_path, monkeypatch):
+    # 每个 ASCII 字素 2 个事件；上限设为 9 时 "abcde" 需要 10 个事件
+    monkeypatch.setattr(plan_file, "MAX_EVENTS", 9)
+    path = tmp_path / "big.plan"
+    with pytest.raises(PlanFileError, match="32-bit"):
+        write_plan_file("abcde", path)
+    assert not path.exists()
+    assert list(tmp_path.iterdir()) == []
+    assert write_plan_file("abcd", path) == 4
+
+
+@pytest.mark.parametrize("index, value", [(0, 1), (3, 0), (-1, 7), (-1, 1 << 20)])
+def test_corrupt_offsets_rejected(tmp_path, monkeypatch, index, value):
+    path = tmp_path / "job.plan"
+    write_plan_file("abcdef", path)
+    data = bytearray(path.read_bytes())
+    offsets_pos = plan_file._HEADER.unpack_from(data)[9]
+    # 6 个字素、12 个事件：边界表共 7 项，依次为 0, 2, ..., 12
+    assert struct.unpack_from("<7I", data, offsets_pos) == (0, 2, 4, 6, 8, 10, 12)
+    struct.pack_into("<I", data, offsets_pos + 4 * (index % 7), value)
+    path.write_bytes(bytes(data))
+    with pytest.raises(PlanFileError, match="offset table"):
+        PlanFile(path)
+    # 没有 NumPy 时同样检查
+    monkeypatch.setattr(plan_file, "np", None)
+    with pytest.raises(PlanFileError, match="offset table"):
+        PlanFile(path)
+
+
+def test_empty_plan_file(tmp_path):
+    path = tmp_path / "empty.plan"
+    assert write_plan_file("", path) == 0
+    plan = PlanFile(path)
+    assert not plan and not plan.has_more(0)
+    plan.close()
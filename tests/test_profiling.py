@@ -0,0 +1,122 @@
+import pstats
+import sys
+import threading
+import time
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+
+import profiling
+from core_engine import PasteWorker
+from input_backends import RecordingBackend
+from profiling import Profiler
+
+
+@pytest.fixture(scope="session", autouse=True)
+def qapp():
+    app = QCoreApplication.instance()
+    if app is None:
+        app = QCoreApplication(sys.argv)
+    return app
+
+
+def _spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+@pytest.mark.skipif(not profiling.CPROFILE_PER_THREAD, reason="cProfile is process-wide on Python 3.12+")
+def test_cprofile_writes_per_thread_stats(tmp_path):
+    profiling.enable("cprofile")
+    try:
+        worker = PasteWorker("héllo" * 10, 0, 0, countdown_seconds=0, backend=RecordingBackend(record=False))
+        worker.start()
+        assert worker.wait(5000)
+        paths = profiling.profiler.write(tmp_path)
+    finally:
+        profiling.disable()
+    assert paths == [tmp_path / "profile-PasteWorker.prof"]
+    stats = pstats.Stats(str(paths[0]))
+    functions = {func for _, _, func in stats.stats}
+    assert "_send_graphemes" in functions
+
+
+def test_sampler_collapses_only_attached_threads(tmp_path):
+    profiler = Profiler("sample", interval_ms=1)
+
+    def run():
+        profiler.attach("Busy")
+        _spin(0.1)
+        profiler.detach("Busy")
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    _spin(0.05)
+    thread.join()
+    paths = profiler.write(tmp_path)
+    assert paths == [tmp_path / "profile-Busy.collapsed"]
+    lines = paths[0].read_text(encoding="utf-8").splitlines()
+    assert lines and profiler.samples > 0
+    assert any("run (test_profiling.py" in line and "_spin" in line for line in lines)
+    # 折叠栈格式：根在前，以空格分隔计数
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0 and stack.split(";")[-1].startswith("_spin")
+
+
+def _ui_work():
+    _spin(0.1)
+
+
+def _worker_work():
+    _spin(0.1)
+
+
+def _profile_ui_and_worker(profiler, directory):
+    """Profile the calling thread as UI while a second thread runs as PasteWorker at the same time."""
+    attached = threading.Event()
+
+    def worker():
+        profiler.attach("PasteWorker")
+        attached.set()
+        _worker_work()
+        profiler.detach("PasteWorker")
+
+    profiler.attach("UI")
+    thread = threading.Thread(target=worker)
+    thread.start()
+    assert attached.wait(5)
+    _ui_work()
+    thread.join()
+    profiler.detach("UI")
+    suffix = ".prof" if profiler.mode == "cprofile" else ".collapsed"
+    paths = profiler.write(directory)
+    assert sorted(paths) == [directory / f"profile-PasteWorker{suffix}", directory / f"profile-UI{suffix}"]
+    functions = {}
+    for name in ("UI", "PasteWorker"):
+        path = directory / f"profile-{name}{suffix}"
+        if suffix == ".prof":
+            functions[name] = {func for _, _, func in pstats.Stats(str(path)).stats}
+        else:
+            functions[name] = {part.split(" ", 1)[0] for line in path.read_text(encoding="utf-8").splitlines()
+                               for part in line.rsplit(" ", 1)[0].split(";")}
+    # 两个线程同时被剖析，各自的结果只包含自己的函数
+    assert "_ui_work" in functions["UI"] and "_worker_work" not in functions["UI"]
+    assert "_worker_work" in functions["PasteWorker"] and "_ui_work" not in functions["PasteWorker"]
+
+
+def test_ui_and_worker_profiled_at_the_same_time(tmp_path):
+    _profile_ui_and_worker(Profiler("cprofile"), tmp_path)
+
+
+def test_cprofile_falls_back_to_sampling_when_process_wide(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(profiling, "CPROFILE_PER_THREAD", False)
+    profiler = Profiler("cprofile", interval_ms=1)
+    assert profiler.mode == "sample"
+    assert "sampling instead" in caplog.text
+    _profile_ui_and_worker(profiler, tmp_path)
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        Profiler("perf")
@@ -0,0 +1,42 @@
+import pytest
+
+import rhythm
+from rhythm import DelaySchedule
+
+
+def test_uniform_matches_randrange_bounds():
+    schedule = DelaySchedule(10, 5, "uniform", seed=1)
+    delays = schedule.block(0, [ord("a")] * 1000)
+    assert len(delays) == 1000
+    assert min(delays) >= 10
+    assert max(delays) <= 14
+
+
+def test_seed_is_reproducible_per_block():
+    cps = [ord("a")] * 64
+    first = DelaySchedule(10, 20, "lognormal", seed=42)
+    second = DelaySchedule(10, 20, "lognormal", seed=42)
+    assert first.block(3, cps) == second.block(3, cps)
+    assert first.block(3, cps) != first.block(4, cps)
+
+
+def test_class_multipliers_slow_down_newline_and_punctuation():
+    schedule = DelaySchedule(10, 0, "uniform", seed=7, class_multipliers=rhythm.DEFAULT_CLASS_MULTIPLIERS)
+    delays = schedule.block(0, [ord("a"), ord("\n"), ord(","), ord("😊")])
+    assert delays[1] > delays[2] > delays[0]
+    assert delays[3] == delays[0]
+    assert DelaySchedule(10, 5, "natural").class_multipliers is rhythm.DEFAULT_CLASS_MULTIPLIERS
+
+
+def test_estimate_count():
+    schedule = DelaySchedule(10, 5, "uniform", seed=0)
+    assert schedule.estimate_count_ms(100) == pytest.approx(1200)
+    assert DelaySchedule(0, 0).estimate_count_ms(100) == 0
+
+
+def test_python_fallback(monkeypatch):
+    monkeypatch.setattr(rhythm, "np", None)
+    schedule = DelaySchedule(10, 5, "natural", seed=3)
+    delays = schedule.block(0, [ord("a"), ord("\n")] * 10)
+    assert len(delays) == 20
+    assert delays == schedule.block(0, [ord("a"), ord("\n")] * 10)
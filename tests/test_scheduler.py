@@ -0,0 +1,39 @@
+import threading
+import time
+
+from scheduler import DeadlineScheduler
+
+
+def test_deadlines_do_not_accumulate_drift():
+    scheduler = DeadlineScheduler()
+    start = time.perf_counter()
+    scheduler.start()
+    for _ in range(50):
+        # 模拟每次发送耗时 1ms，绝对截止时间应把它吸收掉
+        time.sleep(0.001)
+        assert scheduler.wait_next(2)
+    elapsed = time.perf_counter() - start
+    assert 0.095 <= elapsed <= 0.14
+    summary = scheduler.jitter.summary()
+    assert summary["count"] == 50
+    assert summary["mean_us"] >= 0
+
+
+def test_cancel_wakes_sleeper_immediately():
+    cancel = threading.Event()
+    scheduler = DeadlineScheduler(cancel)
+    threading.Timer(0.02, cancel.set).start()
+    start = time.perf_counter()
+    scheduler.start()
+    assert scheduler.wait_next(1000) is False
+    assert time.perf_counter() - start < 0.1
+
+
+def test_lagging_schedule_resyncs():
+    scheduler = DeadlineScheduler()
+    scheduler.start()
+    time.sleep(0.15)
+    start = time.perf_counter()
+    assert scheduler.wait_next(1)
+    assert time.perf_counter() - start < 0.01
+    assert scheduler.jitter.resyncs == 1
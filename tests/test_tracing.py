@@ -0,0 +1,71 @@
+import json
+import sys
+import threading
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+
+import tracing
+from core_engine import PasteWorker
+from input_backends import RecordingBackend
+from tracing import Tracer
+
+
+@pytest.fixture(scope="session", autouse=True)
+def qapp():
+    app = QCoreApplication.instance()
+    if app is None:
+        app = QCoreApplication(sys.argv)
+    return app
+
+
+@pytest.fixture
+def tracer():
+    tr = tracing.enable(1024)
+    yield tr
+    tracing.disable()
+
+
+def test_ring_keeps_newest_events():
+    tr = Tracer(capacity=8)
+    for i in range(20):
+        tr.instant("tick", i)
+    assert tr.recorded == 20
+    events = tr.events()
+    assert [e["args"]["n"] for e in events] == list(range(12, 20))
+    assert all(e["ph"] == "i" for e in events)
+
+
+def test_write_trace_event_json(tmp_path):
+    tr = Tracer(capacity=16)
+    tr.name_thread("UI")
+    tr.complete("span", tr._origin_ns + 2000, tr._origin_ns + 5000, 3)
+    worker = threading.Thread(target=lambda: (tr.name_thread("Worker"), tr.instant("mark")))
+    worker.start()
+    worker.join()
+    path = tmp_path / "sub" / "trace.json"
+    assert tr.write(path) == 4
+    data = json.loads(path.read_text(encoding="utf-8"))
+    events = data["traceEvents"]
+    names = {e["args"]["name"]: e["tid"] for e in events if e["ph"] == "M"}
+    assert set(names) == {"UI", "Worker"} and names["UI"] != names["Worker"]
+    span = next(e for e in events if e["ph"] == "X")
+    assert span["name"] == "span" and span["ts"] == 2.0 and span["dur"] == 3.0 and span["tid"] == names["UI"]
+    mark = next(e for e in events if e["ph"] == "i")
+    assert mark["tid"] == names["Worker"]
+
+
+def test_worker_records_sends_and_sleeps(tracer):
+    worker = PasteWorker("abc", 1, 0, countdown_seconds=0, backend=RecordingBackend(record=False))
+    worker.run()
+    events = tracer.events()
+    threads = {e["args"]["name"] for e in events if e["ph"] == "M"}
+    assert {"PasteWorker", "WindowPipeline"} <= threads
+    names = [e["name"] for e in events]
+    assert names.count("SendInput") == 3
+    assert names.count("sleep") == 3
+    assert "countdown" in names and "progress emit" in names and "prepare window" in names
+
+
+def test_disabled_by_default():
+    assert tracing.tracer is None
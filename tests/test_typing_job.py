@@ -0,0 +1,55 @@
+import pytest
+
+from typing_job import StreamingJob, TypingJob, prepare_job
+
+
+def test_job_normalizes_and_indexes_graphemes():
+    job = TypingJob("a\r\nb👨‍👩‍👧c")
+    assert job.text == "a\nb👨‍👩‍👧c"
+    assert job.total_graphemes == 5
+    assert job.boundaries.typecode == "I"
+    assert job.grapheme(3) == "👨‍👩‍👧"
+    assert list(job.iter_graphemes(2, 4)) == ["b", "👨‍👩‍👧"]
+    assert list(job.first_codepoints(0, 5)) == [ord("a"), 0x0A, ord("b"), 0x1F468, ord("c")]
+
+
+def test_job_is_immutable_and_clamps_offsets():
+    job = TypingJob("abc")
+    with pytest.raises(AttributeError):
+        job.text = "x"
+    assert job.clamp(-1) == 0
+    assert job.clamp(10) == 3
+    assert not TypingJob("")
+
+
+def _windows(job, start, size):
+    return [(first, list(window.iter_graphemes())) for first, window in job.iter_windows(start, size)]
+
+
+def test_streaming_windows_match_eager_segmentation():
+    text = "ab\r\nक्षि👨‍👩‍👧🇨🇳🇯x\r\n한국어" * 7
+    eager = TypingJob(text)
+    for chunk in (1, 2, 5, 64):
+        stream = StreamingJob.from_text(text, chunk_chars=chunk)
+        assert stream.total_graphemes is None and stream.has_more(10 ** 9)
+        assert _windows(stream, 0, 4) == _windows(eager, 0, 4)
+        assert stream.total_graphemes == eager.total_graphemes
+        assert not stream.has_more(eager.total_graphemes)
+
+
+def test_windows_are_aligned_when_resuming():
+    text = "abcdefghij"
+    for job in (TypingJob(text), StreamingJob.from_text(text, chunk_chars=3)):
+        assert _windows(job, 5, 4) == [(4, list("efgh")), (8, list("ij"))]
+
+
+def test_streaming_without_numpy(monkeypatch):
+    import typing_job
+    monkeypatch.setattr(typing_job, "np", None)
+    text = "xyz👍🏽\r\n" * 50
+    assert _windows(StreamingJob.from_text(text, chunk_chars=7), 9, 16) == _windows(TypingJob(text), 9, 16)
+
+
+def test_prepare_job_switches_to_streaming_above_threshold():
+    assert isinstance(prepare_job("abcd", stream_threshold=10), TypingJob)
+    assert isinstance(prepare_job("abcd", stream_threshold=4), StreamingJob)
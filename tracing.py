@@ -0,0 +1,134 @@
+# tracing.py
+"""可选的时间线追踪，输出 Chrome / Perfetto 可读的 trace-event JSON。
+
+事件写入预先分配的环形缓冲区（几个定长 array），记录一次只是几次数组赋值，
+不分配对象、不加锁，因此追踪长任务本身不会扭曲按键节拍；缓冲区写满后覆盖最旧的事件。
+未启用时 tracer 为 None，埋点处只多一次判空。
+"""
+import itertools
+import json
+import os
+import threading
+import time
+from array import array
+from pathlib import Path
+
+from config import TRACE_CAPACITY
+
+# 全局追踪器，由 enable() 创建；埋点处先判断是否为 None
+tracer: "Tracer | None" = None
+
+_PHASE_COMPLETE = 0
+_PHASE_INSTANT = 1
+
+
+class Tracer:
+    """定长环形缓冲区：每个事件占用各数组中的同一个槽位。"""
+
+    def __init__(self, capacity: int = TRACE_CAPACITY):
+        self.capacity = max(1, capacity)
+        self._ts = array("q", bytes(8 * self.capacity))
+        self._dur = array("q", bytes(8 * self.capacity))
+        self._tid = array("q", bytes(8 * self.capacity))
+        self._arg = array("q", bytes(8 * self.capacity))
+        self._name = array("H", bytes(2 * self.capacity))
+        self._phase = array("B", bytes(self.capacity))
+        # 事件名只保存一次，槽位里存下标
+        self._names: list[str] = []
+        self._name_ids: dict[str, int] = {}
+        self._thread_names: dict[int, str] = {}
+        # itertools.count 的 next() 在 C 中完成，多线程取号不会重复
+        self._counter = itertools.count()
+        self._recorded = 0
+        self._origin_ns = time.perf_counter_ns()
+        self._lock = threading.Lock()
+
+    def _name_id(self, name: str) -> int:
+        index = self._name_ids.get(name)
+        if index is None:
+            with self._lock:
+                index = self._name_ids.get(name)
+                if index is None:
+                    index = len(self._names)
+                    self._names.append(name)
+                    self._name_ids[name] = index
+        return index
+
+    def name_thread(self, name: str):
+        """Label the calling thread in the trace."""
+        self._thread_names[threading.get_native_id()] = name
+
+    def complete(self, name: str, start_ns: int, end_ns: int, arg: int = 0):
+        """Record a span [start_ns, end_ns) (perf_counter_ns) on the calling thread."""
+        seq = next(self._counter)
+        slot = seq % self.capacity
+        self._ts[slot] = start_ns
+        self._dur[slot] = end_ns - start_ns
+        self._tid[slot] = threading.get_native_id()
+        self._arg[slot] = int(arg)
+        self._name[slot] = self._name_id(name)
+        self._phase[slot] = _PHASE_COMPLETE
+        self._recorded = max(self._recorded, seq + 1)
+
+    def instant(self, name: str, arg: int = 0):
+        seq = next(self._counter)
+        slot = seq % self.capacity
+        self._ts[slot] = time.perf_counter_ns()
+        self._dur[slot] = 0
+        self._tid[slot] = threading.get_native_id()
+        self._arg[slot] = int(arg)
+        self._name[slot] = self._name_id(name)
+        self._phase[slot] = _PHASE_INSTANT
+        self._recorded = max(self._recorded, seq + 1)
+
+    @property
+    def recorded(self) -> int:
+        """Total events recorded so far, including overwritten ones."""
+        return self._recorded
+
+    def events(self) -> list[dict]:
+        """Buffered events in trace-event format, oldest first."""
+        total = self.recorded
+        count = min(total, self.capacity)
+        first = total - count
+        pid = os.getpid()
+        out = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+               for tid, name in self._thread_names.items()]
+        origin = self._origin_ns
+        for seq in range(first, total):
+            slot = seq % self.capacity
+            event = {
+                "name": self._names[self._name[slot]],
+                "pid": pid,
+                "tid": self._tid[slot],
+                "ts": (self._ts[slot] - origin) / 1000,
+                "args": {"n": self._arg[slot]},
+            }
+            if self._phase[slot] == _PHASE_COMPLETE:
+                event["ph"] = "X"
+                event["dur"] = self._dur[slot] / 1000
+            else:
+                event["ph"] = "i"
+                event["s"] = "t"
+            out.append(event)
+        return out
+
+    def write(self, path) -> int:
+        """Write the buffered events as a Chrome trace JSON file; return the event count."""
+        events = self.events()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(events)
+
+
+def enable(capacity: int = TRACE_CAPACITY) -> Tracer:
+    global tracer
+    tracer = Tracer(capacity)
+    return tracer
+
+
+def disable():
+    global tracer
+    tracer = None
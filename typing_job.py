@@ -0,0 +1,250 @@
+# typing_job.py
+import hashlib
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 缺失时逐项平移偏移表
+    np = None
+
+import grapheme
+from config import STREAM_CHUNK_CHARS, STREAM_THRESHOLD_CHARS
+
+
+def normalize_text(text: str) -> str:
+    """Normalize clipboard text for typing (CRLF -> LF)."""
+    return (text or "").replace("\r\n", "\n")
+
+
+def content_key(text: str) -> bytes:
+    """Fast 128-bit digest of normalized text, used as the plan cache key."""
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def prepare_job(text: str, stream_threshold: int = STREAM_THRESHOLD_CHARS, cache=None):
+    """Build the job for ``text``: eager below the threshold, streaming above it.
+
+    With a PlanCache, a previously segmented copy of the same text is reused.
+    """
+    text = text or ""
+    if len(text) >= stream_threshold:
+        # 超大文本流式切分，首个窗口就绪即可开始输入
+        return StreamingJob.from_text(text)
+    if cache is None:
+        return TypingJob(text)
+    text = normalize_text(text)
+    key = content_key(text)
+    job = cache.get_job(key)
+    if job is None:
+        job = TypingJob._segmented(text, grapheme.grapheme_boundaries(text), key)
+        cache.put_job(key, job)
+    return job
+
+
+def _shift(bounds: array, delta: int) -> array:
+    """Return ``bounds`` with ``delta`` added to every offset."""
+    if not delta:
+        return bounds
+    if np is not None:
+        shifted = np.frombuffer(bounds, dtype=np.uint32).astype(np.int64) + delta
+        return array("I", shifted.astype(np.uint32).tobytes())
+    return array("I", [b + delta for b in bounds])
+
+
+class TypingJob:
+    """一次输入任务：规范化后的文本只保存一份，外加字素边界偏移表。
+
+    MainWindow 与 PasteWorker 共享同一个实例；续打只需要一个字素下标，
+    第 i 个字素为 text[boundaries[i]:boundaries[i + 1]]，不再为每个字素保存 str 对象。
+    """
+
+    __slots__ = ("_text", "_boundaries", "_key")
+
+    def __init__(self, text: str, boundaries: array | None = None):
+        text = normalize_text(text)
+        if boundaries is None:
+            boundaries = grapheme.grapheme_boundaries(text)
+        object.__setattr__(self, "_text", text)
+        object.__setattr__(self, "_boundaries", boundaries)
+        object.__setattr__(self, "_key", None)
+
+    @classmethod
+    def _segmented(cls, text: str, boundaries: array, key: bytes | None = None) -> "TypingJob":
+        """Wrap already normalized and segmented text without re-scanning it."""
+        job = object.__new__(cls)
+        object.__setattr__(job, "_text", text)
+        object.__setattr__(job, "_boundaries", boundaries)
+        object.__setattr__(job, "_key", key)
+        return job
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TypingJob is immutable")
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    @property
+    def boundaries(self) -> array:
+        """Code point offset of each grapheme start, plus len(text) as the final entry."""
+        return self._boundaries
+
+    @property
+    def total_graphemes(self) -> int:
+        return len(self._boundaries) - 1
+
+    @property
+    def total_chars(self) -> int:
+        return len(self._text)
+
+    @property
+    def content_key(self) -> bytes:
+        """Cache key of the text, hashed on first use."""
+        if self._key is None:
+            object.__setattr__(self, "_key", content_key(self._text))
+        return self._key
+
+    def estimated_total_graphemes(self) -> int:
+        return self.total_graphemes
+
+    def has_more(self, index: int) -> bool:
+        return index < self.total_graphemes
+
+    def __len__(self) -> int:
+        return self.total_graphemes
+
+    def __bool__(self) -> bool:
+        return bool(self._text)
+
+    def grapheme(self, index: int) -> str:
+        bounds = self._boundaries
+        return self._text[bounds[index]:bounds[index + 1]]
+
+    def iter_graphemes(self, start: int = 0, end: int | None = None):
+        """Yield graphemes [start, end) as slices of the shared text."""
+        text = self._text
+        bounds = self._boundaries
+        end = self.total_graphemes if end is None else end
+        for i in range(start, end):
+            yield text[bounds[i]:bounds[i + 1]]
+
+    def first_codepoints(self, start: int, end: int) -> array:
+        """First code point of each grapheme in [start, end)."""
+        return array("I", map(ord, map(self._text.__getitem__, self._boundaries[start:end])))
+
+    def clamp(self, index: int) -> int:
+        return max(0, min(index, self.total_graphemes))
+
+    def iter_windows(self, start: int, size: int):
+        """Yield (first index, window job) for aligned windows of ``size`` graphemes from the one holding ``start``."""
+        text = self._text
+        bounds = self._boundaries
+        total = self.total_graphemes
+        for first in range(start - start % size, total, size):
+            last = min(first + size, total)
+            base = bounds[first]
+            yield first, TypingJob._segmented(text[base:bounds[last]], _shift(bounds[first:last + 1], -base))
+
+
+class StreamingJob:
+    """流式任务：按块读入文本，在滑动窗口上切分。
+
+    每块只与上一块末尾尚未确定结束位置的那个字素拼接后重新切分，
+    凑满一个窗口就交给输入循环，因此首个按键不必等整段文本切分完，
+    内存只与窗口和块大小有关。source 为返回文本块迭代器的可调用对象，续打时会重新读取。
+    """
+
+    __slots__ = ("_source", "_total_chars", "_total_graphemes", "_seen_chars", "_seen_graphemes")
+
+    def __init__(self, source, total_chars: int | None = None):
+        self._source = source
+        self._total_chars = total_chars
+        self._total_graphemes: int | None = None
+        # 已读入的字符数与已确定的字素数，用于估算总量
+        self._seen_chars = 0
+        self._seen_graphemes = 0
+
+    # 流式任务不进入计划缓存：整段哈希会抵消流式启动的收益
+    content_key = None
+
+    @classmethod
+    def from_text(cls, text: str, chunk_chars: int = STREAM_CHUNK_CHARS) -> "StreamingJob":
+        text = text or ""
+        return cls(lambda: (text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)), len(text))
+
+    @property
+    def total_graphemes(self) -> int | None:
+        """Exact grapheme count, known only once the source has been read to the end."""
+        return self._total_graphemes
+
+    @property
+    def total_chars(self) -> int | None:
+        return self._total_chars
+
+    def estimated_total_graphemes(self) -> int:
+        if self._total_graphemes is not None:
+            return self._total_graphemes
+        if self._total_chars and self._seen_chars:
+            estimate = self._seen_graphemes * self._total_chars // self._seen_chars
+            return max(estimate, self._seen_graphemes)
+        return self._seen_graphemes
+
+    def has_more(self, index: int) -> bool:
+        return self._total_graphemes is None or index < self._total_graphemes
+
+    def __bool__(self) -> bool:
+        return self._total_chars != 0 and self._total_graphemes != 0
+
+    def clamp(self, index: int) -> int:
+        index = max(0, index)
+        return index if self._total_graphemes is None else min(index, self._total_graphemes)
+
+    def iter_chunks(self):
+        """Re-read the raw source chunks (before normalization)."""
+        return self._source()
+
+    def iter_windows(self, start: int, size: int):
+        """Same contract as TypingJob.iter_windows; windows before ``start`` are segmented but skipped."""
+        carry = ""
+        # 已确定边界、尚未交出的文本；bounds 相对 ready_text 起点
+        ready_text = ""
+        ready_bounds = array("I", [0])
+        first = 0
+        seen_chars = 0
+        for chunk in self._source():
+            seen_chars += len(chunk)
+            buf = normalize_text(carry + chunk)
+            bounds = grapheme.grapheme_boundaries(buf)
+            # 最后一个字素可能与下一块的开头组成同一个字素，留到下一轮；其余边界已经确定
+            cut = bounds[-2] if len(bounds) > 1 else 0
+            carry = buf[cut:]
+            if cut:
+                shift = len(ready_text)
+                ready_text += buf[:cut]
+                ready_bounds.extend(_shift(bounds[1:-1], shift))
+            self._seen_chars = max(self._seen_chars, seen_chars)
+            self._seen_graphemes = max(self._seen_graphemes, first + len(ready_bounds) - 1)
+            full = (len(ready_bounds) - 1) // size * size
+            if full:
+                yield from self._emit(ready_text, ready_bounds, first, full, start, size)
+                # 每块只压缩一次剩余部分，避免逐窗口重建缓冲区
+                end = ready_bounds[full]
+                ready_text = ready_text[end:]
+                ready_bounds = _shift(ready_bounds[full:], -end)
+                first += full
+
+        if carry:
+            ready_text += carry
+            ready_bounds.append(len(ready_text))
+        count = len(ready_bounds) - 1
+        self._total_graphemes = self._seen_graphemes = first + count
+        yield from self._emit(ready_text, ready_bounds, first, count, start, size)
+
+    @staticmethod
+    def _emit(text: str, bounds: array, first: int, count: int, start: int, size: int):
+        for offset in range(0, count, size):
+            last = min(offset + size, count)
+            if first + last <= start:
+                continue
+            base = bounds[offset]
+            yield first + offset, TypingJob._segmented(text[base:bounds[last]], _shift(bounds[offset:last + 1], -base))
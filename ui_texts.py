@@ -37,6 +37,7 @@ LANGS = {
             "invalid_params": "参数错误",
             "stopped_by_user": "已停止",
             "preparing": "准备中",
+            "preparing_text": "正在处理文本...",
         },
         "window_buttons": {"minimize": "一", "close": "×"},
         "messages": {
@@ -56,6 +57,7 @@ LANGS = {
             "hotkey_invalid": "请输入有效的快捷键",
             "hotkey_override": "已清除相同快捷键，当前设置为 {key}",
             "hotkey_saved": "快捷键 {key} 已保存",
+            "progress_detail": "{rate:.0f} 字/秒 · 剩余 {eta}",
         },
     },
     "en": {
@@ -96,6 +98,7 @@ LANGS = {
             "invalid_params": "Invalid parameters",
             "stopped_by_user": "Stopped by user",
             "preparing": "Preparing...",
+            "preparing_text": "Processing text...",
         },
         "window_buttons": {"minimize": "-", "close": "×"},
         "messages": {
@@ -115,6 +118,7 @@ LANGS = {
             "hotkey_invalid": "Please press a valid hotkey",
             "hotkey_override": "Cleared duplicate and set to {key}",
             "hotkey_saved": "Hotkey {key} saved",
+            "progress_detail": "{rate:.0f} chars/s · {eta} left",
         },
     },
 }